@@ -1,26 +1,28 @@
-from flask import Flask
+from flask import Flask, flash, jsonify, redirect, request
 from flask_cors import CORS
 from .config import Config
 from .extensions import db, migrate, login_manager, mail, ma, limiter, csrf
 from .services.minio_service import minio_service
 from .services.cache_service import cache_service
+from .services.password_hasher import PasswordHashingBusy, password_hasher
 from .metrics import init_metrics
-from .redis_utils import init_redis
+from .redis_utils import init_redis, redis_pool
 
 
 def _init_limiter_safe(app):
     """
     Inicializa Flask-Limiter de forma segura.
 
-    Intenta usar Redis como storage si está disponible.
-    Si falla por cualquier motivo, fuerza el fallback a memory://
-    y vuelve a inicializar. Nunca lanza excepciones.
+    Usa Redis como storage sobre el pool compartido (redis_pool) si está
+    configurado, con fallback en memoria mientras Redis no responde: el
+    limiter vuelve a Redis solo cuando se recupera. Si la inicialización
+    falla por cualquier motivo, fuerza memory:// y vuelve a inicializar.
+    Nunca lanza excepciones.
     """
-    redis_available = app.config.get('REDIS_AVAILABLE', False)
-    redis_url = app.config.get('REDIS_URL', '')
-
-    if redis_available and redis_url:
-        app.config['RATELIMIT_STORAGE_URI'] = redis_url
+    if redis_pool.pool is not None:
+        app.config['RATELIMIT_STORAGE_URI'] = redis_pool.url
+        app.config['RATELIMIT_STORAGE_OPTIONS'] = {'connection_pool': redis_pool.pool}
+        app.config['RATELIMIT_IN_MEMORY_FALLBACK_ENABLED'] = True
     else:
         app.config['RATELIMIT_STORAGE_URI'] = 'memory://'
 
@@ -37,6 +39,7 @@ def _init_limiter_safe(app):
         )
         # Forzar fallback y reintentar una vez.
         app.config['RATELIMIT_STORAGE_URI'] = 'memory://'
+        app.config.pop('RATELIMIT_STORAGE_OPTIONS', None)
         try:
             limiter.init_app(app)
             app.logger.info(
@@ -50,6 +53,19 @@ def _init_limiter_safe(app):
             )
 
 
+def _password_hashing_busy(exc):
+    """Login rechazado porque el pool de Argon2 está saturado: se pide reintentar."""
+    message = 'Demasiados inicios de sesión simultáneos. Intenta nuevamente en unos segundos.'
+    if request.path.startswith('/api/'):
+        response = jsonify({'success': False, 'message': message})
+        response.status_code = 503
+    else:
+        flash(message, 'error')
+        response = redirect(request.url)
+    response.headers['Retry-After'] = '5'
+    return response
+
+
 def create_app(config_class=Config):
     app = Flask(__name__, static_folder='../public', static_url_path='/public')
     app.config.from_object(config_class)
@@ -88,6 +104,8 @@ def create_app(config_class=Config):
         )
 
     cache_service.init_app(app)
+    password_hasher.init_app(app)
+    app.register_error_handler(PasswordHashingBusy, _password_hashing_busy)
 
     # Inicializar monitoreo
     init_metrics(app)
@@ -109,11 +127,27 @@ def create_app(config_class=Config):
         create_admin,
         init_db,
         archive_expired_pre_reservations_command,
+        run_pre_reservation_sweeper_command,
+        run_email_sender_command,
+        run_email_campaigns_command,
+        rebuild_search_index_command,
+        recompute_ratings_command,
+        bench_cache_codec_command,
+        bench_argon2_command,
+        warm_cache_command,
     )
     from .seed_command import seed_data
     app.cli.add_command(create_admin)
     app.cli.add_command(init_db)
     app.cli.add_command(archive_expired_pre_reservations_command)
+    app.cli.add_command(run_pre_reservation_sweeper_command)
+    app.cli.add_command(run_email_sender_command)
+    app.cli.add_command(run_email_campaigns_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(recompute_ratings_command)
+    app.cli.add_command(bench_cache_codec_command)
+    app.cli.add_command(bench_argon2_command)
+    app.cli.add_command(warm_cache_command)
     app.cli.add_command(seed_data)
 
     # Cargar modelos para migraciones
@@ -2,7 +2,6 @@ from flask import render_template
 from flask_login import login_required
 from sqlalchemy.orm import joinedload
 from app.models.camping import CampingService, ServiceTestimonial, PreReservation, Suggestion
-from app.services.reservation_service import archive_expired_pre_reservations
 from . import admin_bp
 
 # Importar todos los componentes de rutas
@@ -23,8 +22,6 @@ from .routes_components import media_cleanup
 @admin_bp.route('/')
 @login_required
 def dashboard():
-    archive_expired_pre_reservations()
-
     total_services = CampingService.query.count()
     featured_services = CampingService.query.filter_by(is_featured=True).count()
     total_testimonials = ServiceTestimonial.query.count()
@@ -1,6 +1,8 @@
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required
 from app.extensions import db
+from app.services.cache_service import NS_SERVICES
+from app.services.cache_warmer import schedule_public_refresh
 from app.models.camping import Amenity
 from app.utils.logging_helper import log_activity
 from .. import admin_bp
@@ -33,6 +35,8 @@ def camping_amenities():
             db.session.add(amenity)
         
         db.session.commit()
+        # Las comodidades se muestran dentro del catálogo de servicios.
+        schedule_public_refresh(NS_SERVICES)
         log_activity('AMENITY_UPSERT', f'Comodidad {"actualizada" if amenity_id else "creada"}: {name_es}')
         flash('Comodidad guardada correctamente', 'success')
         return redirect(url_for('admin.camping_amenities'))
@@ -68,6 +72,7 @@ def delete_camping_amenity(amenity_id):
     name = amenity.name_es
     db.session.delete(amenity)
     db.session.commit()
+    schedule_public_refresh(NS_SERVICES)
     log_activity('AMENITY_DELETE', f'Comodidad eliminada: {name}')
     flash('Comodidad eliminada', 'success')
     return redirect(url_for('admin.camping_amenities'))
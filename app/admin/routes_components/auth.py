@@ -52,8 +52,8 @@ def login():
         code = ''.join([secrets.choice('0123456789') for _ in range(6)])
         tf_code = TwoFactorCode(user_id=user.id, code=code)
         db.session.add(tf_code)
-        db.session.commit()
         send_2fa_email(user.email, code)
+        db.session.commit()
         log_activity("ADMIN_LOGIN_STEP1_SUCCESS", f"Código 2FA enviado a {user.email}", user)
         return redirect(url_for('admin.verify_2fa'))
     
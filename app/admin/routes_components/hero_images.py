@@ -1,7 +1,8 @@
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required
 from app.extensions import db
-from app.services.cache_service import cache_service
+from app.services.cache_service import NS_HERO_IMAGES
+from app.services.cache_warmer import schedule_public_refresh
 from app.models.camping import HeroImage, MediaAsset
 from app.utils.logging_helper import log_activity
 from app.services.minio_service import minio_service
@@ -42,7 +43,7 @@ def camping_hero_images():
         ))
 
         db.session.commit()
-        cache_service.clear_prefix("public_")
+        schedule_public_refresh(NS_HERO_IMAGES)
         log_activity('HERO_IMAGE_UPLOAD', f'Nueva imagen de portada subida: {object_name}')
         flash('Imagen de portada subida correctamente', 'success')
         return redirect(url_for('admin.camping_hero_images'))
@@ -57,7 +58,7 @@ def toggle_hero_image(image_id):
     img = HeroImage.query.get_or_404(image_id)
     img.is_active = not img.is_active
     db.session.commit()
-    cache_service.clear_prefix("public_")
+    schedule_public_refresh(NS_HERO_IMAGES)
     status = "activa" if img.is_active else "inactiva"
     log_activity('HERO_IMAGE_TOGGLE', f'Imagen hero {image_id} marcada como {status}')
     flash(f'Imagen marcada como {status}', 'success')
@@ -75,7 +76,7 @@ def delete_hero_image(image_id):
     
     db.session.delete(img)
     db.session.commit()
-    cache_service.clear_prefix("public_")
+    schedule_public_refresh(NS_HERO_IMAGES)
     log_activity('HERO_IMAGE_DELETE', f'Imagen hero {image_id} eliminada')
     flash('Imagen de portada eliminada', 'success')
     return redirect(url_for('admin.camping_hero_images'))
@@ -3,24 +3,15 @@ from flask_login import login_required
 from app.extensions import db
 from app.models.camping import PreReservation, CampingService
 from app.utils.logging_helper import log_activity
-from app.services.reservation_service import archive_expired_pre_reservations, confirm_pre_reservation
+from app.services.reservation_service import confirm_pre_reservation, release_pre_reservation_inventory
+from app.services.inventory_service import remaining_units, remaining_units_for_night, reserve_stay
+from app.services.reservation_codes import add_with_unique_code, pre_reservation_codes
 from sqlalchemy.orm import joinedload
 from .. import admin_bp
 from datetime import datetime, timedelta
 import io
 import csv
 import uuid
-import random
-import string
-
-
-def _generate_pre_reservation_code() -> str:
-    while True:
-        letters = ''.join(random.choice(string.ascii_uppercase) for _ in range(3))
-        numbers = ''.join(random.choice(string.digits) for _ in range(4))
-        code = f'ARQ-{letters}-{numbers}'
-        if not PreReservation.query.filter_by(code=code).first():
-            return code
 
 @admin_bp.route('/camping/pre-reservations', methods=['GET', 'POST'])
 @login_required
@@ -64,13 +55,12 @@ def camping_pre_reservations():
                 flash(f'La cantidad de huéspedes debe estar entre 1 y {service.capacity}.', 'error')
                 return redirect(url_for('admin.camping_pre_reservations'))
 
-            if status == 'confirmado' and service.available_units <= 0:
+            if status == 'confirmado' and remaining_units(service, check_in, check_out) <= 0:
                 flash('No hay disponibilidad para crear una reserva confirmada.', 'error')
                 return redirect(url_for('admin.camping_pre_reservations'))
 
             now = datetime.utcnow()
             reservation = PreReservation(
-                code=_generate_pre_reservation_code(),
                 service_id=service.id,
                 full_name=full_name,
                 email=email,
@@ -87,10 +77,16 @@ def camping_pre_reservations():
                 confirmed_at=now if status == 'confirmado' else None,
             )
 
-            if status == 'confirmado':
-                service.available_units = max(0, service.available_units - 1)
+            # El código va antes que el inventario: si el allocator necesita un
+            # bloque nuevo lo pide en otra conexión, que no debe esperar a las
+            # escrituras de esta transacción (ver CodeAllocator._claim).
+            add_with_unique_code(reservation, pre_reservation_codes)
+
+            if status == 'confirmado' and not reserve_stay(service, check_in, check_out):
+                db.session.rollback()
+                flash('No hay disponibilidad para crear una reserva confirmada.', 'error')
+                return redirect(url_for('admin.camping_pre_reservations'))
 
-            db.session.add(reservation)
             db.session.commit()
 
             log_activity(
@@ -106,10 +102,6 @@ def camping_pre_reservations():
 
         return redirect(url_for('admin.camping_pre_reservations'))
 
-    archived = archive_expired_pre_reservations()
-    if archived > 0:
-        flash(f'Se archivaron {archived} pre-reservas vencidas automáticamente', 'info')
-
     status = request.args.get('status')
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
@@ -128,6 +120,7 @@ def camping_pre_reservations():
     reservations_list = pagination.items
     
     services = CampingService.query.filter_by(is_active=True).order_by(CampingService.name_es.asc()).all()
+    availability = remaining_units_for_night(services)
 
     return render_template('admin/camping_pre_reservations.html', 
                            reservations=reservations_list, 
@@ -135,7 +128,8 @@ def camping_pre_reservations():
                            status=status,
                            start_date=start_date,
                            end_date=end_date,
-                           services=services)
+                           services=services,
+                           availability=availability)
 
 
 @admin_bp.route('/camping/pre-reservations/export', methods=['GET'])
@@ -222,10 +216,7 @@ def archive_camping_pre_reservation(reservation_id):
         flash('Debes indicar un motivo para archivar la reserva', 'error')
         return redirect(url_for('admin.camping_pre_reservations'))
 
-    if reservation.status in ['confirmado', 'activo']:
-        service = reservation.service
-        if service:
-            service.available_units = min(service.total_units, service.available_units + 1)
+    release_pre_reservation_inventory(reservation)
 
     reservation.status = 'archivado_admin'
     reservation.archive_reason = reason
@@ -244,9 +235,8 @@ def complete_active_reservation(reservation_id):
         flash('Solo se pueden finalizar estadías activas', 'error')
         return redirect(url_for('admin.camping_pre_reservations'))
 
-    service = reservation.service
-    if service:
-        service.available_units = min(service.total_units, service.available_units + 1)
+    # Salida anticipada: se liberan las noches que quedaban por delante.
+    release_pre_reservation_inventory(reservation)
     
     reservation.status = 'completado'
     reservation.completed_at = datetime.utcnow()
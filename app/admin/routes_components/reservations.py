@@ -3,21 +3,13 @@ from flask_login import login_required
 from app.extensions import db
 from app.models.agenda import AppointmentSlot, Reservation
 from app.utils.logging_helper import log_activity
+from app.services.reservation_codes import add_with_unique_code, reservation_codes
 from sqlalchemy.orm import joinedload
 from .. import admin_bp
 from datetime import date
-import random
-import string
 import uuid
 
 
-def _generate_reservation_code() -> str:
-    while True:
-        code = f"RSV-{''.join(random.choice(string.digits) for _ in range(6))}"
-        if not Reservation.query.filter_by(code=code).first():
-            return code
-
-
 @admin_bp.route('/reservations', methods=['GET', 'POST'])
 @login_required
 def reservations():
@@ -51,7 +43,6 @@ def reservations():
                 return redirect(url_for('admin.reservations'))
 
             reservation = Reservation(
-                code=_generate_reservation_code(),
                 ci=ci,
                 first_name=first_name,
                 last_name=last_name,
@@ -68,7 +59,7 @@ def reservations():
             )
 
             slot.current_bookings += 1
-            db.session.add(reservation)
+            add_with_unique_code(reservation, reservation_codes)
             db.session.commit()
 
             log_activity('RESERVATION_CREATE_ADMIN', f'Reserva creada manualmente: {reservation.code}')
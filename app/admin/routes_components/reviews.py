@@ -1,12 +1,20 @@
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required
 from app.extensions import db
-from app.services.cache_service import cache_service
+from app.services.cache_service import NS_SERVICES, NS_TESTIMONIALS
+from app.services.cache_warmer import schedule_public_refresh
 from app.models.camping import CampingService, ServiceTestimonial, MediaAsset
 from app.utils.logging_helper import log_activity
 from app.services.minio_service import minio_service
+from app.services.testimonial_service import MAX_RATING, admin_testimonial_rows
 from .. import admin_bp
 
+
+def _form_rating() -> int:
+    """Calificación del formulario (0 = sin calificar)."""
+    rating = request.form.get('rating', type=int) or 0
+    return min(max(rating, 0), MAX_RATING)
+
 @admin_bp.route('/camping/reviews', methods=['GET', 'POST'])
 @admin_bp.route('/camping/testimonios', methods=['GET', 'POST'])
 @login_required
@@ -24,6 +32,7 @@ def camping_testimonials():
         testimonial.comment_pt = (request.form.get('comment_pt') or '').strip()
         testimonial.is_published = request.form.get('is_published') == 'on'
         testimonial.service_id = request.form.get('service_id', type=int)
+        testimonial.rating = _form_rating()
 
         if not all([testimonial.author_name, testimonial.comment_es, testimonial.comment_en, testimonial.comment_pt]):
             flash('Completa nombre y comentarios en los 3 idiomas', 'error')
@@ -52,12 +61,12 @@ def camping_testimonials():
             ))
 
         db.session.commit()
-        cache_service.clear_prefix("public_")
+        schedule_public_refresh(NS_TESTIMONIALS, NS_SERVICES)
         log_activity('TESTIMONIAL_UPSERT', f'Testimonio guardado ID {testimonial.id}')
         flash('Testimonio guardado', 'success')
         return redirect(url_for('admin.camping_testimonials'))
 
-    testimonials_list = ServiceTestimonial.query.order_by(ServiceTestimonial.created_at.desc()).all()
+    testimonials_list = admin_testimonial_rows()
     services_list = CampingService.query.order_by(CampingService.name_es.asc()).all()
     return render_template('admin/camping_reviews.html', testimonials=testimonials_list, services=services_list)
 
@@ -75,6 +84,7 @@ def edit_camping_testimonial(testimonial_id):
         testimonial.comment_pt = (request.form.get('comment_pt') or '').strip()
         testimonial.is_published = request.form.get('is_published') == 'on'
         testimonial.service_id = request.form.get('service_id', type=int) or None
+        testimonial.rating = _form_rating()
 
         if not all([testimonial.author_name, testimonial.comment_es, testimonial.comment_en, testimonial.comment_pt]):
             flash('Completa nombre y comentarios en los 3 idiomas', 'error')
@@ -105,7 +115,7 @@ def edit_camping_testimonial(testimonial_id):
             ))
 
         db.session.commit()
-        cache_service.clear_prefix("public_")
+        schedule_public_refresh(NS_TESTIMONIALS, NS_SERVICES)
         log_activity('TESTIMONIAL_UPDATE', f'Testimonio actualizado ID {testimonial.id}')
         flash('Testimonio actualizado correctamente', 'success')
         return redirect(url_for('admin.camping_testimonials'))
@@ -121,7 +131,7 @@ def delete_camping_testimonial(testimonial_id):
     testimonial = ServiceTestimonial.query.get_or_404(testimonial_id)
     db.session.delete(testimonial)
     db.session.commit()
-    cache_service.clear_prefix("public_")
+    schedule_public_refresh(NS_TESTIMONIALS, NS_SERVICES)
 
     log_activity('TESTIMONIAL_DELETE', f'Testimonio eliminado ID {testimonial_id}')
     flash('Testimonio eliminado', 'success')
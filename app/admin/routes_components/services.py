@@ -1,10 +1,14 @@
 from flask import render_template, request, redirect, url_for, flash
 from flask_login import login_required
 from app.extensions import db
-from app.services.cache_service import cache_service
+from app.services.cache_service import service_namespace, NS_SERVICES
+from app.services.cache_warmer import schedule_public_refresh
 from app.models.camping import CampingService, ServiceImage, MediaAsset, Amenity
 from app.utils.logging_helper import log_activity
 from app.services.minio_service import minio_service
+from app.services.inventory_service import remaining_units_for_night
+from app.services.catalog_service import load_service_images
+from app.services.search_index import reindex_service
 from .. import admin_bp
 
 @admin_bp.route('/camping/services', methods=['GET', 'POST'])
@@ -43,7 +47,6 @@ def camping_services():
         service.currency = (request.form.get('currency') or 'UYU').strip().upper()
         service.capacity = request.form.get('capacity', type=int) or 1
         service.total_units = request.form.get('total_units', type=int) or 0
-        service.available_units = request.form.get('available_units', type=int) or 0
         service.is_featured = request.form.get('is_featured') == 'on'
         service.is_promo = request.form.get('is_promo') == 'on'
         service.is_active = request.form.get('is_active') == 'on'
@@ -54,6 +57,8 @@ def camping_services():
             db.session.add(service)
             db.session.flush()
 
+        reindex_service(service)
+
         uploaded_images = request.files.getlist('images')
         if uploaded_images:
             valid_images = [img for img in uploaded_images if img and img.filename]
@@ -84,14 +89,22 @@ def camping_services():
                 ))
 
         db.session.commit()
-        cache_service.clear_prefix("public_")
+        schedule_public_refresh(NS_SERVICES, service_namespace(service.id))
         log_activity('SERVICE_UPSERT', f'Servicio guardado: {service.slug}')
         flash('Servicio guardado correctamente', 'success')
         return redirect(url_for('admin.camping_services'))
 
     all_services = CampingService.query.order_by(CampingService.created_at.desc()).all()
     all_amenities = Amenity.query.order_by(Amenity.name_es.asc()).all()
-    return render_template('admin/camping_services.html', services=all_services, amenities=all_amenities)
+    availability = remaining_units_for_night(all_services)
+    galleries = load_service_images(service.id for service in all_services)
+    return render_template(
+        'admin/camping_services.html',
+        services=all_services,
+        amenities=all_amenities,
+        availability=availability,
+        galleries=galleries,
+    )
 
 
 @admin_bp.route('/camping/services/<int:service_id>/edit', methods=['GET', 'POST'])
@@ -126,7 +139,6 @@ def edit_camping_service(service_id):
         service.currency = (request.form.get('currency') or 'UYU').strip().upper()
         service.capacity = request.form.get('capacity', type=int) or 1
         service.total_units = request.form.get('total_units', type=int) or 0
-        service.available_units = request.form.get('available_units', type=int) or 0
         service.is_featured = request.form.get('is_featured') == 'on'
         service.is_promo = request.form.get('is_promo') == 'on'
         service.is_active = request.form.get('is_active') == 'on'
@@ -134,6 +146,7 @@ def edit_camping_service(service_id):
         service.amenities = Amenity.query.filter(Amenity.id.in_(amenity_ids)).all()
 
         db.session.add(service)
+        reindex_service(service)
 
         uploaded_images = request.files.getlist('images')
         valid_images = [img for img in uploaded_images if img and img.filename]
@@ -163,13 +176,18 @@ def edit_camping_service(service_id):
                 ))
 
         db.session.commit()
-        cache_service.clear_prefix("public_")
+        schedule_public_refresh(NS_SERVICES, service_namespace(service.id))
         log_activity('SERVICE_UPDATE', f'Servicio actualizado: {service.slug}')
         flash('Servicio actualizado correctamente', 'success')
         return redirect(url_for('admin.camping_services'))
 
     available_amenities = Amenity.query.order_by(Amenity.name_es.asc()).all()
-    return render_template('admin/camping_service_edit.html', service=service, available_amenities=available_amenities)
+    return render_template(
+        'admin/camping_service_edit.html',
+        service=service,
+        available_amenities=available_amenities,
+        available_tonight=service.available_units_on(),
+    )
 
 
 @admin_bp.route('/camping/services/image/<int:image_id>/delete', methods=['POST'])
@@ -185,6 +203,7 @@ def delete_service_image(image_id):
     
     db.session.delete(image)
     db.session.commit()
+    schedule_public_refresh(NS_SERVICES)
     
     log_activity('SERVICE_IMAGE_DELETE', f'Imagen eliminada de servicio ID: {service_id}')
     flash('Imagen eliminada de la galería', 'success')
@@ -198,7 +217,7 @@ def delete_camping_service(service_id):
     slug = service.slug
     db.session.delete(service)
     db.session.commit()
-    cache_service.clear_prefix("public_")
+    schedule_public_refresh(NS_SERVICES, service_namespace(service_id))
     log_activity('SERVICE_DELETE', f'Servicio eliminado: {slug}')
     flash('Servicio eliminado', 'success')
     return redirect(url_for('admin.camping_services'))
@@ -1,17 +1,42 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import json
-import random
-import string
 import uuid
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from werkzeug.datastructures import MultiDict
 from wtforms import Form, StringField, IntegerField, DateField, TextAreaField
 from wtforms.validators import DataRequired, Email, Length, NumberRange
 from app.extensions import db
-from app.services.cache_service import cache_service
-from app.models.camping import CampingService, HeroImage, ServiceTestimonial, PreReservation, Suggestion
+from app.services.cache_service import cache_service, entry_ttl, NS_SERVICES
+from app.models.camping import CampingService, PreReservation, Suggestion
 from app.services.email_service import send_camping_pre_reservation_email
-from app.services.reservation_service import archive_expired_pre_reservations, confirm_pre_reservation
+from app.services.reservation_service import confirm_pre_reservation
+from app.services.reservation_codes import add_with_unique_code, pre_reservation_codes
+from app.services.catalog_service import build_public_catalog
+from app.services.search_index import normalize_query
+from app.services.public_payloads import (
+    cached_json,
+    hero_images_payload,
+    services_payload,
+    testimonials_cursor_payload,
+    testimonials_payload,
+    TESTIMONIALS_PER_PAGE,
+)
+from app.services.testimonial_service import decode_cursor, MAX_CURSOR_PAGE_SIZE
+from app.services.inventory_service import (
+    remaining_units,
+    availability_calendar,
+    search_available_services,
+    search_index_key,
+)
+
+# Máximo de noches que puede pedir el calendario de disponibilidad en una consulta.
+MAX_AVAILABILITY_NIGHTS = 366
+
+# Vigencia en caché de una búsqueda por fechas.
+SEARCH_CACHE_TIMEOUT = 300
+
+# Segundos que navegadores/CDN pueden reutilizar una respuesta pública sin revalidar.
+PUBLIC_MAX_AGE = 60
 
 api_bp = Blueprint('api', __name__)
 
@@ -45,10 +70,23 @@ def _safe_lang(value: str | None) -> str:
     return 'es'
 
 
-def _generate_pre_reservation_code() -> str:
-    letters = ''.join(random.choice(string.ascii_uppercase) for _ in range(3))
-    numbers = ''.join(random.choice(string.digits) for _ in range(4))
-    return f'ARQ-{letters}-{numbers}'
+def _json_response(etag: str, body: bytes):
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={PUBLIC_MAX_AGE}'
+    return response
+
+
+def _cached_json_response(cache_key: str, build, timeout: int = 300, namespaces: tuple = ()):
+    """
+    Sirve una respuesta JSON pública desde el caché de respuestas codificadas.
+    En un hit no se toca la base ni el encoder: se compara If-None-Match con
+    el ETag guardado (304) o se devuelven los bytes tal cual.
+    """
+    return _json_response(*cached_json(cache_key, build, timeout=timeout, namespaces=namespaces))
 
 
 def _request_payload() -> dict:
@@ -73,81 +111,109 @@ def _request_payload() -> dict:
 
 @api_bp.route('/public/services', methods=['GET'])
 def public_services():
-    archive_expired_pre_reservations()
     lang = _safe_lang(request.args.get('lang'))
-    search = (request.args.get('q') or '').strip().lower()
+    search = normalize_query(request.args.get('q'))
     service_type = (request.args.get('type') or '').strip().lower()
+    sort = (request.args.get('sort') or '').strip().lower()
+    return _json_response(*services_payload(lang, search, service_type, sort))
 
-    # Intento obtener de caché
-    cache_key = f"public_services_{lang}_{search}_{service_type}"
-    cached_data = cache_service.get(cache_key)
-    if cached_data:
-        return jsonify(cached_data)
 
-    query = CampingService.query.filter_by(is_active=True)
-    if service_type and service_type != 'all':
-        query = query.filter(CampingService.service_type == service_type)
+@api_bp.route('/public/services/search', methods=['GET'])
+def public_services_search():
+    lang = _safe_lang(request.args.get('lang'))
+    guests = request.args.get('guests', 1, type=int)
+    try:
+        check_in = datetime.strptime(request.args.get('check_in') or '', '%Y-%m-%d').date()
+        check_out = datetime.strptime(request.args.get('check_out') or '', '%Y-%m-%d').date()
+    except ValueError:
+        return jsonify({'error': 'check_in y check_out son obligatorios (YYYY-MM-DD)'}), 400
+
+    if check_in >= check_out:
+        return jsonify({'error': 'La fecha de salida debe ser posterior a la de ingreso'}), 400
 
-    services = query.order_by(CampingService.is_featured.desc(), CampingService.created_at.desc()).all()
+    if (check_out - check_in).days > MAX_AVAILABILITY_NIGHTS:
+        return jsonify({'error': f'El rango máximo es de {MAX_AVAILABILITY_NIGHTS} noches'}), 400
+
+    if guests < 1:
+        return jsonify({'error': 'La cantidad de huéspedes debe ser al menos 1'}), 400
+
+    cache_key = cache_service.versioned_key(
+        f"public_search_{check_in.isoformat()}_{check_out.isoformat()}_{guests}_{lang}",
+        NS_SERVICES,
+    )
 
-    if search:
-        services = [
-            service for service in services
-            if search in service.localized_name(lang).lower()
-            or search in service.localized_description(lang).lower()
-            or search in service.service_type.lower()
-        ]
+    def build():
+        candidates = search_available_services(check_in, check_out, guests)
+        # Cada servicio candidato indexa esta búsqueda: un cambio de reservas en
+        # ese servicio invalida solo las búsquedas en las que participó. El
+        # índice vive lo mismo que la entrada (incluida la ventana stale), si
+        # no una entrada vencida pero servible quedaría sin invalidar.
+        cache_service.add_to_indexes(
+            [search_index_key(service.id) for service, _ in candidates],
+            cache_key,
+            timeout=entry_ttl(SEARCH_CACHE_TIMEOUT),
+        )
+
+        available = [(service, remaining) for service, remaining in candidates if remaining > 0]
+        return build_public_catalog(
+            [service for service, _ in available],
+            lang,
+            availability={service.id: remaining for service, remaining in available},
+        )
+
+    return _cached_json_response(cache_key, build, timeout=SEARCH_CACHE_TIMEOUT)
+
+
+@api_bp.route('/public/services/<int:service_id>/availability', methods=['GET'])
+def public_service_availability(service_id):
+    try:
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else date.today()
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else start + timedelta(days=30)
+    except ValueError:
+        return jsonify({'error': 'Formato de fecha inválido (YYYY-MM-DD)'}), 400
+
+    if end <= start:
+        return jsonify({'error': 'La fecha final debe ser posterior a la inicial'}), 400
+
+    if (end - start).days > MAX_AVAILABILITY_NIGHTS:
+        return jsonify({'error': f'El rango máximo es de {MAX_AVAILABILITY_NIGHTS} noches'}), 400
+
+    service = CampingService.query.filter_by(id=service_id, is_active=True).first()
+    if not service:
+        return jsonify({'error': 'Servicio no encontrado'}), 404
 
-    result = [service.to_public_dict(lang) for service in services]
-    
-    # Guardar en caché por 5 minutos
-    cache_service.set(cache_key, result, timeout=300)
-    
-    return jsonify(result)
+    return jsonify({
+        'service_id': service.id,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'total': service.total_units,
+        'nights': availability_calendar(service, start, end),
+    })
 
 
 @api_bp.route('/public/hero-images', methods=['GET'])
 def public_hero_images():
-    cache_key = "public_hero_images"
-    cached_data = cache_service.get(cache_key)
-    if cached_data:
-        return jsonify(cached_data)
-
-    images = HeroImage.query.filter_by(is_active=True).order_by(HeroImage.sort_order.asc(), HeroImage.id.asc()).all()
-    result = [img.url for img in images]
-    
-    cache_service.set(cache_key, result, timeout=3600) # Cache por 1 hora
-    return jsonify(result)
+    return _json_response(*hero_images_payload())
 
 
 def _public_testimonials_response():
     lang = _safe_lang(request.args.get('lang'))
     service_id = request.args.get('service_id', type=int)
     page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 8, type=int)
-    
-    cache_key = f"public_testimonios_{lang}_{service_id}_{page}_{per_page}"
-    cached_data = cache_service.get(cache_key)
-    if cached_data:
-        return jsonify(cached_data)
-
-    query = ServiceTestimonial.query.filter_by(is_published=True)
-    if service_id:
-        query = query.filter_by(service_id=service_id)
-        
-    pagination = query.order_by(ServiceTestimonial.created_at.desc()).paginate(page=page, per_page=per_page, error_out=False)
-    
-    testimonials = [testimonial.to_public_dict(lang) for testimonial in pagination.items]
-    result = {
-        'testimonials': testimonials,
-        'reviews': testimonials,
-        'total': pagination.total,
-        'pages': pagination.pages,
-        'current_page': pagination.page
-    }
-
-    cache_service.set(cache_key, result, timeout=300)
-    return jsonify(result)
+    per_page = request.args.get('per_page', TESTIMONIALS_PER_PAGE, type=int)
+
+    # Variante por cursor: `cursor` vacío pide la primera página.
+    if 'cursor' in request.args:
+        cursor = request.args.get('cursor') or None
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'error': 'Cursor inválido'}), 400
+        per_page = max(1, min(per_page, MAX_CURSOR_PAGE_SIZE))
+        return _json_response(*testimonials_cursor_payload(lang, service_id, cursor, per_page))
+
+    return _json_response(*testimonials_payload(lang, service_id, page, per_page))
 
 
 @api_bp.route('/public/testimonios', methods=['GET'])
@@ -162,7 +228,6 @@ def public_reviews_alias():
 
 @api_bp.route('/public/pre-reservations', methods=['POST'])
 def create_pre_reservation():
-    archive_expired_pre_reservations()
     payload = _request_payload()
     form = PreReservationForm(formdata=MultiDict(payload))
 
@@ -179,11 +244,10 @@ def create_pre_reservation():
     if form.guests.data > service.capacity:
         return jsonify({'error': 'La cantidad de huéspedes supera la capacidad del servicio'}), 400
 
-    if service.available_units <= 0:
+    if remaining_units(service, form.check_in.data, form.check_out.data) <= 0:
         return jsonify({'error': 'No hay disponibilidad para este servicio'}), 400
 
     reservation = PreReservation(
-        code=_generate_pre_reservation_code(),
         service_id=service.id,
         full_name=form.full_name.data.strip(),
         email=form.email.data.strip().lower(),
@@ -199,11 +263,10 @@ def create_pre_reservation():
         expires_at=datetime.utcnow() + timedelta(hours=48),
     )
 
-    db.session.add(reservation)
+    add_with_unique_code(reservation, pre_reservation_codes)
+    send_camping_pre_reservation_email(reservation, service)
     db.session.commit()
 
-    send_camping_pre_reservation_email(reservation)
-
     return jsonify({
         'message': 'Pre-reserva registrada. Revisa tu email para los próximos pasos.',
         'code': reservation.code,
@@ -213,7 +276,6 @@ def create_pre_reservation():
 
 @api_bp.route('/public/pre-reservations/confirm', methods=['GET'])
 def confirm_public_pre_reservation():
-    archive_expired_pre_reservations()
     token = request.args.get('token')
     if not token:
         return jsonify({'error': 'Token requerido'}), 400
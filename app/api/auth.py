@@ -35,10 +35,10 @@ def api_login():
         # Save code in DB
         tf_code = TwoFactorCode(user_id=user.id, code=code)
         db.session.add(tf_code)
-        db.session.commit()
         
-        # Send mail
+        # Queue mail (same transaction as the code)
         send_2fa_email(user.email, code)
+        db.session.commit()
         
         log_activity("API_LOGIN_STEP1_SUCCESS", f"Credenciales API válidas. 2FA enviado a {user.email}", user)
         return jsonify({
@@ -1,4 +1,5 @@
 import click
+from flask import current_app
 from flask.cli import with_appcontext
 from app.extensions import db
 from app.models.user import AdminUser
@@ -36,3 +37,197 @@ def archive_expired_pre_reservations_command():
     """Archiva pre-reservas pendientes vencidas (>48h)."""
     total = archive_expired_pre_reservations()
     print(f"Pre-reservas archivadas: {total}")
+
+
+@click.command('run-pre-reservation-sweeper')
+@click.option('--interval', type=int, default=None, help='Segundos entre barridos (default: PRE_RESERVATION_SWEEP_INTERVAL).')
+@click.option('--once', is_flag=True, help='Ejecuta un único barrido y termina.')
+@with_appcontext
+def run_pre_reservation_sweeper_command(interval, once):
+    """Proceso dedicado que barre expiraciones y finalizaciones de pre-reservas."""
+    from app.services.lifecycle_sweeper import pre_reservation_sweeper
+
+    app = current_app._get_current_object()
+    if once:
+        touched = pre_reservation_sweeper.run_once(app, force=True) or {}
+        print(f"Pre-reservas expiradas: {touched.get('expired', 0)}, completadas: {touched.get('completed', 0)}")
+        return
+
+    pre_reservation_sweeper.interval = max(1, interval or app.config.get('PRE_RESERVATION_SWEEP_INTERVAL', 60))
+    try:
+        pre_reservation_sweeper.run_forever(app)
+    except KeyboardInterrupt:
+        pre_reservation_sweeper.stop()
+
+
+@click.command('run-email-sender')
+@click.option('--interval', type=int, default=None, help='Segundos entre revisiones (default: EMAIL_OUTBOX_INTERVAL).')
+@click.option('--lane', type=click.Choice(['urgente', 'normal', 'all']), default='all', help='Carril a atender.')
+@click.option('--once', is_flag=True, help='Vacía la cola una vez y termina.')
+@with_appcontext
+def run_email_sender_command(interval, lane, once):
+    """Proceso dedicado que envía los correos del outbox (un hilo por carril)."""
+    import time
+    from app.services.email_sender import email_senders
+
+    app = current_app._get_current_object()
+    senders = [email_senders[lane]] if lane != 'all' else list(email_senders.values())
+    if once:
+        for sender in senders:
+            totals = sender.run_once(app, force=True) or {}
+            print(f"{sender.name}: enviados {totals.get('sent', 0)}, a reintentar {totals.get('retry', 0)}, "
+                  f"fallidos {totals.get('failed', 0)}, vencidos {totals.get('expired', 0)}")
+        return
+
+    for sender in senders:
+        sender.interval = max(1, interval or app.config.get('EMAIL_OUTBOX_INTERVAL', 10))
+        sender.start_in_background(app)
+    try:
+        while any(sender.is_running() for sender in senders):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for sender in senders:
+            sender.stop()
+
+
+@click.command('run-email-campaigns')
+@click.option('--interval', type=int, default=None, help='Segundos entre corridas (default: EMAIL_CAMPAIGN_INTERVAL).')
+@click.option('--once', is_flag=True, help='Ejecuta una única corrida y termina.')
+@with_appcontext
+def run_email_campaigns_command(interval, once):
+    """Encola los recordatorios de llegada, salida y vencimiento de pre-reservas."""
+    from app.services.email_campaigns import email_campaigns
+
+    app = current_app._get_current_object()
+    if once:
+        queued = email_campaigns.run_once(app, force=True) or {}
+        print(f"Correos de campaña encolados: {sum(queued.values())} {queued}")
+        return
+
+    email_campaigns.interval = max(1, interval or app.config.get('EMAIL_CAMPAIGN_INTERVAL', 3600))
+    try:
+        email_campaigns.run_forever(app)
+    except KeyboardInterrupt:
+        email_campaigns.stop()
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Reconstruye el índice de búsqueda del catálogo de servicios."""
+    from app.services.search_index import rebuild_search_index
+
+    total = rebuild_search_index()
+    print(f"Términos indexados: {total}")
+
+
+@click.command('recompute-ratings')
+@with_appcontext
+def recompute_ratings_command():
+    """Recalcula las calificaciones promedio de los servicios desde los testimonios."""
+    from app.services.cache_service import NS_SERVICES
+    from app.services.cache_warmer import schedule_public_refresh
+    from app.services.testimonial_service import recompute_service_ratings
+
+    changed = recompute_service_ratings()
+    if changed:
+        schedule_public_refresh(NS_SERVICES)
+    print(f"Servicios corregidos: {changed}")
+
+
+@click.command('bench-argon2')
+@click.option('--concurrency', type=int, default=16, help='Logins simultáneos simulados.')
+@click.option('--requests', 'total', type=int, default=200, help='Verificaciones totales.')
+@with_appcontext
+def bench_argon2_command(concurrency, total):
+    """Mide la latencia de login (verificación Argon2) con carga concurrente: directo vs pool."""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from app.services.password_hasher import PasswordHashingBusy, password_hasher
+
+    secret = 'bench-password'
+    hashed = password_hasher.hasher.hash(secret)
+
+    def percentile(values, pct):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * pct / 100))] * 1000
+
+    print(f"Argon2 t={password_hasher.hasher.time_cost} m={password_hasher.hasher.memory_cost}KiB "
+          f"p={password_hasher.hasher.parallelism}; pool={password_hasher.max_concurrency}, "
+          f"cola={password_hasher.max_queue}; {concurrency} hilos, {total} logins")
+    print(f"{'modo':<8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'máx ms':>9} {'rechazos':>9} {'seg':>7}")
+    for mode, verify in (
+        ('directo', lambda: password_hasher.hasher.verify(hashed, secret)),
+        ('pool', lambda: password_hasher.verify(hashed, secret)),
+    ):
+        latencies = []
+        rejected = 0
+
+        def login():
+            nonlocal rejected
+            started = time.perf_counter()
+            try:
+                verify()
+            except PasswordHashingBusy:
+                rejected += 1
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(total):
+                executor.submit(login)
+        elapsed = time.perf_counter() - started
+        print(f"{mode:<8} {percentile(latencies, 50):>9.1f} {percentile(latencies, 95):>9.1f} "
+              f"{percentile(latencies, 99):>9.1f} {max(latencies) * 1000:>9.1f} {rejected:>9} {elapsed:>7.2f}")
+
+
+@click.command('bench-cache-codec')
+@click.option('--iterations', type=int, default=200, help='Repeticiones por combinación.')
+@with_appcontext
+def bench_cache_codec_command(iterations):
+    """Compara serializadores y compresión del caché con payloads públicos reales."""
+    import time
+    from app.models.camping import CampingService
+    from app.services.cache_codec import CacheCodec, available_serializers
+    from app.services.catalog_service import build_public_catalog
+    from app.services.testimonial_service import public_testimonials_query, public_testimonial_dict
+
+    services = CampingService.query.filter_by(is_active=True).all()
+    testimonials = {lang: public_testimonials_query(lang).all() for lang in ('es', 'en')}
+    if not services and not testimonials['es']:
+        print("No hay servicios ni testimonios publicados para medir.")
+        return
+
+    payloads = {}
+    for lang in ('es', 'en'):
+        payloads[f"catalogo_{lang}"] = build_public_catalog(services, lang)
+        payloads[f"testimonios_{lang}"] = [public_testimonial_dict(row) for row in testimonials[lang]]
+
+    print(f"{'payload':<16} {'codec':<14} {'bytes':>9} {'encode µs':>11} {'decode µs':>11}")
+    for name, value in payloads.items():
+        for serializer in available_serializers():
+            for compress_min_bytes in (0, current_app.config.get('CACHE_COMPRESS_MIN_BYTES', 2048)):
+                codec = CacheCodec(serializer, compress_min_bytes=compress_min_bytes)
+                label = f"{serializer}{'+zlib' if compress_min_bytes else ''}"
+
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    encoded = codec.encode_value(value)
+                encode_us = (time.perf_counter() - started) / iterations * 1e6
+
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    codec.decode_value(encoded)
+                decode_us = (time.perf_counter() - started) / iterations * 1e6
+
+                print(f"{name:<16} {label:<14} {len(encoded):>9} {encode_us:>11.1f} {decode_us:>11.1f}")
+
+
+@click.command('warm-cache')
+@with_appcontext
+def warm_cache_command():
+    """Pre-renderiza en caché los payloads públicos de cada idioma."""
+    from app.services.cache_warmer import warm_public_cache
+
+    result = warm_public_cache()
+    print(f"Payloads listos: {result['warmed']} (con error: {result['failed']}) en {result['seconds']:.2f}s")
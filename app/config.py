@@ -42,8 +42,65 @@ class Config:
     REDIS_DB = os.environ.get('REDIS_DB', '0')
     REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD')
     REDIS_URL = build_redis_url_from_env(os.environ)
+    # Pool compartido por caché, limiter y leases (por worker).
+    REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS') or 10)
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get('REDIS_HEALTH_CHECK_INTERVAL') or 5)
+    # Tier en memoria de cada worker delante de Redis (0 lo desactiva).
+    CACHE_LOCAL_MAXSIZE = int(os.environ.get('CACHE_LOCAL_MAXSIZE') or 512)
+    CACHE_LOCAL_TTL = int(os.environ.get('CACHE_LOCAL_TTL') or 30)
+    # Serialización de valores del caché: auto (orjson si está instalado), json, orjson o msgpack.
+    CACHE_SERIALIZER = os.environ.get('CACHE_SERIALIZER') or 'auto'
+    # Payloads de este tamaño o más se guardan comprimidos con zlib (0 lo desactiva).
+    CACHE_COMPRESS_MIN_BYTES = int(os.environ.get('CACHE_COMPRESS_MIN_BYTES') or 2048)
+    CACHE_COMPRESS_LEVEL = int(os.environ.get('CACHE_COMPRESS_LEVEL') or 6)
+    # Circuit breaker del caché: fallas (o llamadas lentas) consecutivas para abrirlo y segundos abierto.
+    CACHE_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('CACHE_BREAKER_FAILURE_THRESHOLD') or 5)
+    CACHE_BREAKER_SLOW_CALL_MS = int(os.environ.get('CACHE_BREAKER_SLOW_CALL_MS') or 250)
+    CACHE_BREAKER_RESET_TIMEOUT = int(os.environ.get('CACHE_BREAKER_RESET_TIMEOUT') or 30)
 
     # Flask-Limiter
     RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
 
     CORS_ALLOWED_ORIGINS = _parse_list_from_env('CORS_ORIGINS')
+
+    # Barrido de ciclo de vida de pre-reservas (expiración / finalización)
+    PRE_RESERVATION_SWEEP_INTERVAL = int(os.environ.get('PRE_RESERVATION_SWEEP_INTERVAL') or 60)
+    PRE_RESERVATION_SWEEPER_IN_WORKERS = os.environ.get('PRE_RESERVATION_SWEEPER_IN_WORKERS', 'True') == 'True'
+    # Pre-renderizado de payloads públicos desde los workers (al arrancar, tras ediciones y periódico).
+    CACHE_WARM_IN_WORKERS = os.environ.get('CACHE_WARM_IN_WORKERS', 'True') == 'True'
+    CACHE_WARM_INTERVAL = int(os.environ.get('CACHE_WARM_INTERVAL') or 240)
+
+    # Códigos de pre-reservas y reservas: clave de la permutación (no cambiarla
+    # una vez emitidos códigos) y valores de secuencia reservados por proceso.
+    RESERVATION_CODE_KEY = os.environ.get('RESERVATION_CODE_KEY')
+    RESERVATION_CODE_BLOCK_SIZE = int(os.environ.get('RESERVATION_CODE_BLOCK_SIZE') or 20)
+
+    # Outbox de correos: envío desde los workers, lotes, conexiones SMTP
+    # simultáneas y reintentos con backoff exponencial.
+    EMAIL_SENDER_IN_WORKERS = os.environ.get('EMAIL_SENDER_IN_WORKERS', 'True') == 'True'
+    EMAIL_OUTBOX_INTERVAL = int(os.environ.get('EMAIL_OUTBOX_INTERVAL') or 10)
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE') or 50)
+    EMAIL_SENDER_POOL_SIZE = int(os.environ.get('EMAIL_SENDER_POOL_SIZE') or 2)
+    # Carril urgente (2FA): presupuesto propio, independiente del volumen normal.
+    EMAIL_URGENT_SENDER_POOL_SIZE = int(os.environ.get('EMAIL_URGENT_SENDER_POOL_SIZE') or 1)
+    EMAIL_URGENT_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_URGENT_OUTBOX_BATCH_SIZE') or 10)
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS') or 6)
+    EMAIL_RETRY_BASE_SECONDS = int(os.environ.get('EMAIL_RETRY_BASE_SECONDS') or 30)
+    EMAIL_RETRY_MAX_SECONDS = int(os.environ.get('EMAIL_RETRY_MAX_SECONDS') or 3600)
+
+    # Campañas de correo: recordatorio de llegada, aviso de salida y aviso de
+    # vencimiento de pre-reservas pendientes.
+    EMAIL_CAMPAIGNS_IN_WORKERS = os.environ.get('EMAIL_CAMPAIGNS_IN_WORKERS', 'True') == 'True'
+    EMAIL_CAMPAIGN_INTERVAL = int(os.environ.get('EMAIL_CAMPAIGN_INTERVAL') or 3600)
+    EMAIL_CAMPAIGN_BATCH_SIZE = int(os.environ.get('EMAIL_CAMPAIGN_BATCH_SIZE') or 200)
+    PRE_RESERVATION_EXPIRY_NOTICE_HOURS = int(os.environ.get('PRE_RESERVATION_EXPIRY_NOTICE_HOURS') or 12)
+
+    # Argon2 (contraseñas y códigos 2FA): parámetros del hash y pool acotado
+    # por proceso. Cambiar los parámetros re-hashea cada contraseña en su
+    # próximo login.
+    ARGON2_TIME_COST = int(os.environ.get('ARGON2_TIME_COST') or 3)
+    ARGON2_MEMORY_COST = int(os.environ.get('ARGON2_MEMORY_COST') or 65536)  # KiB
+    ARGON2_PARALLELISM = int(os.environ.get('ARGON2_PARALLELISM') or 4)
+    ARGON2_MAX_CONCURRENCY = int(os.environ.get('ARGON2_MAX_CONCURRENCY') or 2)
+    ARGON2_MAX_QUEUE = int(os.environ.get('ARGON2_MAX_QUEUE') or 32)
+    ARGON2_QUEUE_TIMEOUT = float(os.environ.get('ARGON2_QUEUE_TIMEOUT') or 5)
@@ -1,7 +1,7 @@
 import os
 import time
 from flask import request, g
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST, CollectorRegistry, multiprocess
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST, CollectorRegistry, multiprocess
 
 # Define Metrics
 http_requests_total = Counter(
@@ -16,6 +16,142 @@ http_request_duration_seconds = Histogram(
     ["method", "endpoint"]
 )
 
+# Barrido de ciclo de vida de pre-reservas (expiración / finalización)
+pre_reservation_sweep_last_run_timestamp = Gauge(
+    "pre_reservation_sweep_last_run_timestamp_seconds",
+    "Unix timestamp of the last completed pre-reservation lifecycle sweep",
+    multiprocess_mode="max"
+)
+
+pre_reservation_sweep_last_rows = Gauge(
+    "pre_reservation_sweep_last_rows",
+    "Rows touched by the last pre-reservation lifecycle sweep",
+    ["transition"],
+    multiprocess_mode="mostrecent"
+)
+
+pre_reservation_sweep_rows_total = Counter(
+    "pre_reservation_sweep_rows_total",
+    "Total rows touched by pre-reservation lifecycle sweeps",
+    ["transition"]
+)
+
+pre_reservation_sweep_duration_seconds = Histogram(
+    "pre_reservation_sweep_duration_seconds",
+    "Duration of pre-reservation lifecycle sweeps in seconds"
+)
+
+# Caché de dos niveles (memoria del worker / Redis)
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "Cache lookups by tier and result",
+    ["tier", "result"]
+)
+
+# Pool Redis compartido (ver redis_utils.RedisPool)
+redis_up = Gauge(
+    "redis_up",
+    "Whether the last Redis health check succeeded (1) or failed (0)",
+    multiprocess_mode="livemin"
+)
+
+redis_pool_connections = Gauge(
+    "redis_pool_connections",
+    "Connections of the shared Redis pool by state",
+    ["state"],
+    multiprocess_mode="livesum"
+)
+
+redis_pool_max_connections = Gauge(
+    "redis_pool_max_connections",
+    "Configured size of the shared Redis pool",
+    multiprocess_mode="livesum"
+)
+
+# Circuit breakers (ver services/circuit_breaker.py)
+circuit_breaker_state = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open",
+    ["name"],
+    multiprocess_mode="livemax"
+)
+
+circuit_breaker_transitions_total = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state transitions",
+    ["name", "state"]
+)
+
+# Pre-renderizado de payloads públicos (cache warmer)
+cache_warm_payloads_total = Counter(
+    "cache_warm_payloads_total",
+    "Public payloads processed by the cache warmer",
+    ["result"]
+)
+
+cache_warm_duration_seconds = Histogram(
+    "cache_warm_duration_seconds",
+    "Duration of full cache warm-up runs in seconds"
+)
+
+# Outbox de correos
+email_outbox_depth = Gauge(
+    "email_outbox_depth",
+    "Emails waiting in the outbox (pending, including retries)",
+    ["lane"],
+    multiprocess_mode="mostrecent"
+)
+
+email_send_duration_seconds = Histogram(
+    "email_send_duration_seconds",
+    "Duration of a single SMTP send in seconds",
+    ["lane"]
+)
+
+email_outbox_sent_total = Counter(
+    "email_outbox_sent_total",
+    "Outbox delivery attempts by result",
+    ["lane", "result"]
+)
+
+# Campañas de correo (recordatorios de llegada, salida y vencimiento)
+email_campaign_messages_total = Counter(
+    "email_campaign_messages_total",
+    "Campaign emails queued",
+    ["campaign"]
+)
+
+email_campaign_run_duration_seconds = Histogram(
+    "email_campaign_run_duration_seconds",
+    "Duration of email campaign runs in seconds"
+)
+
+# Pool de Argon2 (hash/verificación de contraseñas y códigos 2FA)
+argon2_queue_seconds = Histogram(
+    "argon2_queue_seconds",
+    "Time Argon2 operations wait for a pool slot in seconds",
+    ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+argon2_duration_seconds = Histogram(
+    "argon2_duration_seconds",
+    "Duration of Argon2 operations in seconds",
+    ["operation"]
+)
+
+argon2_in_flight = Gauge(
+    "argon2_in_flight",
+    "Argon2 operations currently running",
+    multiprocess_mode="livesum"
+)
+
+argon2_rejected_total = Counter(
+    "argon2_rejected_total",
+    "Argon2 operations rejected because the queue was full",
+    ["operation"]
+)
+
 def init_metrics(app):
     """
     Initializes Prometheus metrics for the Flask application.
@@ -1,11 +1,16 @@
 from .user import AdminUser, TwoFactorCode, ActivityLog
+from .email import EmailOutbox
 from .agenda import Locality, Procedure, AppointmentSlot, Reservation
 from .camping import (
 	CampingService,
+	ServiceNightInventory,
+	ServiceSearchTerm,
 	ServiceImage,
 	HeroImage,
 	ServiceTestimonial,
 	PreReservation,
 	Suggestion,
 	MediaAsset,
+	CampaignDelivery,
+	CodeSequence,
 )
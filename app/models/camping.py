@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, date
 from app.extensions import db
 
 # Association table for CampingService and Amenity
@@ -26,7 +26,6 @@ class CampingService(db.Model):
     currency = db.Column(db.String(8), nullable=False, default='UYU')
     capacity = db.Column(db.Integer, nullable=False, default=1)
     total_units = db.Column(db.Integer, nullable=False, default=0)
-    available_units = db.Column(db.Integer, nullable=False, default=0)
 
     rating_avg = db.Column(db.Float, nullable=False, default=0)
     rating_count = db.Column(db.Integer, nullable=False, default=0)
@@ -41,6 +40,8 @@ class CampingService(db.Model):
     images = db.relationship('ServiceImage', backref='service', cascade='all, delete-orphan', lazy='dynamic')
     testimonials = db.relationship('ServiceTestimonial', backref='service', cascade='all, delete-orphan', lazy='dynamic')
     pre_reservations = db.relationship('PreReservation', backref='service', lazy='dynamic')
+    inventory_nights = db.relationship('ServiceNightInventory', cascade='all, delete-orphan', lazy='dynamic')
+    search_terms = db.relationship('ServiceSearchTerm', cascade='all, delete-orphan', lazy='dynamic')
     
     amenities = db.relationship('Amenity', secondary=service_amenities, backref=db.backref('services', lazy='dynamic'))
 
@@ -51,6 +52,15 @@ class CampingService(db.Model):
             return self.name_pt
         return self.name_es
 
+    @classmethod
+    def localized_name_column(cls, lang='es'):
+        """Columna del nombre en `lang`, para consultas que no cargan el modelo."""
+        if lang == 'en':
+            return cls.name_en
+        if lang == 'pt':
+            return cls.name_pt
+        return cls.name_es
+
     def localized_description(self, lang='es'):
         if lang == 'en':
             return self.description_en
@@ -58,8 +68,23 @@ class CampingService(db.Model):
             return self.description_pt
         return self.description_es
 
-    def to_public_dict(self, lang='es'):
-        ordered_images = self.images.order_by(ServiceImage.sort_order.asc(), ServiceImage.id.asc()).all()
+    def available_units_on(self, night=None):
+        night = night or date.today()
+        booked = db.session.query(ServiceNightInventory.booked_units).filter_by(
+            service_id=self.id,
+            night=night,
+        ).scalar() or 0
+        return max(0, self.total_units - booked)
+
+    def to_public_dict(self, lang='es', available=None, images=None, amenities=None):
+        # images/amenities/available pueden venir precargados en lote
+        # (ver app.services.catalog_service) para evitar consultas por servicio.
+        if available is None:
+            available = self.available_units_on()
+        if images is None:
+            images = self.images.order_by(ServiceImage.sort_order.asc(), ServiceImage.id.asc()).all()
+        if amenities is None:
+            amenities = self.amenities
         return {
             'id': self.id,
             'slug': self.slug,
@@ -70,14 +95,38 @@ class CampingService(db.Model):
             'currency': self.currency,
             'capacity': self.capacity,
             'total': self.total_units,
-            'available': self.available_units,
+            'available': available,
             'featured': self.is_featured,
             'promo': self.is_promo,
-            'amenities': [a.to_dict(lang) for a in self.amenities],
-            'images': [img.url for img in ordered_images],
+            'rating': round(self.rating_avg or 0, 2),
+            'rating_count': self.rating_count or 0,
+            'amenities': [a.to_dict(lang) for a in amenities],
+            'images': [img.url for img in images],
         }
 
 
+class ServiceNightInventory(db.Model):
+    """Ledger de inventario: unidades reservadas por servicio y noche."""
+    __tablename__ = 'service_night_inventory'
+
+    service_id = db.Column(db.Integer, db.ForeignKey('camping_services.id'), primary_key=True)
+    night = db.Column(db.Date, primary_key=True)
+    booked_units = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ServiceSearchTerm(db.Model):
+    """Índice de búsqueda: términos normalizados (sin acentos) por servicio e idioma."""
+    __tablename__ = 'service_search_terms'
+    __table_args__ = (
+        db.Index('ix_service_search_terms_lang_term', 'lang', 'term'),
+    )
+
+    service_id = db.Column(db.Integer, db.ForeignKey('camping_services.id'), primary_key=True)
+    lang = db.Column(db.String(5), primary_key=True)
+    term = db.Column(db.String(64), primary_key=True)
+    weight = db.Column(db.Integer, nullable=False, default=1)
+
+
 class Amenity(db.Model):
     __tablename__ = 'amenities'
 
@@ -133,16 +182,26 @@ class HeroImage(db.Model):
 
 class ServiceTestimonial(db.Model):
     __tablename__ = 'service_reviews'
-
+    __table_args__ = (
+        # Paginación por cursor (created_at, id) del listado público, general y por servicio.
+        db.Index('ix_service_reviews_published_created', 'is_published', 'created_at', 'id'),
+        db.Index('ix_service_reviews_service_published_created', 'service_id', 'is_published', 'created_at', 'id'),
+    )
+
+    # active_history: los deltas de rating_avg/rating_count y de los totales
+    # (ver testimonial_service._track_update) necesitan el valor anterior
+    # aunque el atributo esté expirado al modificarlo (p. ej. tras un commit).
     id = db.Column(db.Integer, primary_key=True)
-    service_id = db.Column(db.Integer, db.ForeignKey('camping_services.id'), nullable=True, index=True)
+    service_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('camping_services.id'), nullable=True, index=True), active_history=True
+    )
     author_name = db.Column(db.String(120), nullable=False)
-    rating = db.Column(db.Integer, nullable=False, default=0)
+    rating = db.column_property(db.Column(db.Integer, nullable=False, default=0), active_history=True)
     comment_es = db.Column(db.Text, nullable=False)
     comment_en = db.Column(db.Text, nullable=False)
     comment_pt = db.Column(db.Text, nullable=False)
     image_url = db.Column(db.String(512), nullable=True)
-    is_published = db.Column(db.Boolean, default=True)
+    is_published = db.column_property(db.Column(db.Boolean, default=True), active_history=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -153,6 +212,15 @@ class ServiceTestimonial(db.Model):
             return self.comment_pt
         return self.comment_es
 
+    @classmethod
+    def localized_comment_column(cls, lang='es'):
+        """Columna del comentario en `lang`, para consultas que no cargan el modelo."""
+        if lang == 'en':
+            return cls.comment_en
+        if lang == 'pt':
+            return cls.comment_pt
+        return cls.comment_es
+
     def to_public_dict(self, lang='es'):
         return {
             'id': self.id,
@@ -167,6 +235,12 @@ class ServiceTestimonial(db.Model):
 
 class PreReservation(db.Model):
     __tablename__ = 'pre_reservations'
+    __table_args__ = (
+        # Selección diaria de las campañas de correo (ver app.services.email_campaigns).
+        db.Index('ix_pre_reservations_status_check_in', 'status', 'check_in'),
+        db.Index('ix_pre_reservations_status_check_out', 'status', 'check_out'),
+        db.Index('ix_pre_reservations_status_expires_at', 'status', 'expires_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(24), unique=True, nullable=False, index=True)
@@ -276,3 +350,23 @@ class MediaAsset(db.Model):
     usage_type = db.Column(db.String(40), nullable=False)
     reference_id = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class CampaignDelivery(db.Model):
+    """Registro de correos de campaña ya encolados: uno por campaña y pre-reserva."""
+    __tablename__ = 'campaign_deliveries'
+
+    campaign = db.Column(db.String(40), primary_key=True)
+    pre_reservation_id = db.Column(db.Integer, db.ForeignKey('pre_reservations.id', ondelete='CASCADE'), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class CodeSequence(db.Model):
+    """
+    Contadores de los códigos públicos (pre-reservas ARQ-, reservas RSV-).
+    Cada proceso reserva bloques de valores; ver app.services.reservation_codes.
+    """
+    __tablename__ = 'code_sequences'
+
+    name = db.Column(db.String(40), primary_key=True)
+    next_value = db.Column(db.BigInteger, nullable=False, default=0)
@@ -0,0 +1,39 @@
+from datetime import datetime
+from app.extensions import db
+
+
+class EmailOutbox(db.Model):
+    """
+    Correos pendientes de envío. Se escriben en la misma transacción que el
+    dato que los origina (código 2FA, pre-reserva) y los envía el proceso
+    de app.services.email_sender.
+    """
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        db.Index('ix_email_outbox_lane_status_next_attempt', 'lane', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    recipients = db.Column(db.Text, nullable=False) # Separados por coma
+    text_body = db.Column(db.Text, nullable=True)
+    html_body = db.Column(db.Text, nullable=True)
+    template = db.Column(db.String(120), nullable=True) # Si está, el HTML se renderiza al enviar
+    context = db.Column(db.Text, nullable=True) # JSON con los datos para el template
+    lang = db.Column(db.String(5), nullable=False, default='es')
+    attachments = db.Column(db.Text, nullable=True) # JSON con los datos en base64
+    lane = db.Column(db.String(20), nullable=False, default='normal') # urgente (2FA) o normal; cada una con su propio envío
+
+    status = db.Column(db.String(20), nullable=False, default='pendiente') # pendiente, enviado, fallido, vencido
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=True) # Vencido = ya no sirve enviarlo (p. ej. 2FA)
+    claimed_by = db.Column(db.String(32), nullable=True)
+    claimed_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<EmailOutbox {self.id} {self.status}>'
@@ -1,10 +1,7 @@
 from datetime import datetime, timedelta
 from flask_login import UserMixin
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
 from app.extensions import db
-
-ph = PasswordHasher()
+from app.services.password_hasher import password_hasher
 
 class AdminUser(UserMixin, db.Model):
     __tablename__ = 'admin_users'
@@ -21,13 +18,15 @@ class AdminUser(UserMixin, db.Model):
     two_factor_codes = db.relationship('TwoFactorCode', backref='user', lazy='dynamic')
 
     def set_password(self, password):
-        self.password_hash = ph.hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        try:
-            return ph.verify(self.password_hash, password)
-        except (VerifyMismatchError, Exception):
+        if not password_hasher.verify(self.password_hash, password):
             return False
+        # Parámetros de Argon2 cambiados: se actualiza el hash (lo guarda el commit del login).
+        if password_hasher.needs_rehash(self.password_hash):
+            self.password_hash = password_hasher.hash(password)
+        return True
 
     def __repr__(self):
         return f'<AdminUser {self.username}>'
@@ -44,16 +43,13 @@ class TwoFactorCode(db.Model):
 
     def __init__(self, user_id, code):
         self.user_id = user_id
-        self.code_hash = ph.hash(code)
+        self.code_hash = password_hasher.hash(code)
         self.expires_at = datetime.utcnow() + timedelta(minutes=10)
 
     def verify_code(self, code):
         if self.consumed_at or datetime.utcnow() > self.expires_at:
             return False
-        try:
-            return ph.verify(self.code_hash, code)
-        except (VerifyMismatchError, Exception):
-            return False
+        return password_hasher.verify(self.code_hash, code)
 
 class ActivityLog(db.Model):
     __tablename__ = 'activity_logs'
@@ -1,12 +1,18 @@
+import logging
 import os
+import threading
 from typing import Mapping
 from urllib.parse import quote
 
 import redis
 
+from .metrics import redis_pool_connections, redis_pool_max_connections, redis_up
+
 # Timeout en segundos para todas las operaciones de probe/init hacia Redis.
 _REDIS_PROBE_TIMEOUT = 2
 
+logger = logging.getLogger(__name__)
+
 
 def build_redis_url_from_env(env: Mapping[str, str] | None = None) -> str:
     source = env or os.environ
@@ -34,6 +40,12 @@ def is_redis_available(
     if not redis_url:
         return False, "Redis URL vacía"
 
+    # Misma URL que el pool compartido: reutilizarlo en vez de abrir otra conexión.
+    if redis_pool.pool is not None and redis_url == redis_pool.url:
+        if redis_pool.check():
+            return True, None
+        return False, "PING fallido"
+
     try:
         client = redis.from_url(
             redis_url,
@@ -46,13 +58,104 @@ def is_redis_available(
         return False, str(exc)
 
 
+class RedisPool:
+    """
+    Cliente Redis compartido por el proceso (caché, limiter, leases).
+
+    - Un único BlockingConnectionPool acotado: si todas las conexiones están
+      ocupadas se espera hasta `pool_timeout` en lugar de abrir más.
+    - Un hilo de fondo hace PING cada `health_check_interval` segundos y
+      marca el cliente como sano o caído; `client` devuelve None mientras
+      Redis está caído y vuelve solo cuando responde otra vez, sin reiniciar.
+    """
+
+    def __init__(self):
+        self.url = None
+        self.pool = None
+        self._client = None
+        self.healthy = False
+        self.health_check_interval = 5
+        self._monitor = None
+        self._stop = threading.Event()
+
+    @property
+    def client(self):
+        return self._client if self.healthy else None
+
+    def configure(self, redis_url, max_connections=10, pool_timeout=_REDIS_PROBE_TIMEOUT, health_check_interval=5):
+        if self.pool is not None and self.url == redis_url:
+            return
+        self.url = redis_url
+        self.health_check_interval = health_check_interval
+        # Siempre usar timeouts explícitos para evitar colgar el worker.
+        self.pool = redis.BlockingConnectionPool.from_url(
+            redis_url,
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            socket_connect_timeout=_REDIS_PROBE_TIMEOUT,
+            socket_timeout=_REDIS_PROBE_TIMEOUT,
+            health_check_interval=30,
+        )
+        self._client = redis.Redis(connection_pool=self.pool)
+        redis_pool_max_connections.set(max_connections)
+
+    def check(self) -> bool:
+        """PING al servidor; actualiza `healthy` y las métricas del pool."""
+        if self._client is None:
+            return False
+        try:
+            self._client.ping()
+            healthy, error = True, None
+        except Exception as exc:
+            healthy, error = False, exc
+
+        if healthy != self.healthy:
+            if healthy:
+                logger.info("Redis disponible nuevamente: se reactivan caché y leases.")
+            else:
+                logger.warning(f"Redis no disponible: {error}. Se continúa sin Redis.")
+        self.healthy = healthy
+        redis_up.set(1 if healthy else 0)
+        self._record_pool_usage()
+        return healthy
+
+    def _record_pool_usage(self):
+        # BlockingConnectionPool: `_connections` son las creadas y la cola
+        # `pool` guarda las libres (None = lugar aún sin conexión creada).
+        try:
+            created = len(self.pool._connections)
+            idle = sum(1 for connection in list(self.pool.pool.queue) if connection is not None)
+        except AttributeError:
+            return
+        redis_pool_connections.labels(state="in_use").set(created - idle)
+        redis_pool_connections.labels(state="idle").set(idle)
+
+    def start_monitor(self):
+        if self._monitor and self._monitor.is_alive():
+            return
+        self._stop.clear()
+        self._monitor = threading.Thread(target=self._monitor_loop, name="redis-health", daemon=True)
+        self._monitor.start()
+
+    def _monitor_loop(self):
+        while not self._stop.wait(self.health_check_interval):
+            self.check()
+
+    def stop_monitor(self):
+        self._stop.set()
+
+
+# Instancia global del proceso (configurada en init_redis)
+redis_pool = RedisPool()
+
+
 def init_redis(app) -> bool:
     """
-    Intenta conectar a Redis usando REDIS_URL de la configuración de la app.
+    Configura el pool Redis compartido usando REDIS_URL de la configuración.
 
-    - Si la conexión tiene éxito, establece app.config['REDIS_AVAILABLE']
-      = True y devuelve True.
-    - Si falla por cualquier motivo, loguea un WARNING y devuelve False.
+    - Establece app.config['REDIS_AVAILABLE'] según el primer PING y devuelve
+      ese resultado; aunque falle, el pool queda configurado y el monitor de
+      salud lo reactiva cuando Redis vuelva.
     - Nunca lanza excepciones: es seguro llamar en create_app() sin try/except.
     """
     redis_url = app.config.get('REDIS_URL', '').strip()
@@ -65,19 +168,24 @@ def init_redis(app) -> bool:
         return False
 
     try:
-        client = redis.from_url(
+        redis_pool.configure(
             redis_url,
-            socket_connect_timeout=_REDIS_PROBE_TIMEOUT,
-            socket_timeout=_REDIS_PROBE_TIMEOUT,
+            max_connections=app.config.get('REDIS_MAX_CONNECTIONS', 10),
+            health_check_interval=app.config.get('REDIS_HEALTH_CHECK_INTERVAL', 5),
         )
-        client.ping()
-        app.config['REDIS_AVAILABLE'] = True
-        app.logger.info(f"Redis disponible en: {redis_url}")
-        return True
     except Exception as exc:
         app.config['REDIS_AVAILABLE'] = False
+        app.logger.warning(f"REDIS_URL inválida ({redis_url}): {exc}.")
+        return False
+
+    available = redis_pool.check()
+    redis_pool.start_monitor()
+    app.config['REDIS_AVAILABLE'] = available
+    if available:
+        app.logger.info(f"Redis disponible en: {redis_url}")
+    else:
         app.logger.warning(
-            f"Redis no disponible ({redis_url}): {exc}. "
-            "La app continúa sin Redis."
+            f"Redis no disponible ({redis_url}). "
+            "La app continúa sin Redis y lo reintenta en segundo plano."
         )
-        return False
+    return available
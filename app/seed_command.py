@@ -3,6 +3,7 @@ from flask.cli import with_appcontext
 from app.extensions import db
 from app.models.agenda import Locality, Procedure, AppointmentSlot
 from app.models.camping import CampingService, HeroImage, ServiceTestimonial
+from app.services.search_index import rebuild_search_index
 from datetime import date, time, timedelta
 
 @click.command('seed-data')
@@ -100,7 +101,6 @@ def seed_data():
                 'price': 3200,
                 'capacity': 4,
                 'total_units': 8,
-                'available_units': 8,
                 'is_featured': True,
                 'is_active': True,
                 'amenities': ['wifi', 'ac', 'kitchen', 'parking'],
@@ -117,7 +117,6 @@ def seed_data():
                 'price': 1800,
                 'capacity': 4,
                 'total_units': 15,
-                'available_units': 15,
                 'is_featured': True,
                 'is_active': True,
                 'amenities': ['electricity', 'water', 'bbq', 'parking'],
@@ -134,7 +133,6 @@ def seed_data():
                 'price': 800,
                 'capacity': 6,
                 'total_units': 30,
-                'available_units': 30,
                 'is_featured': True,
                 'is_active': True,
                 'amenities': ['electricity', 'bbq', 'shade', 'bathrooms'],
@@ -154,7 +152,6 @@ def seed_data():
                 price=raw['price'],
                 capacity=raw['capacity'],
                 total_units=raw['total_units'],
-                available_units=raw['available_units'],
                 is_featured=raw['is_featured'],
                 is_active=raw['is_active'],
             )
@@ -162,6 +159,7 @@ def seed_data():
             db.session.add(service)
 
         db.session.commit()
+        rebuild_search_index()
         print('Servicios de camping base creados.')
 
     if HeroImage.query.count() == 0:
@@ -0,0 +1,123 @@
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+    msgpack = None
+
+# Prefijo de los valores escritos por CacheCodec.encode_value. Nunca aparece
+# al inicio de un JSON válido, así que las llaves viejas (JSON plano) se
+# reconocen y se siguen leyendo.
+MAGIC = b"\xc0"
+
+# Formatos (un byte, guardado junto al valor para poder cambiar de serializador
+# sin invalidar lo ya escrito).
+FORMAT_RAW = b"r"
+FORMAT_JSON = b"j"
+FORMAT_ORJSON = b"o"
+FORMAT_MSGPACK = b"m"
+
+COMPRESSION_NONE = b"-"
+COMPRESSION_ZLIB = b"z"
+
+
+def _json_dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data):
+    # orjson produce JSON estándar: si está instalado también lo lee más rápido.
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _available_serializers():
+    serializers = {'json': (FORMAT_JSON, _json_dumps)}
+    if orjson:
+        serializers['orjson'] = (FORMAT_ORJSON, orjson.dumps)
+    if msgpack:
+        serializers['msgpack'] = (FORMAT_MSGPACK, lambda value: msgpack.packb(value, use_bin_type=True))
+    return serializers
+
+
+def _loads(fmt, data):
+    if fmt in (FORMAT_JSON, FORMAT_ORJSON):
+        return _json_loads(data)
+    if fmt == FORMAT_MSGPACK:
+        if not msgpack:
+            raise ValueError("valor msgpack sin el paquete msgpack instalado")
+        return msgpack.unpackb(data, raw=False)
+    if fmt == FORMAT_RAW:
+        return data
+    raise ValueError(f"formato de caché desconocido: {fmt!r}")
+
+
+def available_serializers():
+    """Nombres de los serializadores utilizables en este entorno."""
+    return list(_available_serializers())
+
+
+class CacheCodec:
+    """
+    Serialización y compresión de los valores del caché.
+
+    - `serializer`: 'json', 'orjson', 'msgpack' o 'auto' (orjson si está
+      instalado). Si el elegido no está instalado se usa json.
+    - Los payloads de `compress_min_bytes` o más se comprimen con zlib
+      (0 desactiva la compresión).
+    """
+
+    def __init__(self, serializer='auto', compress_min_bytes=2048, compress_level=6):
+        serializers = _available_serializers()
+        if serializer == 'auto':
+            serializer = 'orjson' if 'orjson' in serializers else 'json'
+        self.serializer = serializer if serializer in serializers else 'json'
+        self.format, self._dumps = serializers[self.serializer]
+        self.compress_min_bytes = compress_min_bytes
+        self.compress_level = compress_level
+
+    def serialize(self, value):
+        """(formato, bytes) del valor con el serializador configurado."""
+        return self.format, self._dumps(value)
+
+    @staticmethod
+    def deserialize(fmt, data):
+        return _loads(fmt, data)
+
+    def compress(self, data):
+        """(compresión, bytes): solo comprime si el payload supera el umbral y si achica."""
+        if self.compress_min_bytes and len(data) >= self.compress_min_bytes:
+            compressed = zlib.compress(data, self.compress_level)
+            if len(compressed) < len(data):
+                return COMPRESSION_ZLIB, compressed
+        return COMPRESSION_NONE, data
+
+    @staticmethod
+    def decompress(compression, data):
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(data)
+        if compression == COMPRESSION_NONE:
+            return data
+        raise ValueError(f"compresión de caché desconocida: {compression!r}")
+
+    def encode_value(self, value):
+        """Valor listo para guardar en Redis: MAGIC + formato + compresión + datos."""
+        fmt, data = self.serialize(value)
+        compression, data = self.compress(data)
+        return MAGIC + fmt + compression + data
+
+    @staticmethod
+    def unpack_value(blob):
+        """(formato, bytes sin comprimir) de un valor guardado; JSON plano si es una llave vieja."""
+        if not blob.startswith(MAGIC):
+            return FORMAT_JSON, blob
+        fmt, compression = blob[1:2], blob[2:3]
+        return fmt, CacheCodec.decompress(compression, blob[3:])
+
+    def decode_value(self, blob):
+        return self.deserialize(*self.unpack_value(blob))
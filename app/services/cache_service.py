@@ -1,82 +1,685 @@
+import hashlib
 import json
+import math
+import random
+import secrets
+import threading
+import time
+import zlib
 import redis
-from ..redis_utils import build_redis_url_from_env, _REDIS_PROBE_TIMEOUT
+from ..metrics import cache_requests_total
+from ..redis_utils import build_redis_url_from_env, redis_pool, _REDIS_PROBE_TIMEOUT
+from .circuit_breaker import CircuitBreaker
+from .cache_codec import CacheCodec, COMPRESSION_NONE, FORMAT_JSON, FORMAT_RAW
+from .local_cache import LocalCache, MISSING
+
+# Single-flight: duración máxima del lock de recálculo y espera de quien no lo obtiene.
+LOCK_TIMEOUT_SECONDS = 30
+LOCK_WAIT_SECONDS = 2.0
+LOCK_POLL_SECONDS = 0.05
+
+# Agresividad del refresco anticipado probabilístico (XFetch). 1.0 es el valor canónico.
+EARLY_REFRESH_BETA = 1.0
+
+# Contadores de versión por namespace (ver versioned_key / invalidate).
+NAMESPACE_VERSION_PREFIX = "cache_ns:"
+
+# Canal pub/sub por el que los workers se avisan qué descartar del tier local.
+INVALIDATION_CHANNEL = "cache_invalidation"
+SUBSCRIBER_RETRY_SECONDS = 5
+
+# Namespaces de contenido público.
+NS_SERVICES = "services"
+NS_HERO_IMAGES = "hero_images"
+NS_TESTIMONIALS = "testimonials"
+
+
+def service_namespace(service_id):
+    """Namespace de los datos propios de un servicio (p. ej. su calendario)."""
+    return f"service:{service_id}"
+
+
+def entry_ttl(timeout, stale_timeout=None) -> int:
+    """TTL duro de una entrada: vigente `timeout` y servible vencida `stale_timeout` más."""
+    return int(timeout + (timeout if stale_timeout is None else stale_timeout))
+
+
+# Suma al contador solo si existe: si venció, el próximo lector lo recalcula.
+_INCR_IF_EXISTS_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 1 then
+    return redis.call('incrby', KEYS[1], ARGV[1])
+end
+return nil
+"""
+
+
+# Borra el lock solo si sigue siendo nuestro (no el de otro worker tras expirar).
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _BreakerClient:
+    """
+    Envuelve el cliente Redis para registrar en el circuit breaker la
+    duración y el resultado de cada comando (en pipelines, de `execute`).
+    """
+
+    def __init__(self, client, breaker):
+        self._client = client
+        self._breaker = breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr):
+            return attr
+        if name == 'pipeline':
+            return lambda *args, **kwargs: _BreakerClient(attr(*args, **kwargs), self._breaker)
+        if isinstance(self._client, redis.client.Pipeline) and name != 'execute':
+            return attr
+        return self._guarded(attr)
+
+    def _guarded(self, method):
+        def call(*args, **kwargs):
+            started = time.monotonic()
+            try:
+                result = method(*args, **kwargs)
+            except (redis.RedisError, OSError):
+                self._breaker.record(time.monotonic() - started, failed=True)
+                raise
+            self._breaker.record(time.monotonic() - started)
+            return result
+        return call
 
 
 class CacheService:
+    """
+    Caché de dos niveles: un LRU en memoria de cada worker (LocalCache) delante
+    de Redis. Los workers se mantienen coherentes publicando en
+    INVALIDATION_CHANNEL cada llave borrada y cada namespace invalidado.
+    """
+
     def __init__(self, app=None):
-        self.client = None
+        self.local = LocalCache(maxsize=0)
+        self.codec = CacheCodec()
+        # Se incrementa con cada invalidación recibida: evita guardar en el
+        # tier local una versión de namespace leída antes de la invalidación.
+        self._generation = 0
+        self._subscriber = None
+        self.breaker = CircuitBreaker("redis_cache")
         if app:
             self.init_app(app)
 
     def init_app(self, app):
-        # Si el probe ya determinó que Redis no está disponible, no intentar.
+        self.breaker = CircuitBreaker(
+            "redis_cache",
+            failure_threshold=app.config.get('CACHE_BREAKER_FAILURE_THRESHOLD', 5),
+            slow_call_seconds=app.config.get('CACHE_BREAKER_SLOW_CALL_MS', 250) / 1000,
+            reset_timeout=app.config.get('CACHE_BREAKER_RESET_TIMEOUT', 30),
+        )
+        self.codec = CacheCodec(
+            serializer=app.config.get('CACHE_SERIALIZER', 'auto'),
+            compress_min_bytes=app.config.get('CACHE_COMPRESS_MIN_BYTES', 2048),
+            compress_level=app.config.get('CACHE_COMPRESS_LEVEL', 6),
+        )
+
+        redis_url = app.config.get('REDIS_URL') or build_redis_url_from_env()
+        if redis_pool.pool is None:
+            app.logger.warning("CacheService: Redis no configurado, caché desactivado.")
+            return
         if not app.config.get('REDIS_AVAILABLE', True):
-            app.logger.warning(
-                "CacheService: Redis no disponible, caché desactivado."
-            )
-            self.client = None
+            # El monitor de salud del pool lo reactiva cuando Redis vuelva.
+            app.logger.warning("CacheService: Redis no disponible, caché desactivado por ahora.")
+
+        # El tier local solo es seguro si hay pub/sub para invalidarlo
+        # (el suscriptor reintenta hasta que Redis esté disponible).
+        self.local = LocalCache(
+            maxsize=app.config.get('CACHE_LOCAL_MAXSIZE', 512),
+            ttl=app.config.get('CACHE_LOCAL_TTL', 30),
+        )
+        if self.local.maxsize > 0:
+            self._start_subscriber(app, redis_url)
+
+    @property
+    def client(self):
+        """
+        Cliente del pool compartido, o None mientras Redis está caído o el
+        circuit breaker está abierto: quien llama sigue por el camino a la base.
+        """
+        client = redis_pool.client
+        if client is None or not self.breaker.allow():
+            return None
+        return _BreakerClient(client, self.breaker)
+
+    def _start_subscriber(self, app, redis_url):
+        if self._subscriber and self._subscriber.is_alive():
             return
+        self._subscriber = threading.Thread(
+            target=self._listen_invalidations,
+            args=(app, redis_url),
+            name="cache-invalidation",
+            daemon=True,
+        )
+        self._subscriber.start()
 
-        redis_url = app.config.get('REDIS_URL') or build_redis_url_from_env()
+    def _listen_invalidations(self, app, redis_url):
+        while True:
+            try:
+                # Conexión propia fuera del pool: la suscripción la ocupa de forma
+                # permanente y su lectura es bloqueante (sin socket_timeout) a propósito.
+                client = redis.from_url(
+                    redis_url,
+                    socket_connect_timeout=_REDIS_PROBE_TIMEOUT,
+                    health_check_interval=30,
+                )
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Mientras no estuvimos suscritos pudimos perder avisos.
+                self._drop_local()
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self._apply_invalidation(message['data'])
+            except Exception as e:
+                app.logger.warning(f"CacheService: suscripción de invalidación caída: {e}")
+                self._drop_local()
+                time.sleep(SUBSCRIBER_RETRY_SECONDS)
+
+    def _drop_local(self):
+        self._generation += 1
+        self.local.clear()
+
+    def _apply_invalidation(self, data):
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        self._discard_local(message.get('keys', ()), message.get('namespaces', ()))
+
+    def _discard_local(self, keys=(), namespaces=()):
+        self._generation += 1
+        for key in keys:
+            self.local.delete(key)
+        for ns in namespaces:
+            self.local.delete(f"{NAMESPACE_VERSION_PREFIX}{ns}")
+
+    def _publish_invalidation(self, client, keys=(), namespaces=()):
+        """Descarta las llaves del tier local propio y avisa al resto de los workers."""
+        keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+        namespaces = list(namespaces)
+        self._discard_local(keys, namespaces)
+        if self.local.maxsize <= 0:
+            return
         try:
-            # Siempre usar timeouts explícitos para evitar colgar el worker.
-            self.client = redis.from_url(
-                redis_url,
-                socket_connect_timeout=_REDIS_PROBE_TIMEOUT,
-                socket_timeout=_REDIS_PROBE_TIMEOUT,
-            )
-            self.client.ping()
-            app.logger.info("CacheService: conectado a Redis correctamente.")
+            client.publish(INVALIDATION_CHANNEL, json.dumps({'keys': keys, 'namespaces': namespaces}))
         except Exception as e:
-            app.logger.warning(f"No se pudo conectar a Redis para caché: {e}")
-            self.client = None
+            print(f"Error al publicar invalidación de caché: {e}")
 
     def get(self, key):
         """Obtiene un valor del caché."""
-        if not self.client:
+        client = self.client
+        if not client:
             return None
         try:
-            data = self.client.get(key)
-            if data:
-                return json.loads(data)
+            unpacked = self._get_raw(client, key, self.codec.unpack_value)
+            if unpacked:
+                return self.codec.deserialize(*unpacked)
         except Exception as e:
             print(f"Error al obtener de caché ({key}): {e}")
         return None
 
+    def get_many(self, keys):
+        """Obtiene varias llaves con un único MGET: {llave: valor} solo de los hits."""
+        client = self.client
+        keys = list(keys)
+        if not client or not keys:
+            return {}
+        values = {}
+        for key, unpacked in zip(keys, self._get_raw_many(client, keys, self.codec.unpack_value)):
+            if not unpacked:
+                continue
+            try:
+                values[key] = self.codec.deserialize(*unpacked)
+            except Exception as e:
+                print(f"Error al obtener de caché ({key}): {e}")
+        return values
+
+    def _get_raw(self, client, key, load, local_ttl=None):
+        return self._get_raw_many(client, [key], load, local_ttl)[0]
+
+    def _get_raw_many(self, client, keys, load, local_ttl=None):
+        """
+        `load(bytes)` de cada llave buscando primero en el tier local y los
+        faltantes en Redis con un solo MGET. En memoria se guarda el resultado
+        de `load` (ya descomprimido) y `local_ttl(loaded)` permite acotar
+        cuánto vive ahí. Devuelve una lista alineada con `keys` (None = miss).
+        """
+        results = [self.local.get(key) for key in keys]
+        missing = [i for i, loaded in enumerate(results) if loaded is MISSING]
+        cache_requests_total.labels(tier="local", result="hit").inc(len(keys) - len(missing))
+        if not missing:
+            return results
+        cache_requests_total.labels(tier="local", result="miss").inc(len(missing))
+
+        generation = self._generation
+        try:
+            fetched = client.mget([keys[i] for i in missing])
+        except Exception as e:
+            print(f"Error al obtener de caché ({[keys[i] for i in missing]}): {e}")
+            fetched = [None] * len(missing)
+
+        hits = 0
+        for i, data in zip(missing, fetched):
+            results[i] = None
+            if not data:
+                continue
+            hits += 1
+            try:
+                loaded = load(data)
+            except Exception as e:
+                print(f"Error al obtener de caché ({keys[i]}): {e}")
+                continue
+            results[i] = loaded
+            if loaded and generation == self._generation:
+                self.local.set(keys[i], loaded, local_ttl(loaded) if local_ttl else None)
+        cache_requests_total.labels(tier="redis", result="hit").inc(hits)
+        cache_requests_total.labels(tier="redis", result="miss").inc(len(missing) - hits)
+        return results
+
     def set(self, key, value, timeout=300):
         """Guarda un valor en el caché."""
-        if not self.client:
+        client = self.client
+        if not client:
             return False
         try:
-            data = json.dumps(value)
-            return self.client.setex(key, timeout, data)
+            data = self.codec.encode_value(value)
+            result = client.setex(key, timeout, data)
         except Exception as e:
             print(f"Error al guardar en caché ({key}): {e}")
-        return False
+            return False
+        self._publish_invalidation(client, keys=[key])
+        return result
+
+    def set_many(self, mapping, timeout=300):
+        """
+        Guarda varias llaves en un pipeline (un round trip). `timeout` puede
+        ser un entero común a todas o un dict {llave: segundos}.
+        """
+        client = self.client
+        if not client or not mapping:
+            return False
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                ttl = timeout.get(key, 300) if isinstance(timeout, dict) else timeout
+                pipe.setex(key, ttl, self.codec.encode_value(value))
+            pipe.execute()
+        except Exception as e:
+            print(f"Error al guardar en caché ({list(mapping)}): {e}")
+            return False
+        self._publish_invalidation(client, keys=list(mapping))
+        return True
 
     def delete(self, key):
         """Elimina una llave del caché."""
-        if not self.client:
+        client = self.client
+        if not client:
             return False
         try:
-            return self.client.delete(key)
+            result = client.delete(key)
         except Exception as e:
             print(f"Error al eliminar de caché ({key}): {e}")
+            return False
+        self._publish_invalidation(client, keys=[key])
+        return result
+
+    def delete_many(self, keys):
+        """Elimina varias llaves con un solo DEL."""
+        client = self.client
+        keys = list(keys)
+        if not client or not keys:
+            return False
+        try:
+            result = client.delete(*keys)
+        except Exception as e:
+            print(f"Error al eliminar de caché ({keys}): {e}")
+            return False
+        self._publish_invalidation(client, keys=keys)
+        return result
+
+    def get_or_compute(self, key, compute, timeout=300, stale_timeout=None):
+        """
+        Devuelve el valor cacheado o lo calcula con `compute()`.
+        Protegido contra estampidas: ver _get_or_compute_entry.
+        """
+        _, fmt, payload = self._get_or_compute_entry(
+            key,
+            lambda: self.codec.serialize(compute()),
+            timeout,
+            stale_timeout,
+        )
+        return self.codec.deserialize(fmt, payload)
+
+    def get_or_compute_many(self, items, timeout=300, stale_timeout=None):
+        """
+        Varios get_or_compute a la vez: `items` es [(llave, compute)] y se
+        devuelven los valores en el mismo orden. Las entradas vigentes se leen
+        con un solo MGET; solo los misses y vencidas pasan por el single-flight.
+        """
+        items = list(items)
+        client = self.client
+        if not client:
+            return [compute() for _, compute in items]
+
+        entries = self._get_raw_many(
+            client, [key for key, _ in items], self._parse_entry, local_ttl=self._entry_local_ttl
+        )
+        values = []
+        for (key, compute), entry in zip(items, entries):
+            if entry and not self._should_refresh(entry):
+                values.append(self.codec.deserialize(entry[3], entry[4]))
+            else:
+                values.append(self.get_or_compute(key, compute, timeout, stale_timeout))
+        return values
+
+    def get_or_compute_response(self, key, compute, timeout=300, stale_timeout=None):
+        """
+        Igual que get_or_compute pero para respuestas ya codificadas:
+        `compute()` devuelve bytes y se obtiene (etag, body) sin decodificar.
+        """
+        etag, _, body = self._get_or_compute_entry(
+            key, lambda: (FORMAT_RAW, compute()), timeout, stale_timeout
+        )
+        return etag, body
+
+    def refresh(self, key, compute, timeout=300, stale_timeout=None):
+        """Calcula y escribe `key` sin mirar lo que haya en caché (write-through)."""
+        _, fmt, payload = self._refresh_entry(
+            key, lambda: self.codec.serialize(compute()), timeout, stale_timeout
+        )
+        return self.codec.deserialize(fmt, payload)
+
+    def refresh_response(self, key, compute, timeout=300, stale_timeout=None):
+        """refresh para respuestas ya codificadas: devuelve (etag, body)."""
+        etag, _, body = self._refresh_entry(
+            key, lambda: (FORMAT_RAW, compute()), timeout, stale_timeout
+        )
+        return etag, body
+
+    def _refresh_entry(self, key, compute, timeout, stale_timeout):
+        etag, fmt, payload, delta = self._build_entry(compute)
+        client = self.client
+        if client:
+            stale_timeout = timeout if stale_timeout is None else stale_timeout
+            self._write_entry(client, key, etag, fmt, payload, delta, timeout, stale_timeout)
+        return etag, fmt, payload
+
+    def _get_or_compute_entry(self, key, compute, timeout, stale_timeout):
+        """
+        - TTL blando (`timeout`): pasado ese tiempo el valor está vencido pero
+          se sigue sirviendo mientras un único worker lo recalcula.
+        - TTL duro (`timeout + stale_timeout`): Redis elimina la llave.
+        - Refresco anticipado probabilístico (XFetch): cuanto más cerca del
+          vencimiento y más caro el cálculo, más probable refrescar antes.
+        - Single-flight: un lock en Redis (SET NX) compartido por todos los
+          workers de gunicorn decide quién recalcula.
+        `compute()` devuelve (formato, bytes); se obtiene (etag, formato, bytes).
+        """
+        client = self.client
+        if not client:
+            return self._build_entry(compute)[:3]
+
+        stale_timeout = timeout if stale_timeout is None else stale_timeout
+        entry = self._read_entry(client, key)
+        if entry and not self._should_refresh(entry):
+            return entry[0], entry[3], entry[4]
+
+        lock_key = f"lock:{key}"
+        token = self._acquire_lock(client, lock_key)
+        if not token:
+            if entry:
+                # Otro worker está recalculando: servir el valor vencido.
+                return entry[0], entry[3], entry[4]
+
+            # Miss y otro worker calculando: esperar su resultado un momento.
+            deadline = time.monotonic() + LOCK_WAIT_SECONDS
+            while time.monotonic() < deadline:
+                time.sleep(LOCK_POLL_SECONDS)
+                entry = self._read_entry(client, key)
+                if entry:
+                    return entry[0], entry[3], entry[4]
+
+        try:
+            etag, fmt, payload, delta = self._build_entry(compute)
+            self._write_entry(client, key, etag, fmt, payload, delta, timeout, stale_timeout)
+            return etag, fmt, payload
+        finally:
+            if token:
+                self._release_lock(client, lock_key, token)
+
+    @staticmethod
+    def _build_entry(compute):
+        started = time.monotonic()
+        fmt, payload = compute()
+        delta = time.monotonic() - started
+        etag = hashlib.sha256(payload).hexdigest()[:32]
+        return etag, fmt, payload, delta
+
+    def _read_entry(self, client, key):
+        """Lee una entrada: (etag, soft_expires_at, delta, formato, payload) o None."""
+        return self._get_raw(client, key, self._parse_entry, local_ttl=self._entry_local_ttl)
+
+    @staticmethod
+    def _parse_entry(data):
+        """
+        Cabecera "etag soft_expires_at delta formato+compresión" y el payload.
+        Las entradas sin el cuarto campo (versión anterior) son JSON sin comprimir.
+        """
+        header, separator, payload = data.partition(b"\n")
+        parts = header.split(b" ")
+        # Llaves con otro formato (p. ej. JSON plano de versiones anteriores) cuentan como miss.
+        if not separator or len(parts) not in (3, 4):
+            return None
+        fmt, compression = (parts[3][:1], parts[3][1:]) if len(parts) == 4 else (FORMAT_JSON, COMPRESSION_NONE)
+        try:
+            payload = CacheCodec.decompress(compression, payload)
+            return parts[0].decode("ascii"), float(parts[1]), float(parts[2]), fmt, payload
+        except (UnicodeDecodeError, ValueError, zlib.error):
+            return None
+
+    @staticmethod
+    def _entry_local_ttl(entry):
+        # En memoria la entrada no sobrevive a su TTL blando: el refresco
+        # (XFetch / single-flight) siempre se decide contra Redis.
+        return entry[1] - time.time()
+
+    def _write_entry(self, client, key, etag, fmt, payload, delta, timeout, stale_timeout):
+        compression, payload = self.codec.compress(payload)
+        header = f"{etag} {time.time() + timeout:.3f} {delta:.4f} ".encode("ascii") + fmt + compression
+        try:
+            client.setex(key, entry_ttl(timeout, stale_timeout), header + b"\n" + payload)
+        except Exception as e:
+            print(f"Error al guardar en caché ({key}): {e}")
+            return
+        # Los demás workers pueden tener la entrada vencida en memoria.
+        self._publish_invalidation(client, keys=[key])
+
+    @staticmethod
+    def _should_refresh(entry):
+        _, soft_expires_at, delta, _, _ = entry
+        # 1 - random() está en (0, 1] => -log(...) >= 0: adelanta el vencimiento efectivo.
+        early = delta * EARLY_REFRESH_BETA * -math.log(1.0 - random.random())
+        return time.time() + early >= soft_expires_at
+
+    def _acquire_lock(self, client, lock_key):
+        token = secrets.token_hex(8)
+        try:
+            if client.set(lock_key, token, nx=True, ex=LOCK_TIMEOUT_SECONDS):
+                return token
+        except Exception as e:
+            print(f"Error al tomar lock de caché ({lock_key}): {e}")
+            # Sin lock por error de Redis: calcular igual (como si se hubiera obtenido).
+            return token
+        return None
+
+    def _release_lock(self, client, lock_key, token):
+        try:
+            client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            print(f"Error al liberar lock de caché ({lock_key}): {e}")
+
+    def add_to_index(self, index, key, timeout=300):
+        """Registra `key` en el índice (set de Redis) `index` para invalidarla en grupo."""
+        client = self.client
+        if not client:
+            return False
+        try:
+            pipe = client.pipeline()
+            pipe.sadd(index, key)
+            pipe.expire(index, timeout)
+            pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Error al indexar llave de caché ({index}): {e}")
         return False
 
-    def clear_prefix(self, prefix):
-        """Elimina todas las llaves que empiecen con un prefijo."""
-        if not self.client:
+    def counter(self, key, compute, timeout=86400):
+        """
+        Contador entero guardado en Redis (fuera del tier local y del codec,
+        para poder usar INCRBY). Si no existe se inicializa con `compute()`;
+        el TTL acota la deriva de los ajustes incrementales (incr_counter).
+        """
+        client = self.client
+        if not client:
+            return compute()
+        try:
+            value = client.get(key)
+            if value is not None:
+                return int(value)
+        except Exception as e:
+            print(f"Error al leer contador de caché ({key}): {e}")
+            return compute()
+
+        value = compute()
+        try:
+            client.set(key, value, nx=True, ex=timeout)
+        except Exception as e:
+            print(f"Error al guardar contador de caché ({key}): {e}")
+        return value
+
+    def incr_counter(self, key, amount):
+        """Ajusta un contador existente (ver counter); si no existe no hace nada."""
+        client = self.client
+        if not client or not amount:
+            return None
+        try:
+            return client.eval(_INCR_IF_EXISTS_SCRIPT, 1, key, int(amount))
+        except Exception as e:
+            print(f"Error al ajustar contador de caché ({key}): {e}")
+        return None
+
+    def add_to_indexes(self, indexes, key, timeout=300):
+        """Registra `key` en varios índices en un solo pipeline."""
+        client = self.client
+        indexes = list(indexes)
+        if not client or not indexes:
             return False
         try:
-            keys = self.client.keys(f"{prefix}*")
-            if keys:
-                return self.client.delete(*keys)
+            pipe = client.pipeline()
+            for index in indexes:
+                pipe.sadd(index, key)
+                pipe.expire(index, timeout)
+            pipe.execute()
+            return True
         except Exception as e:
-            print(f"Error al limpiar prefijo de caché ({prefix}): {e}")
+            print(f"Error al indexar llave de caché ({indexes}): {e}")
         return False
 
+    def clear_index(self, index):
+        """Elimina todas las llaves registradas en un índice y el índice mismo."""
+        client = self.client
+        if not client:
+            return False
+        try:
+            keys = client.smembers(index)
+            result = client.delete(index, *keys)
+        except Exception as e:
+            print(f"Error al limpiar índice de caché ({index}): {e}")
+            return False
+        self._publish_invalidation(client, keys=keys)
+        return result
+
+    def namespace_versions(self, namespaces, fresh=False):
+        """
+        Versión actual de cada namespace (0 si nunca se invalidó), en un solo
+        MGET. `fresh` ignora el tier local y lee siempre de Redis.
+        """
+        namespaces = list(namespaces)
+        client = self.client
+        if not client or not namespaces:
+            return [0] * len(namespaces)
+
+        keys = [f"{NAMESPACE_VERSION_PREFIX}{ns}" for ns in namespaces]
+        versions = [MISSING if fresh else self.local.get(key) for key in keys]
+        missing = [i for i, version in enumerate(versions) if version is MISSING]
+        cache_requests_total.labels(tier="local", result="hit").inc(len(keys) - len(missing))
+        if not missing:
+            return versions
+        cache_requests_total.labels(tier="local", result="miss").inc(len(missing))
+
+        generation = self._generation
+        try:
+            values = client.mget([keys[i] for i in missing])
+        except Exception as e:
+            print(f"Error al leer versiones de caché ({namespaces}): {e}")
+            return [0] * len(namespaces)
+        cache_requests_total.labels(tier="redis", result="hit").inc(len(missing))
+
+        for i, value in zip(missing, values):
+            versions[i] = int(value or 0)
+            if generation == self._generation:
+                self.local.set(keys[i], versions[i])
+        return versions
+
+    def versioned_key(self, key, *namespaces, bump=()):
+        """
+        Llave efectiva de `key` según la versión de los namespaces de los que
+        depende. Al invalidar un namespace cambia su versión y las llaves
+        viejas dejan de leerse (Redis las descarta al vencer su TTL).
+        Con `bump` se obtiene la llave que tendrá tras invalidar esos
+        namespaces (para escribirla antes: ver refresh_response).
+        """
+        return self.versioned_keys([key], *namespaces, bump=bump)[0]
+
+    def versioned_keys(self, keys, *namespaces, bump=()):
+        """versioned_key para varias llaves que dependen de los mismos namespaces (una sola lectura de versiones)."""
+        keys = list(keys)
+        if not namespaces:
+            return keys
+        bump = set(bump)
+        versions = self.namespace_versions(namespaces, fresh=bool(bump & set(namespaces)))
+        versions = [version + 1 if ns in bump else version for ns, version in zip(namespaces, versions)]
+        suffix = ",".join(f"{ns}={version}" for ns, version in zip(namespaces, versions))
+        return [f"{key}@{suffix}" for key in keys]
+
+    def invalidate(self, *namespaces):
+        """Invalida namespaces con un INCR por cada uno: costo constante sin importar cuántas llaves haya."""
+        client = self.client
+        if not client or not namespaces:
+            return False
+        try:
+            pipe = client.pipeline(transaction=False)
+            for ns in namespaces:
+                pipe.incr(f"{NAMESPACE_VERSION_PREFIX}{ns}")
+            pipe.execute()
+        except Exception as e:
+            print(f"Error al invalidar namespaces de caché ({namespaces}): {e}")
+            return False
+        self._publish_invalidation(client, namespaces=namespaces)
+        return True
+
 
 # Instancia global para ser inicializada en create_app
 cache_service = CacheService()
@@ -0,0 +1,140 @@
+import time
+from flask import current_app
+from app.metrics import cache_warm_duration_seconds, cache_warm_payloads_total
+from app.models.camping import CampingService
+from app.redis_utils import redis_pool
+from app.services.cache_service import cache_service, service_namespace
+from app.services.inventory_service import refresh_availability
+from app.services.periodic_worker import PeriodicWorker
+from app.services.public_payloads import warmable_payloads
+
+CACHE_WARMER_LEASE_KEY = "lease:cache_warmer"
+
+# Set en Redis con los namespaces editados en el panel pendientes de
+# regenerar (write-through). Vive fuera del proceso: si el worker se recicla
+# antes de drenarlo, el warmer de cualquier otro worker lo hace en su ronda.
+CACHE_WARMER_PENDING_KEY = "cache_warmer:pending"
+
+
+def warm_public_cache() -> dict:
+    """
+    Pre-renderiza los payloads públicos (ver warmable_payloads) para que los
+    primeros visitantes tras un deploy o una edición no paguen el cálculo.
+    Los que ya están vigentes en caché no se recalculan.
+    """
+    refresh_pending_namespaces()
+
+    started = time.monotonic()
+    warmed = failed = 0
+    for name, _, build in warmable_payloads():
+        try:
+            build()
+            warmed += 1
+        except Exception as exc:
+            failed += 1
+            current_app.logger.warning(f"cache-warmer: no se pudo generar {name}: {exc}")
+
+    elapsed = time.monotonic() - started
+    cache_warm_payloads_total.labels(result="ok").inc(warmed)
+    cache_warm_payloads_total.labels(result="error").inc(failed)
+    cache_warm_duration_seconds.observe(elapsed)
+    current_app.logger.info(f"cache-warmer: {warmed} payloads listos ({failed} con error) en {elapsed:.2f}s")
+    return {'warmed': warmed, 'failed': failed, 'seconds': elapsed}
+
+
+def refresh_public_payloads(namespaces) -> int:
+    """
+    Write-through de una edición del panel: recalcula exactamente los
+    payloads que dependen de `namespaces` y los escribe bajo la versión
+    siguiente; recién entonces incrementa la versión (INVALIDATE), de modo
+    que los lectores pasan del payload viejo al nuevo sin ver un miss.
+    Las búsquedas libres y por fechas no se pueden enumerar: esas sí se
+    recalculan en la primera lectura.
+    """
+    namespaces = tuple(namespaces)
+    affected = set(namespaces)
+    refreshed = 0
+    for name, depends_on, build in warmable_payloads():
+        if not affected.intersection(depends_on):
+            continue
+        try:
+            build(bump=namespaces)
+            refreshed += 1
+        except Exception as exc:
+            current_app.logger.warning(f"cache-warmer: no se pudo regenerar {name}: {exc}")
+
+    for service in CampingService.query.filter_by(is_active=True).all():
+        if service_namespace(service.id) in affected:
+            try:
+                refreshed += refresh_availability(service, bump=namespaces)
+            except Exception as exc:
+                current_app.logger.warning(f"cache-warmer: no se pudo regenerar la disponibilidad de {service.id}: {exc}")
+
+    cache_service.invalidate(*namespaces)
+    return refreshed
+
+
+def refresh_pending_namespaces() -> int:
+    """
+    Drena el set de pendientes: los namespaces se quitan (SREM) recién
+    después de regenerarlos, así una caída a mitad de camino no los pierde.
+    """
+    client = cache_service.client
+    if client is None:
+        return 0
+    try:
+        members = client.smembers(CACHE_WARMER_PENDING_KEY)
+    except Exception as exc:
+        current_app.logger.warning(f"cache-warmer: no se pudieron leer los namespaces pendientes: {exc}")
+        return 0
+    if not members:
+        return 0
+
+    namespaces = tuple(sorted(m.decode() if isinstance(m, bytes) else m for m in members))
+    refreshed = refresh_public_payloads(namespaces)
+    try:
+        client.srem(CACHE_WARMER_PENDING_KEY, *members)
+    except Exception as exc:
+        current_app.logger.warning(f"cache-warmer: no se pudieron descartar los namespaces pendientes: {exc}")
+    return refreshed
+
+
+cache_warmer = PeriodicWorker(
+    name="cache-warmer",
+    job=warm_public_cache,
+    lease_key=CACHE_WARMER_LEASE_KEY,
+    redis_client_getter=lambda: redis_pool.client,
+)
+
+
+def start_background_cache_warmer(app):
+    """
+    Modo gunicorn: calienta el caché al arrancar (post-deploy) y luego cada
+    CACHE_WARM_INTERVAL segundos; el lease evita que los workers lo repitan.
+    """
+    if not app.config.get('CACHE_WARM_IN_WORKERS', True):
+        return None
+
+    cache_warmer.interval = max(1, int(app.config.get('CACHE_WARM_INTERVAL', 240)))
+    return cache_warmer.start_in_background(app)
+
+
+def schedule_public_refresh(*namespaces):
+    """
+    Hook post-commit del panel: encola en Redis la regeneración write-through
+    de los namespaces editados y despierta el warmer de este worker (sin
+    esperar al lease). Sin hilo de fondo (p. ej. CLI o servidor de
+    desarrollo) o si no se pudo encolar, se invalida en el momento y el
+    próximo lector recalcula.
+    """
+    client = cache_service.client if cache_warmer.is_running() else None
+    if client is not None:
+        try:
+            client.sadd(CACHE_WARMER_PENDING_KEY, *namespaces)
+        except Exception as exc:
+            current_app.logger.warning(f"cache-warmer: no se pudo encolar la regeneración: {exc}")
+            client = None
+    if client is None:
+        cache_service.invalidate(*namespaces)
+        return
+    cache_warmer.wake(force=True)
@@ -0,0 +1,62 @@
+from collections import defaultdict
+from app.extensions import db
+from app.models.camping import Amenity, ServiceImage, service_amenities
+from app.services.inventory_service import remaining_units_for_night
+
+
+def load_service_images(service_ids) -> dict[int, list[ServiceImage]]:
+    """Imágenes ordenadas de varios servicios en una sola consulta."""
+    images = defaultdict(list)
+    service_ids = list(service_ids)
+    if not service_ids:
+        return images
+
+    rows = ServiceImage.query.filter(ServiceImage.service_id.in_(service_ids)).order_by(
+        ServiceImage.service_id.asc(),
+        ServiceImage.sort_order.asc(),
+        ServiceImage.id.asc(),
+    ).all()
+    for image in rows:
+        images[image.service_id].append(image)
+    return images
+
+
+def load_service_amenities(service_ids) -> dict[int, list[Amenity]]:
+    """Comodidades de varios servicios en una sola consulta sobre la tabla asociativa."""
+    amenities = defaultdict(list)
+    service_ids = list(service_ids)
+    if not service_ids:
+        return amenities
+
+    rows = db.session.query(service_amenities.c.service_id, Amenity).join(
+        Amenity, Amenity.id == service_amenities.c.amenity_id
+    ).filter(
+        service_amenities.c.service_id.in_(service_ids)
+    ).order_by(service_amenities.c.service_id.asc(), Amenity.id.asc()).all()
+    for service_id, amenity in rows:
+        amenities[service_id].append(amenity)
+    return amenities
+
+
+def build_public_catalog(services, lang='es', availability=None) -> list[dict]:
+    """
+    Serializa un listado de servicios con un número fijo de consultas
+    (imágenes, comodidades y disponibilidad), sin importar cuántos sean.
+    `availability` permite pasar unidades libres ya calculadas por servicio.
+    """
+    services = list(services)
+    service_ids = [service.id for service in services]
+    images = load_service_images(service_ids)
+    amenities = load_service_amenities(service_ids)
+    if availability is None:
+        availability = remaining_units_for_night(services)
+
+    return [
+        service.to_public_dict(
+            lang,
+            available=availability.get(service.id, 0),
+            images=images[service.id],
+            amenities=amenities[service.id],
+        )
+        for service in services
+    ]
@@ -0,0 +1,79 @@
+import threading
+import time
+
+from ..metrics import circuit_breaker_state, circuit_breaker_transitions_total
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Valor exportado en el gauge por estado.
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Si la llamada de prueba no registra resultado en este tiempo (p. ej. quien
+# la obtuvo terminó sin llamar a la dependencia), se habilita otra.
+PROBE_TIMEOUT_SECONDS = 5
+
+
+class CircuitBreaker:
+    """
+    Corta las llamadas a una dependencia degradada.
+
+    - Cerrado: las llamadas pasan; `failure_threshold` fallas consecutivas
+      (errores o llamadas más lentas que `slow_call_seconds`) lo abren.
+    - Abierto: `allow()` devuelve False durante `reset_timeout` segundos y
+      quien llama usa su camino alternativo sin esperar timeouts.
+    - Semiabierto: pasado el cool-down deja pasar una única llamada de prueba;
+      si sale bien se cierra, si falla vuelve a abrirse.
+    """
+
+    def __init__(self, name, failure_threshold=5, slow_call_seconds=0.25, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = None
+        self._lock = threading.Lock()
+        circuit_breaker_state.labels(name=name).set(_STATE_VALUES[CLOSED])
+
+    def allow(self) -> bool:
+        """True si la llamada puede ir a la dependencia."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition(HALF_OPEN)
+            now = time.monotonic()
+            if self._probe_started_at is not None and now - self._probe_started_at < PROBE_TIMEOUT_SECONDS:
+                return False
+            self._probe_started_at = now
+            return True
+
+    def record(self, duration: float, failed: bool = False) -> None:
+        """Registra el resultado de una llamada permitida por allow()."""
+        failed = failed or duration > self.slow_call_seconds
+        with self._lock:
+            if self.state == OPEN:
+                # Llamada que ya estaba en curso al abrirse: no cambia nada.
+                return
+            self._probe_started_at = None
+            if not failed:
+                self._failures = 0
+                if self.state == HALF_OPEN:
+                    self._transition(CLOSED)
+                return
+
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def _transition(self, state):
+        self.state = state
+        circuit_breaker_state.labels(name=self.name).set(_STATE_VALUES[state])
+        circuit_breaker_transitions_total.labels(name=self.name, state=state).inc()
@@ -0,0 +1,165 @@
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from app.extensions import db
+from app.metrics import email_campaign_messages_total, email_campaign_run_duration_seconds
+from app.models.camping import CampaignDelivery, PreReservation
+from app.redis_utils import redis_pool
+from app.services.email_service import PAYMENT_PHONE, pre_reservation_snapshot, send_email
+from app.services.periodic_worker import PeriodicWorker
+
+EMAIL_CAMPAIGNS_LEASE_KEY = "lease:email_campaigns"
+
+ARRIVAL_REMINDER = 'arrival_reminder'
+CHECKOUT_NOTICE = 'checkout_notice'
+EXPIRY_NOTICE = 'pre_reservation_expiring'
+
+# Asunto y texto plano por campaña e idioma; el HTML sale de
+# emails/<campaña>.<idioma>.html (ver email_sender._email_template).
+CAMPAIGN_MESSAGES = {
+    ARRIVAL_REMINDER: {
+        'es': ("[Camping Arequita] Te esperamos mañana - {code}",
+               "Te esperamos mañana en Camping Arequita. Reserva {code}: {service_name}, "
+               "del {check_in} al {check_out}. Consultas al {phone}."),
+        'en': ("[Camping Arequita] See you tomorrow - {code}",
+               "We look forward to seeing you tomorrow at Camping Arequita. Booking {code}: "
+               "{service_name}, from {check_in} to {check_out}. Questions: {phone}."),
+        'pt': ("[Camping Arequita] Esperamos você amanhã - {code}",
+               "Esperamos você amanhã no Camping Arequita. Reserva {code}: {service_name}, "
+               "de {check_in} a {check_out}. Dúvidas: {phone}."),
+    },
+    CHECKOUT_NOTICE: {
+        'es': ("[Camping Arequita] Tu estadía finaliza mañana - {code}",
+               "Te recordamos que tu estadía {code} ({service_name}) finaliza mañana, {check_out}. "
+               "¡Gracias por elegirnos! Consultas al {phone}."),
+        'en': ("[Camping Arequita] Your stay ends tomorrow - {code}",
+               "This is a reminder that your stay {code} ({service_name}) ends tomorrow, {check_out}. "
+               "Thank you for choosing us! Questions: {phone}."),
+        'pt': ("[Camping Arequita] Sua estadia termina amanhã - {code}",
+               "Lembramos que a sua estadia {code} ({service_name}) termina amanhã, {check_out}. "
+               "Obrigado por nos escolher! Dúvidas: {phone}."),
+    },
+    EXPIRY_NOTICE: {
+        'es': ("[Camping Arequita] Tu pre-reserva vence pronto - {code}",
+               "Tu pre-reserva {code} ({service_name}) vence en menos de {hours_left} horas. "
+               "Para confirmarla comunicate al {phone}."),
+        'en': ("[Camping Arequita] Your pre-booking expires soon - {code}",
+               "Your pre-booking {code} ({service_name}) expires in less than {hours_left} hours. "
+               "To confirm it call {phone}."),
+        'pt': ("[Camping Arequita] Sua pré-reserva vence em breve - {code}",
+               "Sua pré-reserva {code} ({service_name}) vence em menos de {hours_left} horas. "
+               "Para confirmá-la ligue para {phone}."),
+    },
+}
+
+
+def _campaign_filters(campaign, now, expiry_hours):
+    """Condiciones de cada campaña; todas usan un índice (status, fecha) de pre_reservations."""
+    tomorrow = date.today() + timedelta(days=1)
+    if campaign == ARRIVAL_REMINDER:
+        return (PreReservation.status == 'confirmado', PreReservation.check_in == tomorrow)
+    if campaign == CHECKOUT_NOTICE:
+        return (PreReservation.status == 'activo', PreReservation.check_out == tomorrow)
+    return (
+        PreReservation.status == 'pendiente',
+        PreReservation.expires_at > now,
+        PreReservation.expires_at <= now + timedelta(hours=expiry_hours),
+    )
+
+
+def due_pre_reservations(campaign, now=None, expiry_hours=12) -> list[PreReservation]:
+    """
+    Pre-reservas a las que les toca el correo de `campaign` y todavía no lo
+    recibieron, con su servicio, en una sola consulta.
+    """
+    now = now or datetime.utcnow()
+    delivered = db.session.query(CampaignDelivery.pre_reservation_id).filter(
+        CampaignDelivery.campaign == campaign,
+        CampaignDelivery.pre_reservation_id == PreReservation.id,
+    ).exists()
+    return PreReservation.query.options(joinedload(PreReservation.service)).filter(
+        *_campaign_filters(campaign, now, expiry_hours), ~delivered
+    ).order_by(PreReservation.id.asc()).all()
+
+
+def _queue_campaign_email(campaign, reservation, expiry_hours):
+    lang = reservation.lang if reservation.lang in CAMPAIGN_MESSAGES[campaign] else 'es'
+    service_name = reservation.service.localized_name(lang) if reservation.service else 'Servicio'
+    snapshot = pre_reservation_snapshot(reservation, service_name)
+    subject, text = CAMPAIGN_MESSAGES[campaign][lang]
+    values = dict(snapshot, phone=PAYMENT_PHONE, hours_left=expiry_hours)
+
+    send_email(
+        subject=subject.format(**values),
+        recipients=[reservation.email],
+        text_body=text.format(**values),
+        template=campaign,
+        context={'pre_reservation': snapshot, 'payment_phone': PAYMENT_PHONE, 'hours_left': expiry_hours},
+        lang=lang,
+    )
+    db.session.add(CampaignDelivery(campaign=campaign, pre_reservation_id=reservation.id))
+
+
+def run_email_campaigns() -> dict:
+    """
+    Encola los correos de campaña que correspondan. Cada lote se registra en
+    campaign_deliveries en la misma transacción que sus correos del outbox,
+    así un correo nunca sale dos veces; el envío en sí lo hace email_sender
+    (lotes sobre conexiones SMTP reutilizadas).
+    """
+    started = time.monotonic()
+    batch_size = max(1, int(current_app.config.get('EMAIL_CAMPAIGN_BATCH_SIZE', 200)))
+    expiry_hours = max(1, int(current_app.config.get('PRE_RESERVATION_EXPIRY_NOTICE_HOURS', 12)))
+    now = datetime.utcnow()
+    queued = Counter()
+
+    for campaign in CAMPAIGN_MESSAGES:
+        due = due_pre_reservations(campaign, now, expiry_hours)
+        for start in range(0, len(due), batch_size):
+            batch = due[start:start + batch_size]
+            for reservation in batch:
+                _queue_campaign_email(campaign, reservation, expiry_hours)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Otro proceso ya encoló parte del lote: se descarta y lo
+                # pendiente entra en la próxima corrida.
+                db.session.rollback()
+                current_app.logger.warning(f"email-campaigns: lote de {campaign} ya registrado por otro proceso")
+                break
+            queued[campaign] += len(batch)
+            email_campaign_messages_total.labels(campaign=campaign).inc(len(batch))
+
+    elapsed = time.monotonic() - started
+    email_campaign_run_duration_seconds.observe(elapsed)
+    total = sum(queued.values())
+    if total:
+        current_app.logger.info(
+            f"email-campaigns: {total} correos encolados en {elapsed:.2f}s "
+            f"({total / elapsed if elapsed else total:.0f}/s): {dict(queued)}"
+        )
+    return dict(queued)
+
+
+email_campaigns = PeriodicWorker(
+    name="email-campaigns",
+    job=run_email_campaigns,
+    interval=3600,
+    lease_key=EMAIL_CAMPAIGNS_LEASE_KEY,
+    redis_client_getter=lambda: redis_pool.client,
+)
+
+
+def start_background_email_campaigns(app):
+    """
+    Modo gunicorn: corre las campañas en un hilo daemon del worker. El
+    lease evita corridas simultáneas y campaign_deliveries los duplicados.
+    """
+    if not app.config.get('EMAIL_CAMPAIGNS_IN_WORKERS', True):
+        return None
+
+    email_campaigns.interval = max(1, int(app.config.get('EMAIL_CAMPAIGN_INTERVAL', 3600)))
+    return email_campaigns.start_in_background(app)
@@ -0,0 +1,257 @@
+import base64
+import json
+import os
+import random
+import secrets
+import time
+from collections import Counter
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import func, or_
+from app.extensions import db, mail
+from app.metrics import email_outbox_depth, email_outbox_sent_total, email_send_duration_seconds
+from app.models.email import EmailOutbox
+from app.services.email_service import EMAIL_LANES, LANE_URGENT
+from app.services.periodic_worker import PeriodicWorker
+
+# Lotes por corrida: acota cuánto retiene el hilo una corrida con mucha cola.
+MAX_BATCHES_PER_RUN = 20
+# Un lote reclamado y no resuelto en este tiempo (worker caído) vuelve a la cola.
+CLAIM_SECONDS = 300
+
+_executors = {}
+_executors_pid = None
+
+
+def _pool(lane, size) -> ThreadPoolExecutor:
+    """Pool acotado de conexiones SMTP concurrentes, uno por carril y proceso."""
+    global _executors_pid
+    if _executors_pid != os.getpid():
+        _executors.clear()
+        _executors_pid = os.getpid()
+    if lane not in _executors:
+        _executors[lane] = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f'email-sender-{lane}')
+    return _executors[lane]
+
+
+def _lane_setting(lane, name, default) -> int:
+    """EMAIL_URGENT_<name> para el carril urgente (si está definido), si no EMAIL_<name>."""
+    if lane == LANE_URGENT:
+        value = current_app.config.get(f'EMAIL_URGENT_{name}')
+        if value:
+            return max(1, int(value))
+    return max(1, int(current_app.config.get(f'EMAIL_{name}', default)))
+
+
+def _ready_filter(lane, now):
+    return (
+        EmailOutbox.lane == lane,
+        EmailOutbox.status == 'pendiente',
+        EmailOutbox.next_attempt_at <= now,
+        or_(EmailOutbox.claimed_until.is_(None), EmailOutbox.claimed_until < now),
+    )
+
+
+def _claim_batch(lane: str, size: int) -> list[EmailOutbox]:
+    """
+    Reclama hasta `size` correos listos para enviar. El UPDATE condicional
+    garantiza que dos procesos no tomen el mismo correo.
+    """
+    now = datetime.utcnow()
+    ids = [
+        row[0] for row in db.session.query(EmailOutbox.id).filter(*_ready_filter(lane, now)).order_by(
+            EmailOutbox.next_attempt_at.asc(), EmailOutbox.id.asc()
+        ).limit(size).all()
+    ]
+    if not ids:
+        return []
+
+    token = secrets.token_hex(8)
+    db.session.query(EmailOutbox).filter(EmailOutbox.id.in_(ids), *_ready_filter(lane, now)).update(
+        {'claimed_by': token, 'claimed_until': now + timedelta(seconds=CLAIM_SECONDS)},
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return EmailOutbox.query.filter(EmailOutbox.id.in_(ids), EmailOutbox.claimed_by == token).all()
+
+
+# Idiomas con traducción propia de los correos; 'es' es el template base.
+TRANSLATED_EMAIL_LANGS = ('en', 'pt')
+
+
+def _email_template(name: str, lang: str):
+    """
+    Template de un correo en `lang`: `emails/<name>.<lang>.html` si el idioma
+    tiene traducción y existe, si no el base `emails/<name>.html`. Jinja ya
+    guarda los templates compilados en el cache del environment.
+    """
+    names = [f'emails/{name}.html']
+    if lang in TRANSLATED_EMAIL_LANGS:
+        names.insert(0, f'emails/{name}.{lang}.html')
+    return current_app.jinja_env.select_template(names)
+
+
+def _message_data(email: EmailOutbox) -> dict:
+    html_body = email.html_body
+    if email.template:
+        context = json.loads(email.context) if email.context else {}
+        html_body = _email_template(email.template, email.lang or 'es').render(**context)
+    return {
+        'id': email.id,
+        'subject': email.subject,
+        'recipients': [r for r in email.recipients.split(',') if r],
+        'text_body': email.text_body,
+        'html_body': html_body,
+        'attachments': json.loads(email.attachments) if email.attachments else [],
+    }
+
+
+def _build_message(data) -> Message:
+    msg = Message(data['subject'], recipients=data['recipients'])
+    msg.body = data['text_body']
+    msg.html = data['html_body']
+    for att in data['attachments']:
+        msg.attach(att['filename'], att['content_type'], base64.b64decode(att['data']))
+    return msg
+
+
+def _send_chunk(app, lane, chunk) -> dict:
+    """Envía un grupo de correos por una única conexión SMTP. Devuelve {id: error o None}."""
+    results = {}
+    with app.app_context():
+        try:
+            with mail.connect() as connection:
+                for data in chunk:
+                    started = time.monotonic()
+                    try:
+                        connection.send(_build_message(data))
+                        results[data['id']] = None
+                    except Exception as exc:
+                        results[data['id']] = str(exc) or exc.__class__.__name__
+                    email_send_duration_seconds.labels(lane=lane).observe(time.monotonic() - started)
+        except Exception as exc:
+            # Falló la conexión: lo que no se llegó a enviar queda para reintento.
+            for data in chunk:
+                results.setdefault(data['id'], str(exc) or exc.__class__.__name__)
+    return results
+
+
+def _send_batch(lane, batch) -> dict:
+    pool_size = _lane_setting(lane, 'SENDER_POOL_SIZE', 2)
+    results = {}
+    messages = []
+    for email in batch:
+        try:
+            messages.append(_message_data(email))
+        except Exception as exc:
+            results[email.id] = f"No se pudo renderizar {email.template}: {exc}"
+    chunks = [messages[i::pool_size] for i in range(pool_size) if messages[i::pool_size]]
+
+    app = current_app._get_current_object()
+    for chunk_results in _pool(lane, pool_size).map(lambda chunk: _send_chunk(app, lane, chunk), chunks):
+        results.update(chunk_results)
+    return results
+
+
+def _retry_delay(attempts: int) -> float:
+    """Backoff exponencial con jitter a partir de EMAIL_RETRY_BASE_SECONDS."""
+    base = current_app.config.get('EMAIL_RETRY_BASE_SECONDS', 30)
+    delay = min(base * 2 ** (attempts - 1), current_app.config.get('EMAIL_RETRY_MAX_SECONDS', 3600))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def drain_email_outbox(lane: str) -> dict:
+    """Envía los correos pendientes de un carril por lotes. Devuelve conteos por resultado."""
+    batch_size = _lane_setting(lane, 'OUTBOX_BATCH_SIZE', 50)
+    max_attempts = max(1, int(current_app.config.get('EMAIL_MAX_ATTEMPTS', 6)))
+    totals = Counter()
+
+    for _ in range(MAX_BATCHES_PER_RUN):
+        batch = _claim_batch(lane, batch_size)
+        if not batch:
+            break
+
+        now = datetime.utcnow()
+        expired = [email for email in batch if email.expires_at and email.expires_at <= now]
+        sendable = [email for email in batch if email not in expired]
+        results = _send_batch(lane, sendable) if sendable else {}
+
+        now = datetime.utcnow()
+        for email in batch:
+            email.claimed_by = None
+            email.claimed_until = None
+            if email in expired:
+                email.status = 'vencido'
+                result = 'expired'
+            else:
+                email.attempts += 1
+                error = results.get(email.id)
+                if error is None:
+                    email.status = 'enviado'
+                    email.sent_at = now
+                    email.last_error = None
+                    result = 'sent'
+                elif email.attempts >= max_attempts:
+                    email.status = 'fallido'
+                    email.last_error = error
+                    result = 'failed'
+                else:
+                    email.next_attempt_at = now + timedelta(seconds=_retry_delay(email.attempts))
+                    email.last_error = error
+                    result = 'retry'
+            if email.status in ('enviado', 'vencido'):
+                # El cuerpo puede tener datos sensibles (códigos 2FA): no se guarda más de lo necesario.
+                email.text_body = email.html_body = email.context = email.attachments = None
+            totals[result] += 1
+            email_outbox_sent_total.labels(lane=lane, result=result).inc()
+        db.session.commit()
+
+        if len(batch) < batch_size:
+            break
+
+    if totals['failed']:
+        current_app.logger.error(f"email-sender-{lane}: {totals['failed']} correos descartados tras {max_attempts} intentos")
+
+    email_outbox_depth.labels(lane=lane).set(
+        db.session.query(func.count(EmailOutbox.id)).filter(
+            EmailOutbox.lane == lane, EmailOutbox.status == 'pendiente'
+        ).scalar() or 0
+    )
+    return dict(totals)
+
+
+# Un hilo por carril: el urgente nunca espera detrás de un lote normal.
+email_senders = {
+    lane: PeriodicWorker(name=f"email-sender-{lane}", job=partial(drain_email_outbox, lane))
+    for lane in EMAIL_LANES
+}
+
+
+def start_background_email_sender(app, lanes=EMAIL_LANES):
+    """
+    Modo gunicorn: vacía el outbox desde hilos daemon de cada worker.
+    Cada worker reclama sus propios lotes, así que pueden correr a la vez.
+    """
+    if not app.config.get('EMAIL_SENDER_IN_WORKERS', True):
+        return None
+
+    interval = max(1, int(app.config.get('EMAIL_OUTBOX_INTERVAL', 10)))
+    for lane in lanes:
+        email_senders[lane].interval = interval
+        email_senders[lane].start_in_background(app)
+    return email_senders
+
+
+def wake_email_sender(*lanes):
+    """
+    Hook post-commit: envía enseguida lo recién encolado en esos carriles si
+    este proceso tiene hilos de envío (workers de gunicorn). No los inicia:
+    en la CLI o en procesos sueltos el correo queda en el outbox y lo envía
+    la próxima ronda periódica de un worker o de `flask run-email-sender`.
+    """
+    for lane in lanes or EMAIL_LANES:
+        if email_senders[lane].is_running():
+            email_senders[lane].wake()
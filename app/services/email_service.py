@@ -1,65 +1,127 @@
-from flask_mail import Message
-from flask import current_app, render_template
-from app.extensions import mail
-from threading import Thread
-
-def send_async_email(app, msg):
-    with app.app_context():
-        try:
-            mail.send(msg)
-        except Exception as e:
-            print(f"Error al enviar correo electrónico: {e}")
-
-def send_email(subject, recipients, text_body, html_body, attachments=None):
-    msg = Message(subject, recipients=recipients)
-    msg.body = text_body
-    msg.html = html_body
-    
-    if attachments:
-        for att in attachments:
-            msg.attach(
-                att['filename'],
-                att['content_type'],
-                att['data']
-            )
-    
-    # Send asynchronously to not block the server
-    Thread(target=send_async_email, args=(current_app._get_current_object(), msg)).start()
+import base64
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.email import EmailOutbox
+
+# Carriles de envío: cada uno tiene su propio hilo y conexiones SMTP, así una
+# ráfaga de avisos de pre-reserva no demora los códigos 2FA.
+LANE_URGENT = 'urgente'
+LANE_NORMAL = 'normal'
+EMAIL_LANES = (LANE_URGENT, LANE_NORMAL)
+
+PAYMENT_PHONE = '4440 2503'
+
+
+def _encode_attachments(attachments):
+    if not attachments:
+        return None
+    return json.dumps([
+        {
+            'filename': att['filename'],
+            'content_type': att['content_type'],
+            'data': base64.b64encode(att['data']).decode('ascii'),
+        }
+        for att in attachments
+    ])
+
+
+def send_email(subject, recipients, text_body, html_body=None, attachments=None, expires_in=None,
+               lane=LANE_NORMAL, template=None, context=None, lang='es'):
+    """
+    Encola el correo en email_outbox dentro de la transacción en curso: sale
+    cuando quien llama hace commit (y nunca si hace rollback), aunque el
+    worker muera o el SMTP esté lento. `expires_in` (segundos) descarta el
+    correo si para entonces todavía no se pudo enviar; `lane` elige el
+    carril de envío (LANE_URGENT para lo que alguien está esperando).
+
+    Con `template` el HTML no se renderiza en el request: se guarda
+    `context` (datos simples, serializables a JSON) y lo renderiza el
+    sender con el template de `lang` ya compilado.
+    """
+    if lane not in EMAIL_LANES:
+        raise ValueError(f"Carril de correo desconocido: {lane}")
+
+    now = datetime.utcnow()
+    email = EmailOutbox(
+        subject=subject,
+        recipients=','.join(recipients),
+        text_body=text_body,
+        html_body=html_body,
+        template=template,
+        context=json.dumps(context, ensure_ascii=False) if template else None,
+        lang=lang,
+        attachments=_encode_attachments(attachments),
+        lane=lane,
+        status='pendiente',
+        attempts=0,
+        next_attempt_at=now,
+        expires_at=now + timedelta(seconds=expires_in) if expires_in else None,
+    )
+    db.session.add(email)
+    db.session.info.setdefault('email_outbox_lanes', set()).add(lane)
+    return email
+
+
+@event.listens_for(Session, 'after_commit')
+def _wake_email_sender(session):
+    lanes = session.info.pop('email_outbox_lanes', None)
+    if lanes:
+        from app.services.email_sender import wake_email_sender
+        wake_email_sender(*lanes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_email_wakeup(session):
+    session.info.pop('email_outbox_lanes', None)
 
 def send_2fa_email(to_email, code):
     subject = "[Sistema de Reservas Camping Arequita] Código de Verificación"
-    
-    html_body = render_template(
-        'emails/2fa_code.html',
-        code=code
-    )
-    
+
     send_email(
         subject=subject,
         recipients=[to_email],
         text_body=f"Tu código de verificación es: {code}. Expira en 10 minutos.",
-        html_body=html_body
+        template='2fa_code',
+        context={'code': code},
+        expires_in=600,
+        lane=LANE_URGENT,
     )
 
 
-def send_camping_pre_reservation_email(pre_reservation):
-    subject = f"[Camping Arequita] Pre-reserva recibida - {pre_reservation.code}"
+def pre_reservation_snapshot(pre_reservation, service_name) -> dict:
+    """Datos de la pre-reserva que usan los templates de correo (serializables a JSON)."""
+    return {
+        'full_name': pre_reservation.full_name,
+        'code': pre_reservation.code,
+        'service_name': service_name,
+        'check_in': pre_reservation.check_in.strftime('%d/%m/%Y'),
+        'check_out': pre_reservation.check_out.strftime('%d/%m/%Y'),
+        'guests': pre_reservation.guests,
+    }
 
-    html_body = render_template(
-        'emails/camping_pre_reservation.html',
-        pre_reservation=pre_reservation,
-        payment_phone='4440 2503',
-    )
 
-    service_name = pre_reservation.service.localized_name(pre_reservation.lang) if pre_reservation.service else 'Servicio'
+def send_camping_pre_reservation_email(pre_reservation, service=None):
+    """`service` evita la carga perezosa de pre_reservation.service si quien llama ya lo tiene."""
+    subject = f"[Camping Arequita] Pre-reserva recibida - {pre_reservation.code}"
+
+    service = service or pre_reservation.service
+    service_name = service.localized_name(pre_reservation.lang) if service else 'Servicio'
     text_body = (
         f"Tu pre-reserva {pre_reservation.code} para {service_name} fue recibida. "
-        f"Debes formalizarla llamando al 4440 2503 para completar el pago."
+        f"Debes formalizarla llamando al {PAYMENT_PHONE} para completar el pago."
     )
 
     send_email(
         subject=subject,
         recipients=[pre_reservation.email],
         text_body=text_body,
-        html_body=html_body,
+        template='camping_pre_reservation',
+        context={
+            'pre_reservation': pre_reservation_snapshot(pre_reservation, service_name),
+            'payment_phone': PAYMENT_PHONE,
+        },
+        lang=pre_reservation.lang or 'es',
     )
@@ -0,0 +1,272 @@
+import calendar
+from datetime import date, timedelta
+from sqlalchemy import event, func, insert, update
+from sqlalchemy.orm import Session
+from app.extensions import db
+from app.models.camping import CampingService, ServiceNightInventory
+from app.services.cache_service import cache_service, service_namespace
+
+AVAILABILITY_CACHE_TTL = 3600
+# Días hacia adelante que se regeneran al editar un servicio (refresh_availability).
+AVAILABILITY_REFRESH_DAYS = 90
+
+
+def availability_cache_key(service_id: int, year: int, month: int) -> str:
+    return availability_cache_keys(service_id, [(year, month)])[0]
+
+
+def availability_cache_keys(service_id: int, months, bump=()) -> list[str]:
+    # Depende de total_units: se invalida junto con el namespace del servicio.
+    return cache_service.versioned_keys(
+        [f"public_availability_{service_id}_{year:04d}-{month:02d}" for year, month in months],
+        service_namespace(service_id),
+        bump=bump,
+    )
+
+
+def search_index_key(service_id: int) -> str:
+    """Índice de las búsquedas por fechas cacheadas en las que participó un servicio."""
+    return f"public_search_index_{service_id}"
+
+
+def months_between(start: date, end: date) -> list[tuple[int, int]]:
+    """Meses (año, mes) que cubren las noches [start, end)."""
+    months = []
+    year, month = start.year, start.month
+    last = end - timedelta(days=1)
+    while (year, month) <= (last.year, last.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def _mark_touched(service_id: int, check_in: date, check_out: date) -> None:
+    """Registra los meses modificados para invalidar su caché tras el commit."""
+    touched = db.session.info.setdefault('inventory_touched', set())
+    for year, month in months_between(check_in, check_out):
+        touched.add((service_id, year, month))
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_touched_months(session):
+    touched = session.info.pop('inventory_touched', ())
+    months_by_service = {}
+    for service_id, year, month in touched:
+        months_by_service.setdefault(service_id, []).append((year, month))
+
+    keys = []
+    for service_id, months in months_by_service.items():
+        keys.extend(availability_cache_keys(service_id, months))
+    cache_service.delete_many(keys)
+    for service_id in months_by_service:
+        cache_service.clear_index(search_index_key(service_id))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_touched_months(session):
+    session.info.pop('inventory_touched', None)
+
+
+def stay_nights(check_in: date, check_out: date) -> list[date]:
+    """Noches ocupadas por una estadía: [check_in, check_out)."""
+    return [check_in + timedelta(days=offset) for offset in range((check_out - check_in).days)]
+
+
+def _ensure_night_rows(service_id: int, check_in: date, check_out: date) -> None:
+    """Crea (si faltan) las filas del ledger para cada noche de la estadía."""
+    rows = [
+        {'service_id': service_id, 'night': night, 'booked_units': 0}
+        for night in stay_nights(check_in, check_out)
+    ]
+    if not rows:
+        return
+
+    stmt = (
+        insert(ServiceNightInventory)
+        .prefix_with('IGNORE', dialect='mysql')
+        .prefix_with('IGNORE', dialect='mariadb')
+        .prefix_with('OR IGNORE', dialect='sqlite')
+    )
+    db.session.execute(stmt, rows)
+
+
+def remaining_units(service, check_in: date, check_out: date) -> int:
+    """Unidades libres en todas las noches de la estadía (mínimo por noche)."""
+    max_booked = db.session.query(func.max(ServiceNightInventory.booked_units)).filter(
+        ServiceNightInventory.service_id == service.id,
+        ServiceNightInventory.night >= check_in,
+        ServiceNightInventory.night < check_out,
+    ).scalar() or 0
+    return max(0, service.total_units - max_booked)
+
+
+def remaining_units_for_night(services, night: date | None = None) -> dict[int, int]:
+    """Unidades libres de cada servicio para una noche (por defecto, hoy)."""
+    night = night or date.today()
+    services = list(services)
+    if not services:
+        return {}
+
+    booked = dict(
+        db.session.query(ServiceNightInventory.service_id, ServiceNightInventory.booked_units).filter(
+            ServiceNightInventory.service_id.in_([service.id for service in services]),
+            ServiceNightInventory.night == night,
+        ).all()
+    )
+    return {
+        service.id: max(0, service.total_units - booked.get(service.id, 0))
+        for service in services
+    }
+
+
+def reserve_stay(service, check_in: date, check_out: date, units: int = 1) -> bool:
+    """
+    Descuenta `units` en todas las noches de la estadía con un único UPDATE
+    condicionado. Si alguna noche no tiene cupo, deshace el savepoint y
+    devuelve False. No hace commit: lo decide quien llama.
+    """
+    nights = (check_out - check_in).days
+    if nights <= 0:
+        return False
+
+    _ensure_night_rows(service.id, check_in, check_out)
+
+    savepoint = db.session.begin_nested()
+    result = db.session.execute(
+        update(ServiceNightInventory)
+        .where(
+            ServiceNightInventory.service_id == service.id,
+            ServiceNightInventory.night >= check_in,
+            ServiceNightInventory.night < check_out,
+            ServiceNightInventory.booked_units + units <= service.total_units,
+        )
+        .values(booked_units=ServiceNightInventory.booked_units + units)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != nights:
+        savepoint.rollback()
+        return False
+
+    savepoint.commit()
+    _mark_touched(service.id, check_in, check_out)
+    return True
+
+
+def release_stay(service_id: int, check_in: date, check_out: date, units: int = 1, from_night: date | None = None) -> int:
+    """
+    Devuelve `units` al inventario para las noches de la estadía a partir de
+    `from_night` (las noches ya transcurridas no se liberan). No hace commit.
+    """
+    start = max(check_in, from_night) if from_night else check_in
+    if start >= check_out:
+        return 0
+
+    result = db.session.execute(
+        update(ServiceNightInventory)
+        .where(
+            ServiceNightInventory.service_id == service_id,
+            ServiceNightInventory.night >= start,
+            ServiceNightInventory.night < check_out,
+            ServiceNightInventory.booked_units >= units,
+        )
+        .values(booked_units=ServiceNightInventory.booked_units - units)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        _mark_touched(service_id, start, check_out)
+    return result.rowcount
+
+
+def _compute_month_availability(service, year: int, month: int):
+    def compute():
+        days_in_month = calendar.monthrange(year, month)[1]
+        first_night = date(year, month, 1)
+        booked = dict(
+            db.session.query(ServiceNightInventory.night, ServiceNightInventory.booked_units).filter(
+                ServiceNightInventory.service_id == service.id,
+                ServiceNightInventory.night >= first_night,
+                ServiceNightInventory.night < first_night + timedelta(days=days_in_month),
+            ).all()
+        )
+        return [
+            max(0, service.total_units - booked.get(first_night + timedelta(days=offset), 0))
+            for offset in range(days_in_month)
+        ]
+
+    return compute
+
+
+def month_availability(service, year: int, month: int) -> list[int]:
+    """
+    Unidades libres por noche de un mes completo (índice 0 = día 1).
+    Se cachea por (servicio, mes): un calendario de temporada cuesta una
+    lectura de caché por mes en lugar de recorrer las reservas.
+    """
+    return cache_service.get_or_compute(
+        availability_cache_key(service.id, year, month),
+        _compute_month_availability(service, year, month),
+        timeout=AVAILABILITY_CACHE_TTL,
+    )
+
+
+def refresh_availability(service, bump=(), days: int = AVAILABILITY_REFRESH_DAYS) -> int:
+    """
+    Recalcula y escribe los meses de los próximos `days` días (write-through).
+    Con `bump` se escriben bajo la versión que tendrán tras invalidar esos
+    namespaces. Devuelve cuántos meses se escribieron.
+    """
+    start = date.today()
+    months = months_between(start, start + timedelta(days=days))
+    keys = availability_cache_keys(service.id, months, bump=bump)
+    for key, (year, month) in zip(keys, months):
+        cache_service.refresh(key, _compute_month_availability(service, year, month), timeout=AVAILABILITY_CACHE_TTL)
+    return len(months)
+
+
+def availability_calendar(service, start: date, end: date) -> list[dict]:
+    """
+    Calendario noche a noche [start, end) armado desde los fragmentos
+    mensuales, leídos todos juntos (un MGET) y calculando solo los faltantes.
+    """
+    months = months_between(start, end)
+    fragments = cache_service.get_or_compute_many(
+        [
+            (key, _compute_month_availability(service, year, month))
+            for key, (year, month) in zip(availability_cache_keys(service.id, months), months)
+        ],
+        timeout=AVAILABILITY_CACHE_TTL,
+    )
+
+    nights = []
+    for (year, month), fragment in zip(months, fragments):
+        for offset, available in enumerate(fragment):
+            night = date(year, month, offset + 1)
+            if start <= night < end:
+                nights.append({'date': night.isoformat(), 'available': available})
+    return nights
+
+
+def search_available_services(check_in: date, check_out: date, guests: int) -> list[tuple]:
+    """
+    Servicios activos con capacidad para `guests`, con las unidades libres en
+    todas las noches de la estadía, resueltos en una sola consulta agregada.
+    Devuelve [(service, remaining)] incluyendo los que no tienen cupo (remaining=0)
+    para que quien llama sepa qué servicios participaron de la búsqueda.
+    """
+    max_booked = db.session.query(
+        ServiceNightInventory.service_id.label('service_id'),
+        func.max(ServiceNightInventory.booked_units).label('max_booked'),
+    ).filter(
+        ServiceNightInventory.night >= check_in,
+        ServiceNightInventory.night < check_out,
+    ).group_by(ServiceNightInventory.service_id).subquery()
+
+    remaining = (CampingService.total_units - func.coalesce(max_booked.c.max_booked, 0)).label('remaining')
+    rows = db.session.query(CampingService, remaining).outerjoin(
+        max_booked, max_booked.c.service_id == CampingService.id
+    ).filter(
+        CampingService.is_active.is_(True),
+        CampingService.capacity >= guests,
+    ).order_by(CampingService.is_featured.desc(), CampingService.created_at.desc()).all()
+
+    return [(service, max(0, units)) for service, units in rows]
@@ -0,0 +1,54 @@
+import time
+from flask import current_app
+from app.metrics import (
+    pre_reservation_sweep_last_run_timestamp,
+    pre_reservation_sweep_last_rows,
+    pre_reservation_sweep_rows_total,
+    pre_reservation_sweep_duration_seconds,
+)
+from app.redis_utils import redis_pool
+from app.services.periodic_worker import PeriodicWorker
+from app.services.reservation_service import sweep_pre_reservation_lifecycle
+
+SWEEPER_LEASE_KEY = "lease:pre_reservation_sweeper"
+
+
+def run_pre_reservation_sweep() -> dict:
+    """Ejecuta un barrido y publica las métricas de la corrida."""
+    started = time.monotonic()
+    touched = sweep_pre_reservation_lifecycle()
+    pre_reservation_sweep_duration_seconds.observe(time.monotonic() - started)
+
+    for transition, rows in touched.items():
+        pre_reservation_sweep_last_rows.labels(transition=transition).set(rows)
+        if rows:
+            pre_reservation_sweep_rows_total.labels(transition=transition).inc(rows)
+    pre_reservation_sweep_last_run_timestamp.set(time.time())
+
+    if any(touched.values()):
+        current_app.logger.info(
+            f"Barrido de pre-reservas: {touched['expired']} expiradas, "
+            f"{touched['completed']} completadas"
+        )
+    return touched
+
+
+pre_reservation_sweeper = PeriodicWorker(
+    name="pre-reservation-sweeper",
+    job=run_pre_reservation_sweep,
+    lease_key=SWEEPER_LEASE_KEY,
+    redis_client_getter=lambda: redis_pool.client,
+)
+
+
+def start_background_sweeper(app):
+    """
+    Modo gunicorn: lanza el barrido en un hilo daemon del worker.
+    Todos los workers lo inician, pero el lease en Redis garantiza que
+    solo uno barra por intervalo.
+    """
+    if not app.config.get('PRE_RESERVATION_SWEEPER_IN_WORKERS', True):
+        return None
+
+    pre_reservation_sweeper.interval = max(1, int(app.config.get('PRE_RESERVATION_SWEEP_INTERVAL', 60)))
+    return pre_reservation_sweeper.start_in_background(app)
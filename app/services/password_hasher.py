@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from argon2 import PasswordHasher
+from app.metrics import (
+    argon2_duration_seconds,
+    argon2_in_flight,
+    argon2_queue_seconds,
+    argon2_rejected_total,
+)
+
+
+class PasswordHashingBusy(Exception):
+    """No hubo lugar en la cola de Argon2 dentro del tiempo de espera."""
+
+
+class Argon2Pool:
+    """
+    Hash y verificación Argon2 en un pool acotado.
+
+    Cada operación usa `memory_cost` KiB y decenas de ms de CPU: corriendo
+    directo en los hilos de gthread, unos pocos logins simultáneos alcanzan
+    para agotar la memoria del contenedor. Acá corren como mucho
+    `max_concurrency` a la vez por proceso; hasta `max_queue` más esperan y,
+    si la cola está llena por más de `queue_timeout` segundos, se rechaza
+    con PasswordHashingBusy.
+    """
+
+    def __init__(self):
+        self.hasher = PasswordHasher()
+        self.max_concurrency = 2
+        self.max_queue = 32
+        self.queue_timeout = 5.0
+        self._executor = None
+        self._executor_pid = None
+        self._slots = threading.BoundedSemaphore(self.max_concurrency + self.max_queue)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.hasher = PasswordHasher(
+            time_cost=app.config.get('ARGON2_TIME_COST', 3),
+            memory_cost=app.config.get('ARGON2_MEMORY_COST', 65536),
+            parallelism=app.config.get('ARGON2_PARALLELISM', 4),
+        )
+        self.max_concurrency = max(1, int(app.config.get('ARGON2_MAX_CONCURRENCY', 2)))
+        self.max_queue = max(0, int(app.config.get('ARGON2_MAX_QUEUE', 32)))
+        self.queue_timeout = float(app.config.get('ARGON2_QUEUE_TIMEOUT', 5))
+        with self._lock:
+            self._executor = None
+            self._slots = threading.BoundedSemaphore(self.max_concurrency + self.max_queue)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            # Los hilos no sobreviven a un fork: cada worker arma su pool.
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='argon2')
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, operation, func, *args):
+        slots = self._slots
+        if not slots.acquire(timeout=self.queue_timeout):
+            argon2_rejected_total.labels(operation=operation).inc()
+            raise PasswordHashingBusy(f"Cola de Argon2 llena ({self.max_concurrency + self.max_queue} operaciones)")
+
+        submitted = time.monotonic()
+
+        def task():
+            started = time.monotonic()
+            argon2_queue_seconds.labels(operation=operation).observe(started - submitted)
+            argon2_in_flight.inc()
+            try:
+                return func(*args)
+            finally:
+                argon2_in_flight.dec()
+                argon2_duration_seconds.labels(operation=operation).observe(time.monotonic() - started)
+
+        try:
+            future = self._pool().submit(task)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future.result()
+
+    def hash(self, secret: str) -> str:
+        return self._run('hash', self.hasher.hash, secret)
+
+    def verify(self, hashed: str, secret: str) -> bool:
+        """True si `secret` coincide; False ante cualquier error de Argon2 (hash inválido incluido)."""
+        if not hashed:
+            return False
+        try:
+            return self._run('verify', self.hasher.verify, hashed, secret)
+        except PasswordHashingBusy:
+            raise
+        except Exception:
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True si el hash usa parámetros distintos de los configurados (no corre Argon2)."""
+        try:
+            return self.hasher.check_needs_rehash(hashed)
+        except Exception:
+            return False
+
+
+password_hasher = Argon2Pool()
@@ -0,0 +1,115 @@
+import secrets
+import threading
+import time
+
+
+class PeriodicWorker:
+    """
+    Ejecuta un job a intervalo fijo fuera del ciclo de request.
+
+    Puede correr como proceso dedicado (run_forever, bloqueante) o como
+    hilo daemon dentro de un worker de gunicorn (start_in_background).
+    Si se define lease_key y Redis está disponible, solo el proceso que
+    obtiene el lease ejecuta el job en cada ventana de `interval` segundos.
+    """
+
+    def __init__(self, name, job, interval=60, lease_key=None, redis_client_getter=None):
+        self.name = name
+        self.job = job
+        self.interval = max(1, int(interval))
+        self.lease_key = lease_key
+        self._redis_client_getter = redis_client_getter
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+        self._force_next = False
+        self._thread = None
+
+    def _redis_client(self):
+        if not self._redis_client_getter:
+            return None
+        try:
+            return self._redis_client_getter()
+        except Exception:
+            return None
+
+    def _acquire_lease(self, app) -> bool:
+        if not self.lease_key:
+            return True
+
+        client = self._redis_client()
+        if not client:
+            # Sin Redis no hay coordinación posible: cada proceso ejecuta
+            # el job (los jobs deben ser idempotentes).
+            return True
+
+        try:
+            token = secrets.token_hex(8)
+            return bool(client.set(self.lease_key, token, nx=True, ex=self.interval))
+        except Exception as exc:
+            app.logger.warning(f"{self.name}: no se pudo obtener lease en Redis: {exc}")
+            return True
+
+    def run_once(self, app, force=False):
+        """Ejecuta el job una vez si se obtiene el lease. Devuelve el resultado o None."""
+        with app.app_context():
+            if not force and not self._acquire_lease(app):
+                return None
+            try:
+                return self.job()
+            except Exception as exc:
+                app.logger.error(f"{self.name}: error ejecutando job: {exc}")
+                try:
+                    from app.extensions import db
+                    db.session.rollback()
+                except Exception:
+                    pass
+                return None
+            finally:
+                try:
+                    from app.extensions import db
+                    db.session.remove()
+                except Exception:
+                    pass
+
+    def run_forever(self, app):
+        """Bucle bloqueante: ejecuta el job cada `interval` segundos hasta stop()."""
+        app.logger.info(f"{self.name}: iniciado (intervalo {self.interval}s)")
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            force, self._force_next = self._force_next, False
+            self.run_once(app, force=force)
+            elapsed = time.monotonic() - started
+            self._wake_event.wait(max(0.0, self.interval - elapsed))
+            self._wake_event.clear()
+        app.logger.info(f"{self.name}: detenido")
+
+    def start_in_background(self, app):
+        """Inicia run_forever en un hilo daemon (idempotente por proceso)."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self.run_forever,
+            args=(app,),
+            name=self.name,
+            daemon=True,
+        )
+        self._thread.start()
+        return self._thread
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def wake(self, force=False):
+        """
+        Adelanta la próxima ejecución sin esperar al intervalo.
+        Con force=True esa ejecución no depende del lease.
+        """
+        if force:
+            self._force_next = True
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
@@ -0,0 +1,177 @@
+from flask import current_app
+from app.extensions import db
+from app.models.camping import CampingService, HeroImage
+from app.services.cache_service import cache_service, NS_SERVICES, NS_HERO_IMAGES, NS_TESTIMONIALS
+from app.services.catalog_service import build_public_catalog
+from app.services.search_index import search_service_scores
+from app.services.testimonial_service import (
+    approximate_testimonials_total,
+    published_testimonials_after,
+    published_testimonials_page,
+)
+
+# Idiomas del sitio público.
+PUBLIC_LANGS = ('es', 'en', 'pt')
+
+SERVICES_TIMEOUT = 300
+# Órdenes del catálogo aceptados por la API ('' = destacados y recientes primero).
+SERVICE_SORTS = ('', 'rating')
+HERO_IMAGES_TIMEOUT = 3600
+TESTIMONIALS_TIMEOUT = 300
+TESTIMONIALS_PER_PAGE = 8
+
+# Namespaces de los que depende cada payload.
+SERVICES_NAMESPACES = (NS_SERVICES,)
+HERO_IMAGES_NAMESPACES = (NS_HERO_IMAGES,)
+# Los testimonios muestran el nombre del servicio: dependen de ambos namespaces.
+TESTIMONIALS_NAMESPACES = (NS_TESTIMONIALS, NS_SERVICES)
+
+
+def cached_json(cache_key: str, build, timeout: int = 300, namespaces: tuple = (), bump=None):
+    """
+    (etag, body) de un payload JSON público desde el caché de respuestas
+    codificadas; los misses y vencimientos pasan por el single-flight de
+    get_or_compute_response. `namespaces` indica de qué contenido depende
+    el payload (para invalidarlo).
+    Con `bump` (namespaces a punto de invalidarse) el payload se recalcula
+    y se escribe bajo la versión siguiente: ver refresh_public_payloads.
+    """
+    encode = lambda: current_app.json.dumps(build()).encode('utf-8')
+    if bump is not None:
+        return cache_service.refresh_response(
+            cache_service.versioned_key(cache_key, *namespaces, bump=bump), encode, timeout=timeout
+        )
+    return cache_service.get_or_compute_response(
+        cache_service.versioned_key(cache_key, *namespaces), encode, timeout=timeout
+    )
+
+
+def services_payload(lang: str, search: str = '', service_type: str = '', sort: str = '', bump=None):
+    """
+    Catálogo público filtrado por búsqueda normalizada y tipo. Con
+    sort='rating' se ordena por calificación promedio (y cantidad) en lugar
+    de destacados/recientes o relevancia de la búsqueda.
+    """
+    if service_type == 'all':
+        service_type = ''
+    if sort not in SERVICE_SORTS:
+        sort = ''
+
+    def build():
+        query = CampingService.query.filter_by(is_active=True)
+        if service_type:
+            query = query.filter(CampingService.service_type == service_type)
+
+        scores = {}
+        if search:
+            scores = search_service_scores(search, lang)
+            query = query.filter(CampingService.id.in_(list(scores)))
+
+        order = [CampingService.is_featured.desc(), CampingService.created_at.desc()]
+        if sort == 'rating':
+            order = [CampingService.rating_avg.desc(), CampingService.rating_count.desc(), *order]
+        services = query.order_by(*order).all()
+
+        if search and not sort:
+            # Orden estable: a igual puntaje se mantiene destacado/reciente primero.
+            services.sort(key=lambda service: scores[service.id], reverse=True)
+
+        return build_public_catalog(services, lang)
+
+    return cached_json(
+        f"public_services_{lang}_{search}_{service_type}_{sort}",
+        build,
+        timeout=SERVICES_TIMEOUT,
+        namespaces=SERVICES_NAMESPACES,
+        bump=bump,
+    )
+
+
+def hero_images_payload(bump=None):
+    def build():
+        images = HeroImage.query.filter_by(is_active=True).order_by(HeroImage.sort_order.asc(), HeroImage.id.asc()).all()
+        return [img.url for img in images]
+
+    return cached_json(
+        "public_hero_images", build, timeout=HERO_IMAGES_TIMEOUT, namespaces=HERO_IMAGES_NAMESPACES, bump=bump
+    )
+
+
+def testimonials_payload(lang: str, service_id: int | None = None, page: int = 1, per_page: int = TESTIMONIALS_PER_PAGE, bump=None):
+    def build():
+        result = published_testimonials_page(lang, service_id, page, per_page)
+        return {
+            'testimonials': result['items'],
+            'reviews': result['items'],
+            'total': result['total'],
+            'pages': result['pages'],
+            'current_page': result['page']
+        }
+
+    return cached_json(
+        f"public_testimonios_{lang}_{service_id}_{page}_{per_page}",
+        build,
+        timeout=TESTIMONIALS_TIMEOUT,
+        namespaces=TESTIMONIALS_NAMESPACES,
+        bump=bump,
+    )
+
+
+def testimonials_cursor_payload(lang: str, service_id: int | None = None, cursor: str | None = None, per_page: int = TESTIMONIALS_PER_PAGE):
+    """
+    Variante por cursor del listado de testimonios: cada página se pide con
+    el `next_cursor` de la anterior y `total` es aproximado (contador
+    incremental), así ninguna página paga OFFSET ni COUNT(*).
+    `cursor` debe venir validado (decode_cursor).
+    """
+    def build():
+        testimonials, next_cursor = published_testimonials_after(lang, service_id, cursor, per_page)
+        return {
+            'testimonials': testimonials,
+            'reviews': testimonials,
+            'total': approximate_testimonials_total(service_id),
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+        }
+
+    return cached_json(
+        f"public_testimonios_cursor_{lang}_{service_id}_{cursor or ''}_{per_page}",
+        build,
+        timeout=TESTIMONIALS_TIMEOUT,
+        namespaces=TESTIMONIALS_NAMESPACES,
+    )
+
+
+def warmable_payloads():
+    """
+    Payloads públicos que se pre-renderizan: por idioma, el catálogo completo
+    y por tipo (sin búsqueda libre), las imágenes del hero y la primera
+    página de testimonios general y de cada servicio activo.
+    Devuelve [(nombre, namespaces, build(bump=None))].
+    """
+    service_types = [
+        row[0] for row in db.session.query(CampingService.service_type).filter(
+            CampingService.is_active.is_(True)
+        ).distinct().order_by(CampingService.service_type.asc()).all()
+    ]
+    service_ids = [
+        row[0] for row in db.session.query(CampingService.id).filter(
+            CampingService.is_active.is_(True)
+        ).order_by(CampingService.id.asc()).all()
+    ]
+
+    payloads = [("hero_images", HERO_IMAGES_NAMESPACES, hero_images_payload)]
+    for lang in PUBLIC_LANGS:
+        for service_type in ['', *service_types]:
+            payloads.append((
+                f"services_{lang}_{service_type or 'all'}",
+                SERVICES_NAMESPACES,
+                lambda bump=None, lang=lang, service_type=service_type: services_payload(lang, '', service_type, bump=bump),
+            ))
+        for service_id in [None, *service_ids]:
+            payloads.append((
+                f"testimonials_{lang}_{service_id or 'all'}",
+                TESTIMONIALS_NAMESPACES,
+                lambda bump=None, lang=lang, service_id=service_id: testimonials_payload(lang, service_id, bump=bump),
+            ))
+    return payloads
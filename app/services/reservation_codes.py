@@ -0,0 +1,125 @@
+import hashlib
+import hmac
+import os
+import string
+import threading
+from flask import current_app
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+from app.models.camping import CodeSequence
+
+ROUNDS = 4
+
+
+class CodeAllocator:
+    """
+    Códigos públicos únicos sin consultar la tabla destino.
+
+    Cada código es la imagen de un valor de secuencia por una permutación
+    con clave (Feistel FE1 sobre el espacio de códigos `a * b`): valores
+    distintos dan códigos distintos, y los consecutivos no se parecen entre
+    sí. La secuencia vive en `code_sequences` y cada proceso reserva bloques
+    de `RESERVATION_CODE_BLOCK_SIZE` valores en una transacción propia, así
+    que emitir un código casi nunca toca la base.
+
+    La clave (`RESERVATION_CODE_KEY`, por defecto SECRET_KEY) no debe
+    cambiar: con otra clave la permutación es otra y se repetirían códigos.
+    """
+
+    def __init__(self, name, a, b, format_value):
+        self.name = name
+        self.a = a
+        self.b = b
+        self.size = a * b
+        self.format_value = format_value
+        self._next = 0
+        self._end = 0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def next_code(self) -> str:
+        with self._lock:
+            # Tras un fork el bloque heredado lo usaría también el padre.
+            if self._pid != os.getpid() or self._next >= self._end:
+                self._reserve_block()
+            value = self._next
+            self._next += 1
+        return self.format_value(self._permute(value))
+
+    def _reserve_block(self):
+        block_size = max(1, int(current_app.config.get('RESERVATION_CODE_BLOCK_SIZE', 20)))
+        table = CodeSequence.__table__
+        try:
+            start = self._claim(table, block_size)
+        except IntegrityError:
+            # Otro proceso creó la fila de la secuencia al mismo tiempo.
+            start = self._claim(table, block_size)
+        if start >= self.size:
+            raise RuntimeError(f"Se agotó el espacio de códigos '{self.name}' ({self.size} valores)")
+        self._next = start
+        self._end = min(start + block_size, self.size)
+        self._pid = os.getpid()
+
+    def _claim(self, table, block_size) -> int:
+        """
+        Reserva el bloque en una conexión y transacción propias. Quien pide un
+        código no debe haber escrito todavía en su transacción: en SQLite
+        (tests y desarrollo) hay un solo escritor y esta conexión quedaría
+        esperando al lock de la sesión ("database is locked").
+        """
+        with db.engine.begin() as connection:
+            start = connection.execute(
+                select(table.c.next_value).where(table.c.name == self.name).with_for_update()
+            ).scalar()
+            if start is None:
+                start = 0
+                connection.execute(insert(table).values(name=self.name, next_value=block_size))
+            else:
+                connection.execute(
+                    update(table).where(table.c.name == self.name).values(next_value=start + block_size)
+                )
+        return start
+
+    def _round(self, key, index, value) -> int:
+        digest = hmac.new(key, f"{self.name}|{index}|{value}".encode('ascii'), hashlib.sha256).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+    def _permute(self, value) -> int:
+        key = (current_app.config.get('RESERVATION_CODE_KEY') or current_app.config['SECRET_KEY']).encode('utf-8')
+        for index in range(ROUNDS):
+            left, right = divmod(value, self.b)
+            value = self.a * right + (left + self._round(key, index, right)) % self.a
+        return value
+
+
+def _format_pre_reservation(value) -> str:
+    letters_index, numbers = divmod(value, 10 ** 4)
+    letters = ''
+    for _ in range(3):
+        letters_index, letter = divmod(letters_index, 26)
+        letters = string.ascii_uppercase[letter] + letters
+    return f'ARQ-{letters}-{numbers:04d}'
+
+
+# ARQ-XXX-0000: 26^3 combinaciones de letras por 10^4 de números.
+pre_reservation_codes = CodeAllocator('pre_reservation', 26 ** 3, 10 ** 4, _format_pre_reservation)
+# RSV-000000
+reservation_codes = CodeAllocator('reservation', 10 ** 3, 10 ** 3, lambda value: f'RSV-{value:06d}')
+
+
+def add_with_unique_code(instance, allocator: CodeAllocator, attempts: int = 3):
+    """
+    Asigna `instance.code` y lo inserta dentro de un savepoint. Los códigos
+    del allocator no se repiten entre sí, pero los emitidos al azar antes de
+    existir pueden coincidir: en ese caso se reintenta con el siguiente.
+    """
+    for attempt in range(attempts):
+        instance.code = allocator.next_code()
+        try:
+            with db.session.begin_nested():
+                db.session.add(instance)
+            return instance
+        except IntegrityError:
+            if attempt == attempts - 1:
+                raise
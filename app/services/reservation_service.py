@@ -1,40 +1,52 @@
-from datetime import datetime
+from datetime import datetime, date
 from app.extensions import db
 from app.models.camping import PreReservation, CampingService
+from app.services.inventory_service import reserve_stay, release_stay
 
 
-def archive_expired_pre_reservations() -> int:
+def sweep_pre_reservation_lifecycle() -> dict:
+    """
+    Aplica las transiciones automáticas de pre-reservas y devuelve cuántas
+    filas tocó cada una: {'expired': n, 'completed': m}.
+    """
     now = datetime.utcnow()
     # 1. Expire unconfirmed pending reservations after 48h
+    # Un solo UPDATE condicionado al estado: una pre-reserva confirmada
+    # mientras corre el barrido no vuelve a quedar como expirada.
     expired = PreReservation.query.filter(
         PreReservation.status == 'pendiente',
         PreReservation.expires_at <= now,
-    ).all()
-
-    for reservation in expired:
-        reservation.status = 'expirado'
-        reservation.archived_at = now
-        reservation.archive_reason = 'Expiración automática de 48 horas sin confirmación'
+    ).update(
+        {
+            'status': 'expirado',
+            'archived_at': now,
+            'archive_reason': 'Expiración automática de 48 horas sin confirmación',
+        },
+        synchronize_session=False,
+    )
 
     # 2. Auto-complete finished stays (active -> completed)
     # Check if check_out date has passed (at end of day usually, but let's use current date)
-    from datetime import date
     today = date.today()
     finished = PreReservation.query.filter(
         PreReservation.status == 'activo',
         PreReservation.check_out < today
     ).all()
 
+    # The nights of a finished stay are already in the past, so there is
+    # nothing to hand back to the inventory ledger.
     for res in finished:
         res.status = 'completado'
         res.completed_at = now
-        # When completed, units are returned to available
-        service = CampingService.query.get(res.service_id)
-        if service:
-            service.available_units = min(service.total_units, service.available_units + 1)
 
-    db.session.commit()
-    return len(expired) + len(finished)
+    if expired or finished:
+        db.session.commit()
+    return {'expired': expired, 'completed': len(finished)}
+
+
+def archive_expired_pre_reservations() -> int:
+    touched = sweep_pre_reservation_lifecycle()
+    return touched['expired'] + touched['completed']
 
 
 def confirm_pre_reservation(pre_reservation: PreReservation) -> tuple[bool, str]:
@@ -47,15 +59,38 @@ def confirm_pre_reservation(pre_reservation: PreReservation) -> tuple[bool, str]
         db.session.commit()
         return False, 'La pre-reserva expiró y fue movida a Expiradas automáticamente'
 
-    service = CampingService.query.filter_by(id=pre_reservation.service_id).with_for_update().first()
+    service = CampingService.query.get(pre_reservation.service_id)
     if not service:
         return False, 'Servicio no encontrado'
 
-    if service.available_units <= 0:
+    # Transición condicionada: dos confirmaciones simultáneas no pueden
+    # descontar inventario dos veces.
+    now = datetime.utcnow()
+    claimed = PreReservation.query.filter_by(id=pre_reservation.id, status='pendiente').update(
+        {'status': 'confirmado', 'confirmed_at': now},
+        synchronize_session=False,
+    )
+    if not claimed:
+        db.session.rollback()
+        return False, 'La pre-reserva ya fue procesada'
+
+    if not reserve_stay(service, pre_reservation.check_in, pre_reservation.check_out):
+        db.session.rollback()
         return False, 'No hay disponibilidad para confirmar esta pre-reserva'
 
-    service.available_units = max(0, service.available_units - 1)
     pre_reservation.status = 'confirmado'
-    pre_reservation.confirmed_at = datetime.utcnow()
+    pre_reservation.confirmed_at = now
     db.session.commit()
     return True, 'Pre-reserva confirmada'
+
+
+def release_pre_reservation_inventory(pre_reservation: PreReservation) -> int:
+    """Libera las noches aún no transcurridas de una reserva confirmada/activa. No hace commit."""
+    if pre_reservation.status not in ('confirmado', 'activo'):
+        return 0
+    return release_stay(
+        pre_reservation.service_id,
+        pre_reservation.check_in,
+        pre_reservation.check_out,
+        from_night=date.today(),
+    )
@@ -0,0 +1,119 @@
+import re
+import unicodedata
+from sqlalchemy import case, func, insert, or_
+from app.extensions import db
+from app.models.camping import CampingService, ServiceSearchTerm
+
+SEARCH_LANGS = ('es', 'en', 'pt')
+
+# Peso de cada campo en el ranking: un match en el nombre pesa más que en la descripción.
+FIELD_WEIGHTS = {
+    'name': 10,
+    'type': 5,
+    'description': 1,
+}
+
+MIN_TOKEN_LENGTH = 2
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TOKENS = 6
+
+_TOKEN_SPLIT = re.compile(r'[^a-z0-9]+')
+
+
+def fold_text(text: str | None) -> str:
+    """Minúsculas y sin acentos: 'Cabaña' -> 'cabana'."""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str | None) -> list[str]:
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in _TOKEN_SPLIT.split(fold_text(text))
+        if len(token) >= MIN_TOKEN_LENGTH
+    ]
+
+
+def normalize_query(query: str | None) -> str:
+    """Forma canónica de una búsqueda (también usada como parte de la llave de caché)."""
+    tokens = []
+    for token in tokenize(query):
+        if token not in tokens:
+            tokens.append(token)
+    return ' '.join(tokens[:MAX_QUERY_TOKENS])
+
+
+def build_terms(service_id, service_type, names: dict, descriptions: dict) -> list[dict]:
+    """Filas del índice para un servicio: un término por idioma con el peso de su mejor campo."""
+    rows = []
+    for lang in SEARCH_LANGS:
+        weights = {}
+        fields = (
+            ('name', names.get(lang)),
+            ('type', service_type),
+            ('description', descriptions.get(lang)),
+        )
+        for field, text in fields:
+            for term in tokenize(text):
+                weights[term] = max(weights.get(term, 0), FIELD_WEIGHTS[field])
+        rows.extend(
+            {'service_id': service_id, 'lang': lang, 'term': term, 'weight': weight}
+            for term, weight in weights.items()
+        )
+    return rows
+
+
+def _service_terms(service: CampingService) -> list[dict]:
+    return build_terms(
+        service.id,
+        service.service_type,
+        {'es': service.name_es, 'en': service.name_en, 'pt': service.name_pt},
+        {'es': service.description_es, 'en': service.description_en, 'pt': service.description_pt},
+    )
+
+
+def reindex_service(service: CampingService) -> None:
+    """Reemplaza los términos de un servicio. No hace commit: va en la misma transacción de la edición."""
+    ServiceSearchTerm.query.filter_by(service_id=service.id).delete(synchronize_session=False)
+    rows = _service_terms(service)
+    if rows:
+        db.session.execute(insert(ServiceSearchTerm), rows)
+
+
+def rebuild_search_index() -> int:
+    """Reconstruye el índice completo. Devuelve la cantidad de términos generados."""
+    ServiceSearchTerm.query.delete(synchronize_session=False)
+    total = 0
+    for service in CampingService.query.all():
+        rows = _service_terms(service)
+        if rows:
+            db.session.execute(insert(ServiceSearchTerm), rows)
+        total += len(rows)
+    db.session.commit()
+    return total
+
+
+def search_service_scores(query: str, lang: str = 'es') -> dict[int, int]:
+    """
+    Servicios que contienen todos los tokens de la búsqueda (por prefijo)
+    con su puntaje. Cada token se resuelve contra el índice (lang, term),
+    así que el costo no depende del tamaño del catálogo.
+    """
+    tokens = normalize_query(query).split()
+    if not tokens:
+        return {}
+
+    per_token = [
+        func.max(case((ServiceSearchTerm.term.like(f'{token}%'), ServiceSearchTerm.weight), else_=0))
+        for token in tokens
+    ]
+    rows = db.session.query(ServiceSearchTerm.service_id, *per_token).filter(
+        ServiceSearchTerm.lang == lang,
+        or_(*[ServiceSearchTerm.term.like(f'{token}%') for token in tokens]),
+    ).group_by(ServiceSearchTerm.service_id).all()
+
+    return {
+        row[0]: sum(row[1:])
+        for row in rows
+        if all(score > 0 for score in row[1:])
+    }
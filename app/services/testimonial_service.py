@@ -0,0 +1,277 @@
+import base64
+import binascii
+import math
+from collections import Counter, defaultdict
+from datetime import datetime
+from sqlalchemy import and_, case, event, func, inspect, or_, update
+from sqlalchemy.orm import Session, object_session
+from app.extensions import db
+from app.models.camping import CampingService, ServiceTestimonial
+from app.services.cache_service import cache_service
+
+# Los totales aproximados se recuentan (COUNT) como máximo una vez por día.
+TESTIMONIALS_TOTAL_TTL = 86400
+
+MAX_CURSOR_PAGE_SIZE = 50
+
+# Calificaciones válidas: 1..MAX_RATING; 0 es "sin calificar" y no promedia.
+MAX_RATING = 5
+
+
+def encode_cursor(testimonial) -> str:
+    """Cursor opaco con la posición (created_at, id) del último testimonio entregado."""
+    raw = f"{testimonial.created_at.isoformat()}|{testimonial.id}".encode('ascii')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inversa de encode_cursor; ValueError si el cursor no es válido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('ascii')
+        created_at, testimonial_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(testimonial_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError('Cursor inválido') from exc
+
+
+def public_testimonials_query(lang: str, service_id: int | None = None):
+    """
+    Testimonios publicados con solo las columnas del payload público y el
+    nombre del servicio ya resuelto por JOIN (sin cargar modelos).
+    """
+    query = db.session.query(
+        ServiceTestimonial.id,
+        ServiceTestimonial.author_name,
+        ServiceTestimonial.localized_comment_column(lang).label('message'),
+        ServiceTestimonial.created_at,
+        ServiceTestimonial.is_published,
+        ServiceTestimonial.image_url,
+        CampingService.localized_name_column(lang).label('service_name'),
+    ).outerjoin(
+        CampingService, CampingService.id == ServiceTestimonial.service_id
+    ).filter(ServiceTestimonial.is_published.is_(True))
+    if service_id:
+        query = query.filter(ServiceTestimonial.service_id == service_id)
+    return query
+
+
+def public_testimonial_dict(row) -> dict:
+    """Mismo formato que ServiceTestimonial.to_public_dict, a partir de una fila de public_testimonials_query."""
+    return {
+        'id': row.id,
+        'author_name': row.author_name,
+        'message': row.message,
+        'created_at': row.created_at.date().isoformat() if row.created_at else None,
+        'is_approved': row.is_published,
+        'image_url': row.image_url,
+        'service_name': row.service_name or '',
+    }
+
+
+def published_testimonials_page(lang: str, service_id: int | None = None, page: int = 1, per_page: int = 8) -> dict:
+    """
+    Página por número (compatibilidad con el listado paginado original):
+    dos consultas, la de filas con JOIN y el COUNT, como hacía paginate().
+    """
+    page = max(page, 1)
+    per_page = per_page if per_page >= 1 else 20
+
+    rows = public_testimonials_query(lang, service_id).order_by(
+        ServiceTestimonial.created_at.desc()
+    ).limit(per_page).offset((page - 1) * per_page).all()
+
+    total_query = db.session.query(func.count(ServiceTestimonial.id)).filter(ServiceTestimonial.is_published.is_(True))
+    if service_id:
+        total_query = total_query.filter(ServiceTestimonial.service_id == service_id)
+    total = total_query.scalar() or 0
+
+    return {
+        'items': [public_testimonial_dict(row) for row in rows],
+        'total': total,
+        'pages': math.ceil(total / per_page) if total else 0,
+        'page': page,
+    }
+
+
+def published_testimonials_after(lang: str, service_id: int | None = None, cursor: str | None = None, limit: int = 8):
+    """
+    Página de testimonios publicados, del más nuevo al más viejo, a partir de
+    `cursor` (keyset sobre el índice (created_at, id): sin OFFSET ni COUNT).
+    Devuelve (testimonios serializados, next_cursor); next_cursor es None en
+    la última página.
+    """
+    query = public_testimonials_query(lang, service_id)
+    if cursor:
+        created_at, testimonial_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            ServiceTestimonial.created_at < created_at,
+            and_(ServiceTestimonial.created_at == created_at, ServiceTestimonial.id < testimonial_id),
+        ))
+
+    rows = query.order_by(ServiceTestimonial.created_at.desc(), ServiceTestimonial.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_cursor(rows[-1]) if has_more and rows else None
+    return [public_testimonial_dict(row) for row in rows], next_cursor
+
+
+def admin_testimonial_rows():
+    """Listado del panel: columnas de la tabla y nombre del servicio en una sola consulta."""
+    return db.session.query(
+        ServiceTestimonial.id,
+        ServiceTestimonial.author_name,
+        ServiceTestimonial.image_url,
+        ServiceTestimonial.is_published,
+        CampingService.name_es.label('service_name'),
+    ).outerjoin(
+        CampingService, CampingService.id == ServiceTestimonial.service_id
+    ).order_by(ServiceTestimonial.created_at.desc()).all()
+
+
+def recompute_service_ratings() -> int:
+    """
+    Reparación: recalcula rating_avg/rating_count de todos los servicios con
+    una sola consulta agrupada sobre service_reviews. Devuelve cuántos
+    servicios cambiaron.
+    """
+    rows = db.session.query(
+        ServiceTestimonial.service_id,
+        func.count(ServiceTestimonial.id),
+        func.avg(ServiceTestimonial.rating),
+    ).filter(
+        ServiceTestimonial.service_id.isnot(None),
+        ServiceTestimonial.is_published.is_(True),
+        ServiceTestimonial.rating.between(1, MAX_RATING),
+    ).group_by(ServiceTestimonial.service_id).all()
+    stats = {service_id: (count, float(avg)) for service_id, count, avg in rows}
+
+    changes = []
+    for service_id, rating_avg, rating_count in db.session.query(
+        CampingService.id, CampingService.rating_avg, CampingService.rating_count
+    ).all():
+        count, avg = stats.get(service_id, (0, 0.0))
+        if rating_count != count or abs((rating_avg or 0) - avg) > 1e-9:
+            changes.append({'id': service_id, 'rating_avg': avg, 'rating_count': count})
+
+    if changes:
+        db.session.execute(update(CampingService), changes)
+    db.session.commit()
+    return len(changes)
+
+
+def testimonials_total_key(service_id: int | None) -> str:
+    return f"public_testimonials_total_{service_id or 'all'}"
+
+
+def approximate_testimonials_total(service_id: int | None = None) -> int:
+    """
+    Total de testimonios publicados (general o de un servicio). Se cuenta una
+    vez y luego se ajusta con cada alta/edición/baja (ver _track_changes).
+    """
+    def count():
+        query = db.session.query(func.count(ServiceTestimonial.id)).filter(ServiceTestimonial.is_published.is_(True))
+        if service_id:
+            query = query.filter(ServiceTestimonial.service_id == service_id)
+        return query.scalar() or 0
+
+    return cache_service.counter(testimonials_total_key(service_id), count, timeout=TESTIMONIALS_TOTAL_TTL)
+
+
+def _previous(state, attr):
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.object, attr)
+
+
+def _record_delta(target, before, after):
+    """Acumula en la sesión los ajustes de totales; se aplican tras el commit."""
+    session = object_session(target)
+    if session is None:
+        return
+    deltas = session.info.setdefault('testimonial_total_deltas', Counter())
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot is None:
+            continue
+        service_id, is_published = snapshot
+        if not is_published:
+            continue
+        deltas[None] += sign
+        if service_id:
+            deltas[service_id] += sign
+
+
+def _rated(service_id, is_published, rating):
+    """(servicio, calificación) si el testimonio cuenta en el promedio del servicio."""
+    if service_id and is_published and rating and 1 <= rating <= MAX_RATING:
+        return service_id, rating
+    return None
+
+
+def _apply_rating_delta(connection, before, after):
+    """
+    Ajusta rating_avg/rating_count de los servicios afectados con un UPDATE
+    relativo en la misma transacción del flush (sin recorrer service_reviews).
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for snapshot, sign in ((before, -1), (after, 1)):
+        if snapshot is None:
+            continue
+        service_id, rating = snapshot
+        deltas[service_id][0] += sign
+        deltas[service_id][1] += sign * rating
+
+    services = CampingService.__table__
+    for service_id, (count_delta, sum_delta) in deltas.items():
+        if not count_delta and not sum_delta:
+            continue
+        new_count = services.c.rating_count + count_delta
+        # MariaDB evalúa el SET en orden y con los valores ya asignados:
+        # el promedio se calcula antes de tocar rating_count.
+        connection.execute(
+            update(services).where(services.c.id == service_id).ordered_values(
+                (services.c.rating_avg, case(
+                    (new_count > 0, (services.c.rating_avg * services.c.rating_count + sum_delta) / new_count),
+                    else_=0,
+                )),
+                (services.c.rating_count, new_count),
+            )
+        )
+
+
+@event.listens_for(ServiceTestimonial, 'after_insert')
+def _track_insert(mapper, connection, target):
+    is_published = target.is_published is not False
+    _record_delta(target, None, (target.service_id, is_published))
+    _apply_rating_delta(connection, None, _rated(target.service_id, is_published, target.rating))
+
+
+@event.listens_for(ServiceTestimonial, 'after_update')
+def _track_update(mapper, connection, target):
+    state = inspect(target)
+    before = (_previous(state, 'service_id'), _previous(state, 'is_published'))
+    _record_delta(target, before, (target.service_id, target.is_published))
+    _apply_rating_delta(
+        connection,
+        _rated(*before, _previous(state, 'rating')),
+        _rated(target.service_id, target.is_published, target.rating),
+    )
+
+
+@event.listens_for(ServiceTestimonial, 'after_delete')
+def _track_delete(mapper, connection, target):
+    _record_delta(target, (target.service_id, target.is_published), None)
+    _apply_rating_delta(connection, _rated(target.service_id, target.is_published, target.rating), None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_total_deltas(session):
+    deltas = session.info.pop('testimonial_total_deltas', None)
+    for service_id, delta in (deltas or {}).items():
+        if delta:
+            cache_service.incr_counter(testimonials_total_key(service_id), delta)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_total_deltas(session):
+    session.info.pop('testimonial_total_deltas', None)
@@ -0,0 +1,17 @@
+# Configuración de Gunicorn (se carga automáticamente desde el directorio de trabajo).
+
+
+def post_worker_init(worker):
+    """
+    Arranca los procesos en segundo plano dentro de cada worker.
+    El lease en Redis evita que más de un worker ejecute el mismo barrido.
+    """
+    from app.services.cache_warmer import start_background_cache_warmer
+    from app.services.email_campaigns import start_background_email_campaigns
+    from app.services.email_sender import start_background_email_sender
+    from app.services.lifecycle_sweeper import start_background_sweeper
+
+    start_background_sweeper(worker.wsgi)
+    start_background_cache_warmer(worker.wsgi)
+    start_background_email_sender(worker.wsgi)
+    start_background_email_campaigns(worker.wsgi)
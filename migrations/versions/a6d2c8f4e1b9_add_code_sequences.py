@@ -0,0 +1,33 @@
+"""add code_sequences for the reservation code allocator
+
+Revision ID: a6d2c8f4e1b9
+Revises: e5c7a9b3d1f4
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2c8f4e1b9'
+down_revision = 'e5c7a9b3d1f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    code_sequences = op.create_table(
+        'code_sequences',
+        sa.Column('name', sa.String(length=40), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(code_sequences, [
+        {'name': 'pre_reservation', 'next_value': 0},
+        {'name': 'reservation', 'next_value': 0},
+    ])
+
+
+def downgrade():
+    op.drop_table('code_sequences')
@@ -0,0 +1,30 @@
+"""add priority lanes to email_outbox
+
+Revision ID: c1f5a9d3e7b2
+Revises: b8e4f1a7c3d5
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c1f5a9d3e7b2'
+down_revision = 'b8e4f1a7c3d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('lane', sa.String(length=20), nullable=False, server_default='normal'))
+        batch_op.drop_index('ix_email_outbox_status_next_attempt')
+        batch_op.create_index('ix_email_outbox_lane_status_next_attempt', ['lane', 'status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_index('ix_email_outbox_lane_status_next_attempt')
+        batch_op.create_index('ix_email_outbox_status_next_attempt', ['status', 'next_attempt_at'], unique=False)
+        batch_op.drop_column('lane')
@@ -0,0 +1,73 @@
+"""add per-night inventory ledger and drop scalar available_units
+
+Revision ID: c3a9e5d1f7b2
+Revises: b7f7d9c2e41a
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from collections import Counter
+from datetime import date, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3a9e5d1f7b2'
+down_revision = 'b7f7d9c2e41a'
+branch_labels = None
+depends_on = None
+
+
+def _get_columns(table_name: str) -> set[str]:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    return {col['name'] for col in inspector.get_columns(table_name)}
+
+
+def upgrade():
+    inventory = op.create_table(
+        'service_night_inventory',
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('night', sa.Date(), nullable=False),
+        sa.Column('booked_units', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['service_id'], ['camping_services.id'], ),
+        sa.PrimaryKeyConstraint('service_id', 'night')
+    )
+
+    # Backfill: cada reserva confirmada/activa ocupa una unidad por noche
+    # (solo se cargan las noches desde hoy en adelante).
+    bind = op.get_bind()
+    today = date.today()
+    rows = bind.execute(
+        sa.text(
+            "SELECT service_id, check_in, check_out FROM pre_reservations "
+            "WHERE status IN ('confirmado', 'activo') AND check_out > :today"
+        ),
+        {'today': today},
+    ).fetchall()
+
+    booked = Counter()
+    for service_id, check_in, check_out in rows:
+        night = max(check_in, today)
+        while night < check_out:
+            booked[(service_id, night)] += 1
+            night += timedelta(days=1)
+
+    if booked:
+        op.bulk_insert(inventory, [
+            {'service_id': service_id, 'night': night, 'booked_units': units}
+            for (service_id, night), units in booked.items()
+        ])
+
+    if 'available_units' in _get_columns('camping_services'):
+        with op.batch_alter_table('camping_services', schema=None) as batch_op:
+            batch_op.drop_column('available_units')
+
+
+def downgrade():
+    if 'available_units' not in _get_columns('camping_services'):
+        op.add_column('camping_services', sa.Column('available_units', sa.Integer(), nullable=False, server_default='0'))
+        op.execute(sa.text("UPDATE camping_services SET available_units = total_units"))
+
+    op.drop_table('service_night_inventory')
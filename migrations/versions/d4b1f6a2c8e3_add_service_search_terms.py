@@ -0,0 +1,96 @@
+"""add accent-folded search index for camping services
+
+Revision ID: d4b1f6a2c8e3
+Revises: c3a9e5d1f7b2
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b1f6a2c8e3'
+down_revision = 'c3a9e5d1f7b2'
+branch_labels = None
+depends_on = None
+
+
+# Copia congelada del tokenizador de app.services.search_index al momento de
+# esta revisión: la migración no debe cambiar si la app cambia después.
+SEARCH_LANGS = ('es', 'en', 'pt')
+FIELD_WEIGHTS = {'name': 10, 'type': 5, 'description': 1}
+MIN_TOKEN_LENGTH = 2
+MAX_TERM_LENGTH = 64
+_TOKEN_SPLIT = re.compile(r'[^a-z0-9]+')
+
+
+def _tokenize(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    folded = ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in _TOKEN_SPLIT.split(folded)
+        if len(token) >= MIN_TOKEN_LENGTH
+    ]
+
+
+def _build_terms(service_id, service_type, names, descriptions):
+    rows = []
+    for lang in SEARCH_LANGS:
+        weights = {}
+        fields = (
+            ('name', names.get(lang)),
+            ('type', service_type),
+            ('description', descriptions.get(lang)),
+        )
+        for field, text in fields:
+            for term in _tokenize(text):
+                weights[term] = max(weights.get(term, 0), FIELD_WEIGHTS[field])
+        rows.extend(
+            {'service_id': service_id, 'lang': lang, 'term': term, 'weight': weight}
+            for term, weight in weights.items()
+        )
+    return rows
+
+
+def upgrade():
+    terms = op.create_table(
+        'service_search_terms',
+        sa.Column('service_id', sa.Integer(), nullable=False),
+        sa.Column('lang', sa.String(length=5), nullable=False),
+        sa.Column('term', sa.String(length=64), nullable=False),
+        sa.Column('weight', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['service_id'], ['camping_services.id'], ),
+        sa.PrimaryKeyConstraint('service_id', 'lang', 'term')
+    )
+    with op.batch_alter_table('service_search_terms', schema=None) as batch_op:
+        batch_op.create_index('ix_service_search_terms_lang_term', ['lang', 'term'], unique=False)
+
+    # Indexar el catálogo existente.
+    bind = op.get_bind()
+    services = bind.execute(sa.text(
+        "SELECT id, service_type, name_es, name_en, name_pt, "
+        "description_es, description_en, description_pt FROM camping_services"
+    )).fetchall()
+
+    rows = []
+    for service in services:
+        rows.extend(_build_terms(
+            service.id,
+            service.service_type,
+            {'es': service.name_es, 'en': service.name_en, 'pt': service.name_pt},
+            {'es': service.description_es, 'en': service.description_en, 'pt': service.description_pt},
+        ))
+    if rows:
+        op.bulk_insert(terms, rows)
+
+
+def downgrade():
+    with op.batch_alter_table('service_search_terms', schema=None) as batch_op:
+        batch_op.drop_index('ix_service_search_terms_lang_term')
+
+    op.drop_table('service_search_terms')
@@ -0,0 +1,30 @@
+"""add template/context/lang to email_outbox for worker-side rendering
+
+Revision ID: d7a3e9c5b1f8
+Revises: c1f5a9d3e7b2
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3e9c5b1f8'
+down_revision = 'c1f5a9d3e7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('template', sa.String(length=120), nullable=True))
+        batch_op.add_column(sa.Column('context', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('lang', sa.String(length=5), nullable=False, server_default='es'))
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_column('lang')
+        batch_op.drop_column('context')
+        batch_op.drop_column('template')
@@ -0,0 +1,28 @@
+"""add composite indexes for keyset pagination of service reviews
+
+Revision ID: e5c7a9b3d1f4
+Revises: d4b1f6a2c8e3
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5c7a9b3d1f4'
+down_revision = 'd4b1f6a2c8e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('service_reviews', schema=None) as batch_op:
+        batch_op.create_index('ix_service_reviews_published_created', ['is_published', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_service_reviews_service_published_created', ['service_id', 'is_published', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('service_reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_service_reviews_service_published_created')
+        batch_op.drop_index('ix_service_reviews_published_created')
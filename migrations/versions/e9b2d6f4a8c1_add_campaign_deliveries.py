@@ -0,0 +1,40 @@
+"""add campaign_deliveries and pre_reservation indexes for email campaigns
+
+Revision ID: e9b2d6f4a8c1
+Revises: d7a3e9c5b1f8
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b2d6f4a8c1'
+down_revision = 'd7a3e9c5b1f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'campaign_deliveries',
+        sa.Column('campaign', sa.String(length=40), nullable=False),
+        sa.Column('pre_reservation_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['pre_reservation_id'], ['pre_reservations.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('campaign', 'pre_reservation_id')
+    )
+    with op.batch_alter_table('pre_reservations', schema=None) as batch_op:
+        batch_op.create_index('ix_pre_reservations_status_check_in', ['status', 'check_in'], unique=False)
+        batch_op.create_index('ix_pre_reservations_status_check_out', ['status', 'check_out'], unique=False)
+        batch_op.create_index('ix_pre_reservations_status_expires_at', ['status', 'expires_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('pre_reservations', schema=None) as batch_op:
+        batch_op.drop_index('ix_pre_reservations_status_expires_at')
+        batch_op.drop_index('ix_pre_reservations_status_check_out')
+        batch_op.drop_index('ix_pre_reservations_status_check_in')
+
+    op.drop_table('campaign_deliveries')
@@ -0,0 +1,203 @@
+import os
+from contextlib import contextmanager
+
+# Redis apunta a un puerto sin servicio: la app arranca con los fallbacks en
+# memoria y los tests no dependen de infraestructura externa.
+os.environ.setdefault('REDIS_URL', 'redis://127.0.0.1:1/0')
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.config import Config
+from app.extensions import db as _db
+from app.services import cache_service as cache_module
+from app.models.camping import Amenity, CampingService, ServiceImage
+
+
+@pytest.fixture
+def app(tmp_path):
+    # SQLite en archivo: el asignador de códigos abre su propia conexión.
+    class TestConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'tests.db'}"
+        WTF_CSRF_ENABLED = False
+        RATELIMIT_ENABLED = False
+        # Argon2 barato: los tests no miden el costo del hash.
+        ARGON2_TIME_COST = 1
+        ARGON2_MEMORY_COST = 8
+        ARGON2_PARALLELISM = 1
+        MAIL_DEFAULT_SENDER = 'reservas@example.com'
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+        _db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_service(app):
+    """Crea servicios activos con los campos obligatorios completos."""
+
+    def factory(index, **overrides):
+        values = dict(
+            slug=f'servicio-{index}',
+            service_type='cabana',
+            name_es=f'Cabaña {index}',
+            name_en=f'Cabin {index}',
+            name_pt=f'Cabana {index}',
+            description_es='Cabaña junto al arroyo',
+            description_en='Cabin by the stream',
+            description_pt='Cabana junto ao riacho',
+            price=1000,
+            capacity=4,
+            total_units=2,
+            is_active=True,
+        )
+        values.update(overrides)
+        service = CampingService(**values)
+        _db.session.add(service)
+        return service
+
+    return factory
+
+
+@pytest.fixture
+def count_queries(app):
+    """Cuenta las sentencias SQL ejecutadas dentro del bloque."""
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(_db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(_db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
+
+
+@pytest.fixture
+def seed_catalog(make_service):
+    """
+    Crea `count` servicios con dos imágenes (cargadas en orden inverso) y una
+    comodidad compartida, y vacía la sesión. Devuelve los ids creados.
+    """
+
+    def seed(count):
+        amenity = Amenity(name_es='Parrillero', name_en='Grill', name_pt='Churrasqueira', icon='🔥')
+        services = []
+        for index in range(count):
+            service = make_service(index)
+            service.amenities.append(amenity)
+            for order in (1, 0):
+                service.images.append(ServiceImage(url=f'https://cdn/{index}-{order}.jpg', sort_order=order))
+            services.append(service)
+        _db.session.commit()
+        ids = [service.id for service in services]
+        _db.session.expunge_all()
+        return ids
+
+    return seed
+
+
+class FakeRedis:
+    """
+    Subconjunto en memoria de redis-py con lo que usa CacheService
+    (strings, sets, locks y los scripts del módulo). Los TTL se ignoran.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    @staticmethod
+    def _key(key):
+        return key.decode() if isinstance(key, bytes) else key
+
+    @staticmethod
+    def _value(value):
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def get(self, key):
+        return self.data.get(self._key(key))
+
+    def mget(self, keys):
+        return [self.data.get(self._key(key)) for key in keys]
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and self._key(key) in self.data:
+            return None
+        self.data[self._key(key)] = self._value(value)
+        return True
+
+    def setex(self, key, ttl, value):
+        return self.set(key, value)
+
+    def delete(self, *keys):
+        return sum(self.data.pop(self._key(key), None) is not None for key in keys)
+
+    def incr(self, key, amount=1):
+        value = int(self.data.get(self._key(key), 0)) + amount
+        self.data[self._key(key)] = self._value(value)
+        return value
+
+    def sadd(self, key, *members):
+        self.data.setdefault(self._key(key), set()).update(self._value(m) for m in members)
+
+    def srem(self, key, *members):
+        self.data.get(self._key(key), set()).difference_update(self._value(m) for m in members)
+
+    def smembers(self, key):
+        return set(self.data.get(self._key(key), set()))
+
+    def expire(self, key, ttl):
+        return self._key(key) in self.data
+
+    def publish(self, channel, message):
+        return 0
+
+    def eval(self, script, numkeys, key, arg):
+        if script == cache_module._RELEASE_LOCK_SCRIPT:
+            return self.delete(key) if self.get(key) == self._value(arg) else 0
+        if script == cache_module._INCR_IF_EXISTS_SCRIPT:
+            return self.incr(key, int(arg)) if self.get(key) is not None else None
+        raise NotImplementedError(script)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+        return lambda *args, **kwargs: self._calls.append((method, args, kwargs))
+
+    def execute(self):
+        calls, self._calls = self._calls, []
+        return [method(*args, **kwargs) for method, args, kwargs in calls]
+
+
+@pytest.fixture
+def fake_redis(app, monkeypatch):
+    """Conecta el cache_service a un FakeRedis (tier local incluido, vacío)."""
+    fake = FakeRedis()
+    monkeypatch.setattr(cache_module.CacheService, 'client', property(lambda self: fake))
+    cache_module.cache_service.local.clear()
+    return fake
@@ -0,0 +1,40 @@
+from datetime import date, timedelta
+
+from app.extensions import db
+from app.models.camping import PreReservation
+from app.models.user import AdminUser
+from app.services.inventory_service import remaining_units
+
+
+def _login(client):
+    admin = AdminUser(username='admin', email='admin@example.com', is_superuser=True)
+    db.session.add(admin)
+    db.session.commit()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(admin.id)
+        session['_fresh'] = True
+
+
+def test_admin_confirmed_pre_reservation_books_nights_and_gets_code(client, make_service):
+    service = make_service(1, total_units=1)
+    db.session.commit()
+    _login(client)
+
+    check_in = date.today() + timedelta(days=3)
+    check_out = check_in + timedelta(days=2)
+    response = client.post('/admin/camping/pre-reservations', data={
+        'service_id': service.id,
+        'full_name': 'Ana Pérez',
+        'email': 'ana@example.com',
+        'phone': '099123456',
+        'guests': 2,
+        'check_in': check_in.isoformat(),
+        'check_out': check_out.isoformat(),
+        'status': 'confirmado',
+    })
+
+    assert response.status_code == 302
+    reservation = PreReservation.query.one()
+    assert reservation.status == 'confirmado'
+    assert reservation.code.startswith('ARQ-')
+    assert remaining_units(service, check_in, check_out) == 0
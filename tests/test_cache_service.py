@@ -0,0 +1,59 @@
+import threading
+
+from app.services import cache_service as cache_module
+from app.services.cache_service import cache_service
+
+
+def test_concurrent_miss_waits_for_the_lock_holder_instead_of_loading(fake_redis):
+    loading = threading.Event()
+    finish = threading.Event()
+    calls = []
+    results = {}
+
+    def slow_loader():
+        calls.append('primero')
+        loading.set()
+        finish.wait(5)
+        return {'valor': 1}
+
+    def second_loader():
+        calls.append('segundo')
+        return {'valor': 2}
+
+    first = threading.Thread(target=lambda: results.setdefault('first', cache_service.get_or_compute('k', slow_loader)))
+    first.start()
+    assert loading.wait(5)
+    assert fake_redis.get('lock:k') is not None
+
+    second = threading.Thread(target=lambda: results.setdefault('second', cache_service.get_or_compute('k', second_loader)))
+    second.start()
+    # El segundo encuentra el lock tomado y espera la escritura del primero.
+    second.join(cache_module.LOCK_POLL_SECONDS * 4)
+    assert second.is_alive()
+    finish.set()
+    first.join(5)
+    second.join(5)
+
+    assert calls == ['primero']
+    assert results == {'first': {'valor': 1}, 'second': {'valor': 1}}
+    assert fake_redis.get('lock:k') is None
+
+
+def test_expired_entry_is_served_stale_while_another_worker_recomputes(fake_redis):
+    cache_service.get_or_compute('k', lambda: 'viejo', timeout=0)
+    fake_redis.set('lock:k', 'otro-worker')
+    cache_service.local.clear()
+
+    value = cache_service.get_or_compute('k', lambda: 'nuevo', timeout=0)
+
+    assert value == 'viejo'
+
+
+def test_early_refresh_depends_on_compute_cost(monkeypatch):
+    monkeypatch.setattr(cache_module.random, 'random', lambda: 0.99)
+    now = cache_module.time.time()
+
+    # Vence en 10s: un cálculo de 5s se adelanta, uno de 1ms no.
+    assert cache_service._should_refresh(('etag', now + 10, 5.0, b'j', b''))
+    assert not cache_service._should_refresh(('etag', now + 10, 0.001, b'j', b''))
+    assert cache_service._should_refresh(('etag', now - 1, 0.0, b'j', b''))
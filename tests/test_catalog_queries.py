@@ -0,0 +1,48 @@
+import pytest
+
+from app.models.camping import Amenity, CampingService
+from app.services.catalog_service import build_public_catalog
+
+# Imágenes, comodidades y disponibilidad: una consulta cada una.
+CATALOG_QUERIES = 3
+
+
+def _services():
+    return CampingService.query.order_by(CampingService.id).all()
+
+
+@pytest.mark.parametrize('count', [1, 20])
+def test_catalog_uses_a_fixed_number_of_queries(seed_catalog, count_queries, count):
+    seed_catalog(count)
+    services = _services()
+
+    with count_queries() as statements:
+        catalog = build_public_catalog(services, lang='es')
+
+    assert len(catalog) == count
+    assert len(statements) == CATALOG_QUERIES
+
+
+def test_catalog_payload_is_localized_with_ordered_images(seed_catalog):
+    seed_catalog(2)
+    amenity = Amenity.query.one()
+
+    first, second = build_public_catalog(_services(), lang='en')
+
+    assert first['name'] == 'Cabin 0'
+    assert first['description'] == 'Cabin by the stream'
+    assert first['images'] == ['https://cdn/0-0.jpg', 'https://cdn/0-1.jpg']
+    assert first['amenities'] == [{'id': amenity.id, 'name': 'Grill', 'icon': '🔥'}]
+    assert first['available'] == first['total'] == 2
+    assert second['images'] == ['https://cdn/1-0.jpg', 'https://cdn/1-1.jpg']
+
+
+def test_catalog_uses_precomputed_availability(seed_catalog, count_queries):
+    first_id, second_id = seed_catalog(2)
+    services = _services()
+
+    with count_queries() as statements:
+        catalog = build_public_catalog(services, availability={first_id: 1})
+
+    assert [item['available'] for item in catalog] == [1, 0]
+    assert len(statements) == CATALOG_QUERIES - 1
@@ -0,0 +1,132 @@
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, update
+
+from app.extensions import db, mail
+from app.models.email import EmailOutbox
+from app.services import email_sender
+from app.services.email_sender import _claim_batch, drain_email_outbox
+from app.services.email_service import LANE_NORMAL, LANE_URGENT, send_email
+
+
+def _enqueue(index=0, **kwargs):
+    return send_email(f'Asunto {index}', [f'huesped{index}@example.com'], 'Cuerpo', **kwargs)
+
+
+def test_send_email_only_enqueues_and_wakes_sender_after_commit(app, monkeypatch):
+    woken = []
+    monkeypatch.setattr(email_sender, 'wake_email_sender', lambda *lanes: woken.append(lanes))
+
+    with mail.record_messages() as outbox:
+        _enqueue()
+        assert woken == []
+        db.session.commit()
+
+        email = EmailOutbox.query.one()
+        assert (email.status, email.lane, email.attempts) == ('pendiente', LANE_NORMAL, 0)
+        assert woken == [(LANE_NORMAL,)]
+        assert outbox == []
+
+
+def test_rollback_discards_the_email_and_the_wakeup(app, monkeypatch):
+    woken = []
+    monkeypatch.setattr(email_sender, 'wake_email_sender', lambda *lanes: woken.append(lanes))
+
+    _enqueue()
+    db.session.rollback()
+    db.session.commit()
+
+    assert EmailOutbox.query.count() == 0
+    assert woken == []
+
+
+def test_claim_does_not_take_rows_claimed_by_another_process(app):
+    for index in range(3):
+        _enqueue(index)
+    db.session.commit()
+    ids = [email.id for email in EmailOutbox.query.order_by(EmailOutbox.id)]
+    stolen = {}
+
+    # Otro proceso reclama el primer correo entre el SELECT y el UPDATE de este.
+    def claim_first_elsewhere(conn, cursor, statement, parameters, context, executemany):
+        if stolen or not statement.startswith('UPDATE email_outbox'):
+            return
+        stolen['id'] = ids[0]
+        with db.engine.begin() as other:
+            other.execute(
+                update(EmailOutbox.__table__)
+                .where(EmailOutbox.__table__.c.id == ids[0])
+                .values(claimed_by='otro', claimed_until=datetime.utcnow() + timedelta(minutes=5))
+            )
+
+    event.listen(db.engine, 'before_cursor_execute', claim_first_elsewhere)
+    try:
+        batch = _claim_batch(LANE_NORMAL, 10)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', claim_first_elsewhere)
+
+    assert [email.id for email in batch] == ids[1:]
+    assert db.session.get(EmailOutbox, ids[0]).claimed_by == 'otro'
+    assert _claim_batch(LANE_NORMAL, 10) == []
+
+
+def test_failed_send_is_retried_with_backoff_then_discarded(app, monkeypatch):
+    app.config.update(EMAIL_MAX_ATTEMPTS=2, EMAIL_RETRY_BASE_SECONDS=60)
+    monkeypatch.setattr(email_sender, '_send_batch', lambda lane, batch: {email.id: 'SMTP caído' for email in batch})
+    _enqueue()
+    db.session.commit()
+
+    before = datetime.utcnow()
+    assert drain_email_outbox(LANE_NORMAL) == {'retry': 1}
+    email = EmailOutbox.query.one()
+    assert (email.status, email.attempts, email.last_error, email.claimed_by) == ('pendiente', 1, 'SMTP caído', None)
+    # Backoff de 60s con jitter ±20%; mientras tanto no se vuelve a reclamar.
+    assert before + timedelta(seconds=47) <= email.next_attempt_at <= datetime.utcnow() + timedelta(seconds=73)
+    assert drain_email_outbox(LANE_NORMAL) == {}
+
+    email.next_attempt_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    assert drain_email_outbox(LANE_NORMAL) == {'failed': 1}
+    email = EmailOutbox.query.one()
+    assert (email.status, email.attempts) == ('fallido', 2)
+
+
+def test_urgent_lane_drains_while_the_normal_backlog_is_stuck(app, monkeypatch):
+    app.config.update(EMAIL_OUTBOX_BATCH_SIZE=5)
+    normal_sending = threading.Event()
+    release_normal = threading.Event()
+    sent = []
+
+    def send_batch(lane, batch):
+        if lane == LANE_NORMAL:
+            normal_sending.set()
+            release_normal.wait(5)
+        sent.append((lane, len(batch)))
+        return {email.id: None for email in batch}
+
+    monkeypatch.setattr(email_sender, '_send_batch', send_batch)
+    for index in range(20):
+        _enqueue(index)
+    send_email('Código 2FA', ['admin@example.com'], '123456', lane=LANE_URGENT)
+    db.session.commit()
+
+    def drain_normal():
+        with app.app_context():
+            drain_email_outbox(LANE_NORMAL)
+
+    # El carril normal queda trabado en su primer lote (SMTP lento)...
+    worker = threading.Thread(target=drain_normal)
+    worker.start()
+    try:
+        assert normal_sending.wait(5)
+        # ...y el urgente igual sale enseguida, aunque se encoló último.
+        assert drain_email_outbox(LANE_URGENT) == {'sent': 1}
+        assert sent == [(LANE_URGENT, 1)]
+    finally:
+        release_normal.set()
+        worker.join(5)
+
+    assert sent[1:] == [(LANE_NORMAL, 5)] * 4
+    db.session.expire_all()
+    assert EmailOutbox.query.filter_by(status='enviado').count() == 21
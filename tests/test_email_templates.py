@@ -0,0 +1,18 @@
+import pytest
+
+from app.services.email_sender import _email_template
+
+
+@pytest.mark.parametrize('lang, expected', [
+    ('es', 'emails/arrival_reminder.html'),
+    ('en', 'emails/arrival_reminder.en.html'),
+    ('pt', 'emails/arrival_reminder.pt.html'),
+    ('fr', 'emails/arrival_reminder.html'),
+    (None, 'emails/arrival_reminder.html'),
+])
+def test_email_template_is_picked_per_language(app, lang, expected):
+    assert _email_template('arrival_reminder', lang).name == expected
+
+
+def test_email_template_falls_back_to_base_without_translation(app):
+    assert _email_template('2fa_code', 'en').name == 'emails/2fa_code.html'
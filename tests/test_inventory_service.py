@@ -0,0 +1,110 @@
+from datetime import date, datetime, timedelta
+
+from app.extensions import db
+from app.models.camping import CampingService, PreReservation, ServiceNightInventory
+from app.services.inventory_service import (
+    release_stay,
+    remaining_units,
+    remaining_units_for_night,
+    reserve_stay,
+)
+from app.services.reservation_service import release_pre_reservation_inventory
+
+TODAY = date.today()
+
+
+def _day(offset):
+    return TODAY + timedelta(days=offset)
+
+
+def _booked(service_id):
+    return dict(
+        db.session.query(ServiceNightInventory.night, ServiceNightInventory.booked_units)
+        .filter_by(service_id=service_id)
+        .all()
+    )
+
+
+def test_reserve_rejects_a_stay_when_any_single_night_is_full(make_service):
+    service = make_service(1, total_units=1)
+    db.session.flush()
+    assert reserve_stay(service, _day(10), _day(13))
+
+    # Solo la noche 12 se superpone, y basta para rechazar la estadía.
+    assert not reserve_stay(service, _day(12), _day(15))
+    assert reserve_stay(service, _day(13), _day(15))
+    db.session.commit()
+
+    assert remaining_units(service, _day(10), _day(15)) == 0
+    assert set(_booked(service.id).values()) == {1}
+
+
+def test_partial_match_rolls_back_the_savepoint(make_service):
+    service = make_service(1, total_units=2)
+    db.session.flush()
+    assert reserve_stay(service, _day(11), _day(12))
+    assert reserve_stay(service, _day(11), _day(12))
+
+    # El UPDATE coincide con 2 de las 3 noches: se deshace sin tocar las otras.
+    assert not reserve_stay(service, _day(10), _day(13))
+    db.session.commit()
+
+    assert _booked(service.id) == {_day(10): 0, _day(11): 2, _day(12): 0}
+    assert remaining_units(service, _day(10), _day(11)) == 2
+
+
+def test_release_stay_hands_units_back(make_service):
+    service = make_service(1, total_units=2)
+    db.session.flush()
+    reserve_stay(service, _day(5), _day(8))
+    reserve_stay(service, _day(5), _day(8))
+    db.session.commit()
+
+    assert release_stay(service.id, _day(5), _day(8)) == 3
+    db.session.commit()
+
+    assert remaining_units(service, _day(5), _day(8)) == 1
+    assert set(_booked(service.id).values()) == {1}
+
+
+def test_release_pre_reservation_inventory_only_frees_nights_from_today(make_service):
+    service = make_service(1, total_units=1)
+    db.session.flush()
+    check_in, check_out = _day(-2), _day(2)
+    reserve_stay(service, check_in, check_out)
+    reservation = PreReservation(
+        code='ARQ-AAA-0001',
+        service_id=service.id,
+        full_name='Ana Pérez',
+        email='ana@example.com',
+        phone='099123456',
+        guests=2,
+        check_in=check_in,
+        check_out=check_out,
+        status='activo',
+        confirmation_token='token',
+        expires_at=datetime.utcnow(),
+    )
+    db.session.add(reservation)
+    db.session.commit()
+
+    assert release_pre_reservation_inventory(reservation) == 2
+    db.session.commit()
+
+    assert _booked(service.id) == {_day(-2): 1, _day(-1): 1, _day(0): 0, _day(1): 0}
+    reservation.status = 'pendiente'
+    assert release_pre_reservation_inventory(reservation) == 0
+
+
+def test_remaining_units_for_night_reads_every_service_at_once(make_service, count_queries):
+    booked, free = make_service(1, total_units=3), make_service(2, total_units=2)
+    db.session.flush()
+    reserve_stay(booked, TODAY, _day(1), units=2)
+    db.session.commit()
+    services = CampingService.query.order_by(CampingService.id).all()
+
+    with count_queries() as statements:
+        availability = remaining_units_for_night(services)
+
+    assert availability == {booked.id: 1, free.id: 2}
+    assert len(statements) == 1
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from app.extensions import db
+from app.models.user import AdminUser
+from app.services.password_hasher import Argon2Pool, PasswordHashingBusy, password_hasher
+
+QUEUE_TIMEOUT = 0.1
+
+
+@pytest.fixture
+def saturated(app):
+    """Configura el pool global con 1 hilo + 1 en cola y ocupa ambos lugares."""
+    app.config.update(ARGON2_MAX_CONCURRENCY=1, ARGON2_MAX_QUEUE=1, ARGON2_QUEUE_TIMEOUT=QUEUE_TIMEOUT)
+    password_hasher.init_app(app)
+    admin = AdminUser(username='admin', email='admin@example.com')
+    admin.set_password('secreto-123')
+    db.session.add(admin)
+    db.session.commit()
+
+    slots = password_hasher._slots
+    for _ in range(2):
+        slots.acquire()
+    yield admin
+    for _ in range(2):
+        slots.release()
+
+
+def test_busy_is_raised_after_queue_timeout(app):
+    app.config.update(ARGON2_MAX_CONCURRENCY=1, ARGON2_MAX_QUEUE=1, ARGON2_QUEUE_TIMEOUT=QUEUE_TIMEOUT)
+    pool = Argon2Pool()
+    pool.init_app(app)
+    hashed = pool.hash('secreto-123')
+
+    for _ in range(pool.max_concurrency + pool.max_queue):
+        pool._slots.acquire()
+    started = time.monotonic()
+    with pytest.raises(PasswordHashingBusy):
+        pool.verify(hashed, 'secreto-123')
+    assert time.monotonic() - started >= QUEUE_TIMEOUT
+
+    # Al liberarse un lugar, la verificación vuelve a correr.
+    pool._slots.release()
+    assert pool.verify(hashed, 'secreto-123')
+
+
+def test_api_login_maps_busy_to_503(client, saturated):
+    response = client.post('/api/auth/login', json={'email': saturated.email, 'password': 'secreto-123'})
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '5'
+    assert response.get_json()['success'] is False
+
+
+def test_admin_login_maps_busy_to_flash_and_redirect(client, saturated):
+    with client.session_transaction() as session:
+        session['captcha_result'] = 4
+
+    response = client.post('/admin/login', data={
+        'email': saturated.email,
+        'password': 'secreto-123',
+        'captcha': '4',
+    })
+
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/admin/login')
+    assert response.headers['Retry-After'] == '5'
+    with client.session_transaction() as session:
+        assert [category for category, _ in session['_flashes']] == ['error']
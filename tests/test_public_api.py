@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+
+from app.extensions import db
+from app.models.camping import PreReservation
+
+
+def test_create_pre_reservation_assigns_code(client, make_service):
+    service = make_service(1)
+    db.session.commit()
+
+    check_in = date.today() + timedelta(days=10)
+    response = client.post('/api/public/pre-reservations', json={
+        'service_id': service.id,
+        'full_name': 'Ana Pérez',
+        'email': 'Ana@Example.com',
+        'phone': '099123456',
+        'guests': 2,
+        'check_in': check_in.isoformat(),
+        'check_out': (check_in + timedelta(days=2)).isoformat(),
+        'lang': 'es',
+    })
+
+    assert response.status_code == 201, response.get_json()
+    body = response.get_json()
+    reservation = PreReservation.query.filter_by(code=body['code']).one()
+    assert reservation.status == 'pendiente'
+    assert reservation.email == 'ana@example.com'
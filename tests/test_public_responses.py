@@ -0,0 +1,38 @@
+from app.extensions import db
+from app.models.camping import CampingService
+from app.services.cache_service import NS_SERVICES, cache_service
+
+
+def test_if_none_match_returns_304_without_body(client, make_service, fake_redis):
+    make_service(1)
+    db.session.commit()
+
+    first = client.get('/api/public/services?lang=es')
+    assert first.status_code == 200
+    assert first.headers['Cache-Control'] == 'public, max-age=60'
+
+    again = client.get('/api/public/services?lang=es', headers={'If-None-Match': first.headers['ETag']})
+
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+    assert again.headers['Cache-Control'] == 'public, max-age=60'
+
+
+def test_etag_changes_only_after_a_namespace_bump(client, make_service, fake_redis):
+    service = make_service(1)
+    db.session.commit()
+    first = client.get('/api/public/services?lang=es')
+
+    # Sin invalidar, la respuesta sale del caché aunque la base cambió.
+    db.session.get(CampingService, service.id).name_es = 'Cabaña renovada'
+    db.session.commit()
+    cached = client.get('/api/public/services?lang=es')
+    assert cached.headers['ETag'] == first.headers['ETag']
+
+    cache_service.invalidate(NS_SERVICES)
+    bumped = client.get('/api/public/services?lang=es', headers={'If-None-Match': first.headers['ETag']})
+
+    assert bumped.status_code == 200
+    assert bumped.headers['ETag'] != first.headers['ETag']
+    assert bumped.get_json()[0]['name'] == 'Cabaña renovada'
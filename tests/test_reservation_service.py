@@ -0,0 +1,40 @@
+from datetime import date, datetime, timedelta
+
+from app.extensions import db
+from app.models.camping import PreReservation
+from app.services.reservation_service import sweep_pre_reservation_lifecycle
+
+
+def _reservation(service, code, status, expires_at):
+    reservation = PreReservation(
+        code=code,
+        service_id=service.id,
+        full_name='Ana Pérez',
+        email='ana@example.com',
+        phone='099123456',
+        guests=2,
+        check_in=date.today() + timedelta(days=5),
+        check_out=date.today() + timedelta(days=7),
+        status=status,
+        confirmation_token=code,
+        expires_at=expires_at,
+    )
+    db.session.add(reservation)
+    return reservation
+
+
+def test_sweep_expires_only_pending_reservations_past_deadline(make_service):
+    service = make_service(1)
+    db.session.flush()
+    past = datetime.utcnow() - timedelta(hours=1)
+    stale = _reservation(service, 'PR-1', 'pendiente', past)
+    confirmed = _reservation(service, 'PR-2', 'confirmado', past)
+    fresh = _reservation(service, 'PR-3', 'pendiente', datetime.utcnow() + timedelta(hours=1))
+    db.session.commit()
+
+    assert sweep_pre_reservation_lifecycle() == {'expired': 1, 'completed': 0}
+
+    db.session.expire_all()
+    assert stale.status == 'expirado' and stale.archived_at is not None
+    assert confirmed.status == 'confirmado'
+    assert fresh.status == 'pendiente'
@@ -0,0 +1,37 @@
+import pytest
+
+from app.extensions import db
+from app.services.search_index import reindex_service, search_service_scores
+
+
+@pytest.fixture
+def catalog(make_service):
+    cabin = make_service(1, name_es='Cabaña del Arroyo')
+    plot = make_service(
+        2,
+        service_type='parcela',
+        name_es='Parcela con sombra',
+        description_es='Parcela para carpas bajo los árboles',
+    )
+    db.session.flush()
+    reindex_service(cabin)
+    reindex_service(plot)
+    db.session.commit()
+    return cabin, plot
+
+
+@pytest.mark.parametrize('query', ['cabana', 'CABAÑ', 'Cabaña', 'cab arroy'])
+def test_search_folds_accents_and_matches_prefixes(catalog, query):
+    cabin, _ = catalog
+
+    assert list(search_service_scores(query, 'es')) == [cabin.id]
+
+
+def test_search_requires_every_token(catalog):
+    assert search_service_scores('cabana sombra', 'es') == {}
+
+
+def test_public_catalog_search_uses_the_index(client, catalog):
+    response = client.get('/api/public/services', query_string={'lang': 'es', 'q': 'CABAÑ'})
+
+    assert [item['name'] for item in response.get_json()] == ['Cabaña del Arroyo']
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+from app.extensions import db
+from app.models.camping import ServiceTestimonial
+from app.services.testimonial_service import admin_testimonial_rows, published_testimonials_after
+
+
+def _testimonial(author, service_id, created_at, is_published=True):
+    db.session.add(ServiceTestimonial(
+        service_id=service_id,
+        author_name=author,
+        comment_es=f'Comentario de {author}',
+        comment_en=f'Comment by {author}',
+        comment_pt=f'Comentário de {author}',
+        created_at=created_at,
+        is_published=is_published,
+    ))
+    db.session.flush()
+
+
+def _seed(seed_catalog):
+    first_id, second_id = seed_catalog(2)
+    _testimonial('A', first_id, datetime(2026, 1, 1, 10))
+    _testimonial('B', second_id, datetime(2026, 1, 1, 12))
+    _testimonial('C', first_id, datetime(2026, 1, 1, 12))  # empata con B: desempata el id
+    _testimonial('D', None, datetime(2026, 1, 1, 9))
+    _testimonial('E', first_id, datetime(2026, 1, 1, 13), is_published=False)
+    db.session.commit()
+    db.session.expunge_all()
+    return first_id, second_id
+
+
+def test_cursor_pages_follow_created_at_and_id_with_one_query_each(seed_catalog, count_queries):
+    _seed(seed_catalog)
+
+    pages, cursor = [], None
+    while True:
+        with count_queries() as statements:
+            items, cursor = published_testimonials_after('en', cursor=cursor, limit=2)
+        assert len(statements) == 1
+        pages.append([(item['author_name'], item['service_name'], item['message']) for item in items])
+        if cursor is None:
+            break
+
+    assert pages == [
+        [('C', 'Cabin 0', 'Comment by C'), ('B', 'Cabin 1', 'Comment by B')],
+        [('A', 'Cabin 0', 'Comment by A'), ('D', '', 'Comment by D')],
+    ]
+
+
+def test_cursor_pages_filter_by_service(seed_catalog):
+    first_id, _ = _seed(seed_catalog)
+
+    items, cursor = published_testimonials_after('es', service_id=first_id, limit=5)
+
+    assert [item['author_name'] for item in items] == ['C', 'A']
+    assert cursor is None
+
+
+def test_admin_rows_include_unpublished_in_a_single_query(seed_catalog, count_queries):
+    _seed(seed_catalog)
+
+    with count_queries() as statements:
+        rows = admin_testimonial_rows()
+
+    assert len(statements) == 1
+    by_author = {row.author_name: (row.service_name, row.is_published) for row in rows}
+    assert rows[0].author_name == 'E'
+    assert by_author == {
+        'A': ('Cabaña 0', True),
+        'B': ('Cabaña 1', True),
+        'C': ('Cabaña 0', True),
+        'D': (None, True),
+        'E': ('Cabaña 0', False),
+    }
@@ -0,0 +1,45 @@
+from app.extensions import db
+from app.models.camping import CampingService, ServiceTestimonial
+
+
+def _testimonial(service, rating):
+    testimonial = ServiceTestimonial(
+        service_id=service.id,
+        author_name='Ana',
+        rating=rating,
+        comment_es='Muy lindo lugar',
+        comment_en='Lovely place',
+        comment_pt='Lugar muito bonito',
+    )
+    db.session.add(testimonial)
+    return testimonial
+
+
+def _rating(service_id):
+    db.session.expire_all()
+    service = db.session.get(CampingService, service_id)
+    return service.rating_count, service.rating_avg
+
+
+def test_rating_deltas_use_previous_values_of_expired_attributes(make_service):
+    first, second = make_service(1), make_service(2)
+    db.session.flush()
+    _testimonial(first, 5)
+    testimonial = _testimonial(first, 3)
+    db.session.commit()
+    assert _rating(first.id) == (2, 4.0)
+
+    # Tras el commit los atributos están expirados: el delta debe restar
+    # la calificación anterior y no la nueva.
+    testimonial.rating = 1
+    db.session.commit()
+    assert _rating(first.id) == (2, 3.0)
+
+    testimonial.service_id = second.id
+    db.session.commit()
+    assert _rating(first.id) == (1, 5.0)
+    assert _rating(second.id) == (1, 1.0)
+
+    testimonial.is_published = False
+    db.session.commit()
+    assert _rating(second.id) == (0, 0.0)